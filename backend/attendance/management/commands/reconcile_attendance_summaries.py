@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from datetime import timedelta
+
+from attendance.summaries import reconcile_summaries
+
+
+class Command(BaseCommand):
+    help = 'Detect (and with --fix, repair) AttendanceSummary rows that drifted from their attendance records'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, help='Only check this course id')
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=0,
+            help='Only check the last N days (0 checks everything)'
+        )
+        parser.add_argument('--fix', action='store_true', help='Rewrite drifted summaries from a full recount')
+
+    def handle(self, *args, **options):
+        since = timezone.now().date() - timedelta(days=options['days']) if options['days'] else None
+        drift = reconcile_summaries(course_id=options['course'], since=since, fix=options['fix'])
+
+        for course_id, date, stored, expected in drift:
+            self.stdout.write(f'course {course_id} on {date}: stored {stored}, expected {expected}')
+
+        action = 'Repaired' if options['fix'] else 'Found'
+        self.stdout.write(self.style.SUCCESS(f'{action} {len(drift)} drifted attendance summaries'))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_attendance_updated_at_attendancereport'),
+        ('courses', '0004_alter_courseduration_options_courseduration_order'),
+        ('students', '0008_studentsearchdocument'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['date', 'id'], name='attendance__date_41f055_idx'),
+        ),
+    ]
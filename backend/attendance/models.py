@@ -19,10 +19,15 @@ class Attendance(models.Model):
     remarks = models.TextField(blank=True, null=True)
     recorded_by = models.ForeignKey(User, on_delete=models.CASCADE)
     recorded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ['student', 'course', 'date']
         ordering = ['-date', 'student__full_name_english']
+        indexes = [
+            # Keyset pagination of attendance lists
+            models.Index(fields=['date', 'id']),
+        ]
     
     def __str__(self):
         return f"{self.student.full_name_english} - {self.course.name} - {self.date}"
@@ -38,4 +43,29 @@ class AttendanceSummary(models.Model):
     
     class Meta:
         unique_together = ['course', 'date']
-        ordering = ['-date']
\ No newline at end of file
+        ordering = ['-date']
+
+class AttendanceReport(models.Model):
+    """Generated attendance report file, reused while the attendance it covers is unchanged"""
+    FORMAT_CHOICES = [
+        ('excel', 'Excel'),
+        ('pdf', 'PDF'),
+    ]
+    
+    course = models.ForeignKey('courses.Course', on_delete=models.CASCADE, related_name='attendance_reports')
+    period = models.CharField(max_length=20)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    content_key = models.CharField(max_length=64, unique=True, help_text='SHA-256 of the report inputs and attendance state')
+    file_path = models.CharField(max_length=500)
+    file_name = models.CharField(max_length=255)
+    file_size = models.PositiveIntegerField(default=0)
+    generated_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.course.name} - {self.period} ({self.start_date} to {self.end_date}) - {self.format}"
@@ -0,0 +1,72 @@
+# attendance/roster.py
+from django.conf import settings
+from django.core.cache import cache
+
+from naita_backend.cache import bump_cache_version, cache_version
+from students.models import Student
+from courses.models import Course
+
+DEFAULT_TIMEOUT = 900  # seconds
+VERSION_KEY = 'attendance:roster:version'
+
+
+def roster_cache_timeout():
+    return getattr(settings, 'ATTENDANCE_ROSTER_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def _roster_key(course_id):
+    version = cache_version(VERSION_KEY)
+    return f'attendance:roster:{course_id}:v{version}'
+
+
+def course_roster(course_id):
+    """Students enrolled in a course, keyed for O(1) scan validation.
+
+    Returns ``{'students': {id: {...}}, 'registration_numbers': {reg_no: id}}``,
+    or ``None`` when the course does not exist.
+    """
+    key = _roster_key(course_id)
+    roster = cache.get(key)
+    if roster is not None:
+        return roster
+
+    if not Course.objects.filter(id=course_id).exists():
+        return None
+
+    students = {}
+    registration_numbers = {}
+    for student_id, name, registration_no in Student.objects.filter(course_id=course_id).values_list(
+        'id', 'full_name_english', 'registration_no'
+    ):
+        students[student_id] = {
+            'id': student_id,
+            'name': name,
+            'registration_no': registration_no,
+        }
+        if registration_no:
+            registration_numbers[registration_no] = student_id
+
+    roster = {'students': students, 'registration_numbers': registration_numbers}
+    cache.set(key, roster, roster_cache_timeout())
+    return roster
+
+
+def roster_student(roster, qr_payload):
+    """Look up the student a decoded QR payload refers to, or None"""
+    student_id = qr_payload.get('student_id')
+    if student_id:
+        try:
+            return roster['students'].get(int(student_id))
+        except (TypeError, ValueError):
+            return None
+    student_id = roster['registration_numbers'].get(qr_payload.get('registration_no'))
+    return roster['students'].get(student_id)
+
+
+def invalidate_rosters():
+    """Expire every cached roster.
+
+    A student moving between courses changes two rosters and the old course is
+    no longer known after the save, so all rosters share one version.
+    """
+    bump_cache_version(VERSION_KEY)
@@ -0,0 +1,40 @@
+# attendance/signals.py
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from students.models import Student
+from courses.models import Course
+from naita_backend.cache import bump_cache_version
+from users.models import User
+
+from .models import Attendance
+from .roster import invalidate_rosters
+from .views import REPORT_RECORDERS_VERSION_KEY
+
+# User fields printed as 'Recorded By' in attendance reports
+RECORDER_NAME_FIELDS = ('first_name', 'last_name')
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Course)
+def invalidate_rosters_on_change(sender, instance, **kwargs):
+    invalidate_rosters()
+
+
+@receiver(pre_save, sender=User)
+def remember_recorder_name(sender, instance, update_fields=None, **kwargs):
+    instance._report_previous_name = None
+    if instance.pk is None or (update_fields and not set(RECORDER_NAME_FIELDS) & set(update_fields)):
+        return
+    instance._report_previous_name = (
+        User.objects.filter(pk=instance.pk).values_list(*RECORDER_NAME_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=User)
+def expire_reports_on_recorder_rename(sender, instance, **kwargs):
+    previous = getattr(instance, '_report_previous_name', None)
+    current = tuple(getattr(instance, field) for field in RECORDER_NAME_FIELDS)
+    if previous and previous != current and Attendance.objects.filter(recorded_by=instance).exists():
+        bump_cache_version(REPORT_RECORDERS_VERSION_KEY)
@@ -0,0 +1,195 @@
+# attendance/summaries.py
+from collections import Counter
+from django.db import transaction
+from django.db.models import F, Q, Case, When, Value, Count, FloatField
+from django.db.models.functions import Cast
+from django.db.models.lookups import GreaterThan
+
+from .models import Attendance, AttendanceSummary
+
+# Late arrivals count as this fraction of a present mark in the attendance rate
+LATE_WEIGHT = 0.8
+
+COUNT_FIELDS = {
+    'present': 'present_count',
+    'absent': 'absent_count',
+    'late': 'late_count',
+}
+
+
+def attendance_rate(present, late, total):
+    return (present + late * LATE_WEIGHT) / total * 100 if total > 0 else 0
+
+
+def rate_expression(present, late, total):
+    return Case(
+        When(
+            GreaterThan(total, 0),
+            then=(Cast(present, FloatField()) + Cast(late, FloatField()) * LATE_WEIGHT) * 100.0 / Cast(total, FloatField())
+        ),
+        default=Value(0.0),
+        output_field=FloatField()
+    )
+
+
+def status_deltas(changes):
+    """Net counter changes for (old_status, new_status) pairs; None means no record"""
+    deltas = Counter()
+    for old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        if old_status:
+            deltas[old_status] -= 1
+            deltas['total'] -= 1
+        if new_status:
+            deltas[new_status] += 1
+            deltas['total'] += 1
+    return deltas
+
+
+def status_counts():
+    """Grouped counter aggregates for an Attendance queryset"""
+    return dict(
+        total=Count('id'),
+        present=Count('id', filter=Q(status='present')),
+        absent=Count('id', filter=Q(status='absent')),
+        late=Count('id', filter=Q(status='late')),
+    )
+
+
+def summary_fields(row):
+    """AttendanceSummary field values for one row of status_counts()"""
+    return {
+        'total_students': row['total'],
+        'present_count': row['present'],
+        'absent_count': row['absent'],
+        'late_count': row['late'],
+        'attendance_rate': attendance_rate(row['present'], row['late'], row['total']),
+    }
+
+
+def recounted_summary(course_id, date):
+    """Summary field values for a (course, date) recounted from its attendance rows"""
+    return summary_fields(
+        Attendance.objects.filter(course_id=course_id, date=date).aggregate(**status_counts())
+    )
+
+
+def get_or_seed_summary(course_id, date):
+    """The (course, date) summary, created from a recount of its attendance if missing.
+
+    Attendance recorded before summaries were maintained has no summary row;
+    starting one from zeros would undercount it for good.
+    """
+    summary = AttendanceSummary.objects.filter(course_id=course_id, date=date).first()
+    if summary is None:
+        summary, _ = AttendanceSummary.objects.get_or_create(
+            course_id=course_id, date=date, defaults=recounted_summary(course_id, date)
+        )
+    return summary
+
+
+def apply_summary_deltas(course_id, date, deltas):
+    """Atomically add deltas to the (course, date) summary with F() expressions.
+
+    Call after writing the attendance rows the deltas describe: a summary
+    that does not exist yet is created from a recount, which includes them.
+    """
+    if not any(deltas.values()):
+        return
+
+    total = F('total_students') + deltas['total']
+    counts = {
+        field: F(field) + deltas[status]
+        for status, field in COUNT_FIELDS.items()
+    }
+
+    def update():
+        # SET expressions all read the pre-update row, so the rate is built from the new values
+        return AttendanceSummary.objects.filter(course_id=course_id, date=date).update(
+            total_students=total,
+            attendance_rate=rate_expression(counts['present_count'], counts['late_count'], total),
+            **counts
+        )
+
+    with transaction.atomic():
+        if update():
+            return
+        _, created = AttendanceSummary.objects.get_or_create(
+            course_id=course_id, date=date, defaults=recounted_summary(course_id, date)
+        )
+        if not created:
+            # Seeded concurrently, before this transaction's rows were visible
+            update()
+
+
+def record_attendance_change(before, after):
+    """Update summaries for one attendance record changing.
+
+    ``before`` and ``after`` are (course_id, date, status) tuples, or None when
+    the record is being created or deleted.
+    """
+    if before and after and before[:2] == after[:2]:
+        apply_summary_deltas(after[0], after[1], status_deltas([(before[2], after[2])]))
+        return
+    if before:
+        apply_summary_deltas(before[0], before[1], status_deltas([(before[2], None)]))
+    if after:
+        apply_summary_deltas(after[0], after[1], status_deltas([(None, after[2])]))
+
+
+def attendance_state(attendance):
+    return (attendance.course_id, attendance.date, attendance.status)
+
+
+def locked_attendance_state(pk):
+    """attendance_state() of the stored row, locked until the transaction ends; None if gone"""
+    return Attendance.objects.select_for_update().filter(pk=pk).values_list('course_id', 'date', 'status').first()
+
+
+def summary_matches(stored, wanted):
+    """Counters equal and the rate equal up to floating point rounding"""
+    return all(
+        abs(stored[field] - value) < 0.01 if field == 'attendance_rate' else stored[field] == value
+        for field, value in wanted.items()
+    )
+
+
+def reconcile_summaries(course_id=None, since=None, fix=False):
+    """Compare every summary with a full recount and optionally repair drift.
+
+    Returns a list of (course_id, date, stored, expected) for drifted rows.
+    """
+    attendance = Attendance.objects.all()
+    summaries = AttendanceSummary.objects.all()
+    if course_id:
+        attendance = attendance.filter(course_id=course_id)
+        summaries = summaries.filter(course_id=course_id)
+    if since:
+        attendance = attendance.filter(date__gte=since)
+        summaries = summaries.filter(date__gte=since)
+
+    expected = {
+        (row['course_id'], row['date']): summary_fields(row)
+        for row in attendance.values('course_id', 'date').annotate(**status_counts()).order_by()
+    }
+    empty = summary_fields({'total': 0, 'present': 0, 'absent': 0, 'late': 0})
+
+    drift = []
+    seen = set()
+    for summary in summaries:
+        key = (summary.course_id, summary.date)
+        seen.add(key)
+        wanted = expected.get(key, empty)
+        stored = {field: getattr(summary, field) for field in wanted}
+        if not summary_matches(stored, wanted):
+            drift.append((summary.course_id, summary.date, stored, wanted))
+    for key, wanted in expected.items():
+        if key not in seen:
+            drift.append((key[0], key[1], None, wanted))
+
+    if fix:
+        with transaction.atomic():
+            for course, date, _, wanted in drift:
+                AttendanceSummary.objects.update_or_create(course_id=course, date=date, defaults=wanted)
+    return drift
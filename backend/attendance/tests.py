@@ -1,3 +1,324 @@
+from datetime import date
+
+import base64
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from courses.models import Course
+from students.models import Student
+from students.qr import student_qr_payload
+from .models import Attendance, AttendanceSummary
+from .roster import VERSION_KEY, course_roster
+from .views import attendance_report_key
+from .summaries import reconcile_summaries
+
+User = get_user_model()
+
+# The attendance list and detail routes default to today's records
+DAY = timezone.now().date()
+
+
+def make_student(number, course):
+    return Student.objects.create(
+        full_name_english=f'Student {number}', name_with_initials=f'S. {number}', gender='Male',
+        date_of_birth=date(2000, 1, 1), nic_id=f'20000000{number:04d}', address_line='1 Main Street',
+        district='Colombo', divisional_secretariat='Colombo', grama_niladhari_division='Fort',
+        village='Fort', marital_status='Single', mobile_no='0770000000',
+        date_of_application=date(2026, 1, 1), course=course,
+    )
+
+
+class AttendanceSummaryDeltaTests(TestCase):
+    """Summaries follow attendance created, edited and deleted through the API"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='x', role='admin'
+        )
+        cls.course = Course.objects.create(name='Welding', code='WLD', district='Colombo', students=3)
+        cls.students = [make_student(number, cls.course) for number in range(3)]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def summary(self):
+        summary = AttendanceSummary.objects.get(course=self.course, date=DAY)
+        return (summary.total_students, summary.present_count, summary.absent_count, summary.late_count)
+
+    def mark(self, student, status):
+        response = self.client.post('/api/attendance/attendance/', {
+            'student': student.id, 'course': self.course.id, 'date': DAY, 'status': status,
+            'recorded_by': self.admin.id,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['id']
+
+    def test_create_update_and_delete_move_the_counters(self):
+        first = self.mark(self.students[0], 'present')
+        self.mark(self.students[1], 'late')
+        self.mark(self.students[2], 'absent')
+        self.assertEqual(self.summary(), (3, 1, 1, 1))
+
+        response = self.client.patch(f'/api/attendance/attendance/{first}/', {'status': 'absent'}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.summary(), (3, 0, 2, 1))
+
+        response = self.client.delete(f'/api/attendance/attendance/{first}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.summary(), (2, 0, 1, 1))
+        self.assertEqual(reconcile_summaries(), [])
+
+    def test_missing_summary_is_seeded_from_existing_attendance(self):
+        # Recorded before summaries were maintained
+        for student in self.students[:2]:
+            Attendance.objects.create(
+                student=student, course=self.course, date=DAY, status='present', recorded_by=self.admin
+            )
+
+        self.mark(self.students[2], 'late')
+        self.assertEqual(self.summary(), (3, 2, 0, 1))
+        summary = AttendanceSummary.objects.get(course=self.course, date=DAY)
+        self.assertAlmostEqual(summary.attendance_rate, (2 + 0.8) / 3 * 100)
+
+    def test_summary_read_is_seeded_from_existing_attendance(self):
+        Attendance.objects.create(
+            student=self.students[0], course=self.course, date=DAY, status='present', recorded_by=self.admin
+        )
+
+        response = self.client.get(f'/api/attendance/summary/{self.course.id}/', {'date': DAY.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_students'], 1)
+        self.assertEqual(response.data['present_count'], 1)
+
+    def test_reconcile_repairs_counters_and_rate(self):
+        self.mark(self.students[0], 'present')
+        self.mark(self.students[1], 'absent')
+        AttendanceSummary.objects.filter(course=self.course, date=DAY).update(present_count=5, attendance_rate=90)
+
+        self.assertEqual(len(reconcile_summaries(fix=True)), 1)
+        summary = AttendanceSummary.objects.get(course=self.course, date=DAY)
+        self.assertEqual(self.summary(), (2, 1, 1, 0))
+        self.assertAlmostEqual(summary.attendance_rate, 50)
+
+        AttendanceSummary.objects.filter(pk=summary.pk).update(attendance_rate=10)
+        self.assertEqual(len(reconcile_summaries()), 1)
+
+    def test_malformed_cursor_is_not_found(self):
+        self.mark(self.students[0], 'present')
+        position = {'keys': ['2025-13-45', 1]}
+        cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+        response = self.client.get('/api/attendance/attendance/', {'cursor': cursor})
+        self.assertEqual(response.status_code, 404)
+
+
+class StudentStatsPagingTests(TestCase):
+    """The student stats page parameters are validated rather than trusted"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user(
+            username='instructor', email='instructor@example.com', password='x', role='instructor'
+        )
+        cls.course = Course.objects.create(
+            name='Welding', code='WLD', district='Colombo', students=2, instructor=cls.instructor
+        )
+        for number in range(2):
+            student = make_student(number, cls.course)
+            Student.objects.filter(pk=student.pk).update(enrollment_status='Enrolled')
+
+    def get_page(self, **params):
+        client = APIClient()
+        client.force_authenticate(self.instructor)
+        return client.get(f'/api/attendance/course/{self.course.id}/student-stats/', params)
+
+    def test_non_numeric_page_is_rejected(self):
+        self.assertEqual(self.get_page(page='two').status_code, 400)
+        self.assertEqual(self.get_page(page=1, page_size='all').status_code, 400)
+
+    def test_page_and_size_are_at_least_one(self):
+        response = self.get_page(page=0, page_size=-5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['page'], response.data['page_size']), (1, 1))
+        self.assertEqual(len(response.data['students']), 1)
+        self.assertEqual(response.data['total_pages'], 2)
+
+
+class AttendanceScanPermissionTests(TestCase):
+    """QR scans are only recorded by users who may mark the course's attendance"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            username='owner', email='owner@example.com', password='x', role='instructor'
+        )
+        cls.other = User.objects.create_user(
+            username='other', email='other@example.com', password='x', role='instructor'
+        )
+        cls.course = Course.objects.create(
+            name='Welding', code='WLD', district='Colombo', students=1, instructor=cls.owner
+        )
+        cls.student = make_student(0, cls.course)
+
+    def scan_batch(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post('/api/attendance/scan-qr/batch/', {
+            'course_id': self.course.id,
+            'scans': [{'qr_data': student_qr_payload(self.student), 'client_id': 'a'}],
+        }, format='json')
+
+    def test_other_instructor_cannot_record(self):
+        response = self.scan_batch(self.other)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_course_instructor_records(self):
+        response = self.scan_batch(self.owner)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(Attendance.objects.filter(student=self.student, status='present').count(), 1)
+
+    def test_row_inserted_by_a_concurrent_scan_is_re_read(self):
+        manager = type(Attendance.objects)
+        select_for_update = manager.select_for_update
+
+        def insert_after_lock(objects, *args, **kwargs):
+            rows = list(select_for_update(objects, *args, **kwargs).filter(course=self.course))
+            if not Attendance.objects.exists():
+                # A single scan commits the same row once the batch has read its rows
+                Attendance.objects.create(
+                    student=self.student, course=self.course, date=timezone.localdate(),
+                    status='absent', recorded_by=self.other,
+                )
+            return mock.Mock(filter=lambda **lookups: rows)
+
+        with mock.patch.object(manager, 'select_for_update', insert_after_lock):
+            response = self.scan_batch(self.owner)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['results'][0]['status'], 'updated')
+        self.assertEqual(Attendance.objects.get(student=self.student).status, 'present')
+
+
+class CourseRosterCacheTests(TestCase):
+    """Cached rosters follow students moving between courses"""
+
+    def test_moved_student_stays_on_roster_when_version_key_is_lost(self):
+        welding = Course.objects.create(name='Welding', code='WLD', district='Colombo', students=1)
+        plumbing = Course.objects.create(name='Plumbing', code='PLB', district='Colombo', students=0)
+        student = make_student(0, welding)
+        self.assertEqual(list(course_roster(plumbing.id)['students']), [])
+
+        student.course = plumbing
+        student.save()
+        self.assertEqual(list(course_roster(plumbing.id)['students']), [student.id])
+
+        # As if the version key expired or was evicted
+        cache.delete(VERSION_KEY)
+        self.assertEqual(list(course_roster(plumbing.id)['students']), [student.id])
+
+
+class QRScanPayloadTests(TestCase):
+    """Only payloads issued for the student's current registration are recorded"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user(
+            username='instructor', email='instructor@example.com', password='x', role='instructor'
+        )
+        cls.course = Course.objects.create(
+            name='Welding', code='WLD', district='Colombo', students=1, instructor=cls.instructor
+        )
+        cls.student = make_student(0, cls.course)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.instructor)
+
+    def scan(self, qr_data):
+        return self.client.post('/api/attendance/scan-qr/', {
+            'qr_data': qr_data, 'course_id': self.course.id,
+        }, format='json')
+
+    def scan_batch(self, qr_data):
+        response = self.client.post('/api/attendance/scan-qr/batch/', {
+            'course_id': self.course.id, 'scans': [{'qr_data': qr_data, 'client_id': 'a'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data['results'][0]
+
+    def test_signed_payload_is_recorded(self):
+        response = self.scan(student_qr_payload(self.student))
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertTrue(Attendance.objects.filter(student=self.student, status='present').exists())
+
+    def test_unsigned_payload_from_older_cards_is_recorded(self):
+        payload = json.dumps({'student_id': self.student.id, 'registration_no': self.student.registration_no})
+        self.assertEqual(self.scan(payload).status_code, 200)
+
+    def test_forged_payload_is_rejected(self):
+        payload = json.loads(student_qr_payload(self.student))
+        payload['student_id'] += 1
+        self.assertEqual(self.scan(json.dumps(payload)).status_code, 400)
+        self.assertEqual(self.scan_batch(json.dumps(payload))['status'], 'error')
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_card_printed_before_re_registration_is_rejected(self):
+        old_payload = student_qr_payload(self.student)
+        old_registration_no = self.student.registration_no
+        self.student.district_code = 'KAN'
+        self.student.save()
+        self.assertNotEqual(self.student.registration_no, old_registration_no)
+
+        self.assertEqual(self.scan(old_payload).status_code, 400)
+        self.assertEqual(self.scan_batch(old_payload)['status'], 'error')
+        self.assertFalse(Attendance.objects.exists())
+        self.assertEqual(self.scan(student_qr_payload(self.student)).status_code, 200)
+
+
+class AttendanceReportKeyTests(TestCase):
+    """Stored reports are not reused once a name printed in them changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.recorder = User.objects.create_user(
+            username='recorder', email='recorder@example.com', password='x', role='instructor',
+            first_name='Kamal', last_name='Perera',
+        )
+        cls.course = Course.objects.create(name='Welding', code='WLD', district='Colombo', students=1)
+        cls.student = make_student(0, cls.course)
+        Attendance.objects.create(
+            student=cls.student, course=cls.course, date=DAY, status='present', recorded_by=cls.recorder
+        )
+
+    def key(self):
+        self.course.refresh_from_db()
+        return attendance_report_key(self.course, 'daily', DAY, DAY, 'pdf')
+
+    def assertRenameChangesKey(self, instance, field, value):
+        before = self.key()
+        self.assertEqual(self.key(), before)
+        setattr(instance, field, value)
+        instance.save()
+        self.assertNotEqual(self.key(), before)
+
+    def test_student_rename(self):
+        self.assertRenameChangesKey(self.student, 'full_name_english', 'Renamed Student')
+
+    def test_course_rename(self):
+        self.assertRenameChangesKey(self.course, 'name', 'Advanced Welding')
+
+    def test_recorder_rename(self):
+        self.assertRenameChangesKey(self.recorder, 'last_name', 'Silva')
 
-# Create your tests here.
+    def test_recorder_login_keeps_key(self):
+        before = self.key()
+        self.recorder.last_login = timezone.now()
+        self.recorder.save(update_fields=['last_login'])
+        self.assertEqual(self.key(), before)
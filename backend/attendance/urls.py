@@ -13,6 +13,8 @@ urlpatterns = [
     path('course/<int:course_id>/bulk/', views.bulk_update_attendance, name='bulk-update-attendance'),
     path('summary/<int:course_id>/', views.get_attendance_summary, name='attendance-summary'),
     path('course/<int:course_id>/student-stats/', views.get_student_attendance_stats, name='student-attendance-stats'),
+    path('scan-qr/', views.scan_qr_attendance, name='scan-qr-attendance'),
+    path('scan-qr/batch/', views.scan_qr_attendance_batch, name='scan-qr-attendance-batch'),
     
     # Report endpoints - ONLY THESE TWO (remove the duplicates and non-existent ones)
     path('reports/generate/', views.generate_attendance_report, name='generate_attendance_report'),
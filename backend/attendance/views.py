@@ -6,9 +6,16 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
-from django.db.models import Q, Count, Case, When, IntegerField
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Count, Max
+from django.db.models.functions import Round
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponse
+from django.http import FileResponse, Http404
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
 from datetime import datetime, timedelta
 import pandas as pd
 from reportlab.lib.pagesizes import A4
@@ -16,13 +23,24 @@ from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
+from pathlib import Path
+import hashlib
 import io
+import os
 import logging
 
-from .models import Attendance, AttendanceSummary
+from .models import Attendance, AttendanceReport
 from .serializers import AttendanceSerializer, AttendanceSummarySerializer
+from .roster import course_roster, roster_student
+from .summaries import (
+    apply_summary_deltas, attendance_rate, attendance_state, get_or_seed_summary,
+    locked_attendance_state, rate_expression, record_attendance_change, status_deltas,
+)
 from students.models import Student
+from students.qr import qr_registration_current, verify_qr_data
+from naita_backend.pagination import AttendancePagination
 from courses.models import Course
+from naita_backend.cache import cache_version
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +49,7 @@ class AttendanceViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['course', 'date', 'status']
+    pagination_class = AttendancePagination
     
     def get_queryset(self):
         user = self.request.user
@@ -65,55 +84,27 @@ class AttendanceViewSet(viewsets.ModelViewSet):
             # Default to today
             queryset = queryset.filter(date=timezone.now().date())
             
-        return queryset.select_related('student', 'course', 'recorded_by')
+        return queryset.select_related('student', 'course', 'recorded_by').prefetch_related('student__qualifications')
     
     def perform_create(self, serializer):
-        serializer.save(recorded_by=self.request.user)
-        self._update_attendance_summary(serializer.instance)
+        with transaction.atomic():
+            instance = serializer.save(recorded_by=self.request.user)
+            record_attendance_change(None, attendance_state(instance))
     
     def perform_update(self, serializer):
-        instance = serializer.save()
-        self._update_attendance_summary(instance)
+        with transaction.atomic():
+            # The stored state, read under a row lock, so concurrent edits
+            # each apply their delta from the status the other left
+            before = locked_attendance_state(serializer.instance.pk)
+            instance = serializer.save()
+            record_attendance_change(before, attendance_state(instance))
     
-    def _update_attendance_summary(self, attendance_instance):
-        """Update attendance summary for the course and date"""
-        try:
-            summary, created = AttendanceSummary.objects.get_or_create(
-                course=attendance_instance.course,
-                date=attendance_instance.date,
-                defaults={
-                    'total_students': 0,
-                    'present_count': 0,
-                    'absent_count': 0,
-                    'late_count': 0,
-                    'attendance_rate': 0.0
-                }
-            )
-            
-            # Recalculate counts
-            attendance_data = Attendance.objects.filter(
-                course=attendance_instance.course,
-                date=attendance_instance.date
-            ).aggregate(
-                total=Count('id'),
-                present=Count(Case(When(status='present', then=1), output_field=IntegerField())),
-                absent=Count(Case(When(status='absent', then=1), output_field=IntegerField())),
-                late=Count(Case(When(status='late', then=1), output_field=IntegerField()))
-            )
-            
-            summary.total_students = attendance_data['total']
-            summary.present_count = attendance_data['present']
-            summary.absent_count = attendance_data['absent']
-            summary.late_count = attendance_data['late']
-            summary.attendance_rate = (
-                (attendance_data['present'] + attendance_data['late'] * 0.5) / 
-                attendance_data['total'] * 100
-                if attendance_data['total'] > 0 else 0
-            )
-            summary.save()
-            
-        except Exception as e:
-            logger.error(f"Error updating attendance summary: {str(e)}")
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            before = locked_attendance_state(instance.pk)
+            instance.delete()
+            if before:
+                record_attendance_change(before, None)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -215,82 +206,90 @@ def bulk_update_attendance(request, course_id):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        updated_count = 0
+        if isinstance(date, str):
+            try:
+                date = datetime.strptime(date, '%Y-%m-%d').date()
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid date format. Use YYYY-MM-DD'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
         errors = []
+        valid_statuses = {choice for choice, _ in Attendance.ATTENDANCE_STATUS}
+        check_in_field = Attendance._meta.get_field('check_in_time')
         
+        # One query for every student in the batch, validated in memory
+        student_ids = set()
         for record in attendance_data:
             try:
-                student_id = record.get('student_id')
-                status_val = record.get('status', 'absent')
-                check_in_time = record.get('check_in_time')
-                remarks = record.get('remarks')
-                
-                # Get student and verify they belong to the same center
-                try:
-                    student = Student.objects.get(id=student_id)
-                    # Center check for students
-                    if user.center and student.center != user.center:
-                        errors.append(f"Student {student_id} does not belong to your center")
-                        continue
-                except Student.DoesNotExist:
-                    errors.append(f"Student with ID {student_id} not found")
-                    continue
-                
-                # Create or update attendance record
-                attendance, created = Attendance.objects.update_or_create(
-                    student=student,
-                    course=course,
-                    date=date,
-                    defaults={
-                        'status': status_val,
-                        'check_in_time': check_in_time if status_val != 'absent' else None,
-                        'remarks': remarks,
-                        'recorded_by': user
-                    }
-                )
-                updated_count += 1
-                logger.info(f"Updated attendance for student {student_id}: {status_val}")
-                
-            except Exception as e:
-                error_msg = f"Failed to update attendance for student {student_id}: {str(e)}"
-                errors.append(error_msg)
-                logger.error(error_msg)
+                student_ids.add(int(record.get('student_id')))
+            except (TypeError, ValueError):
+                pass
+        students = Student.objects.filter(id__in=student_ids).only('id', 'center_id').in_bulk()
         
-        # Update summary
-        if updated_count > 0:
+        # Keyed by student so a repeated student keeps only its last entry
+        records = {}
+        for record in attendance_data:
+            student_id = record.get('student_id')
+            status_val = record.get('status', 'absent')
+            remarks = record.get('remarks')
+            
             try:
-                # Recalculate summary for this course and date
-                attendance_records = Attendance.objects.filter(
-                    course=course,
-                    date=date
+                student = students.get(int(student_id))
+            except (TypeError, ValueError):
+                student = None
+            if student is None:
+                errors.append(f"Student with ID {student_id} not found")
+                continue
+            # Center check for students
+            if user.center and student.center_id != user.center_id:
+                errors.append(f"Student {student_id} does not belong to your center")
+                continue
+            if status_val not in valid_statuses:
+                errors.append(f"Failed to update attendance for student {student_id}: invalid status '{status_val}'")
+                continue
+            try:
+                check_in_time = check_in_field.to_python(record.get('check_in_time') or None)
+            except ValidationError:
+                errors.append(f"Failed to update attendance for student {student_id}: invalid check-in time")
+                continue
+            
+            records[student.id] = Attendance(
+                student_id=student.id,
+                course=course,
+                date=date,
+                status=status_val,
+                check_in_time=check_in_time if status_val != 'absent' else None,
+                remarks=remarks,
+                recorded_by=user
+            )
+        
+        updated_count = len(records)
+        
+        if records:
+            with transaction.atomic():
+                # Current statuses of the batch, so the summary moves by deltas only
+                previous = dict(
+                    Attendance.objects.select_for_update().filter(
+                        course=course, date=date, student_id__in=records.keys()
+                    ).values_list('student_id', 'status')
                 )
                 
-                total_students = attendance_records.count()
-                present_count = attendance_records.filter(status='present').count()
-                absent_count = attendance_records.filter(status='absent').count()
-                late_count = attendance_records.filter(status='late').count()
-                
-                attendance_rate = (
-                    (present_count + late_count * 0.8) / total_students * 100
-                    if total_students > 0 else 0
+                # Single upsert for the whole class
+                Attendance.objects.bulk_create(
+                    list(records.values()),
+                    update_conflicts=True,
+                    unique_fields=['student', 'course', 'date'],
+                    update_fields=['status', 'check_in_time', 'remarks', 'recorded_by', 'updated_at']
                 )
                 
-                # Update or create summary
-                summary, created = AttendanceSummary.objects.update_or_create(
-                    course=course,
-                    date=date,
-                    defaults={
-                        'total_students': total_students,
-                        'present_count': present_count,
-                        'absent_count': absent_count,
-                        'late_count': late_count,
-                        'attendance_rate': attendance_rate
-                    }
+                deltas = status_deltas(
+                    (previous.get(student_id), attendance.status)
+                    for student_id, attendance in records.items()
                 )
-                logger.info(f"Updated attendance summary: {present_count} present, {absent_count} absent, {late_count} late")
-                
-            except Exception as e:
-                logger.error(f"Error updating attendance summary: {str(e)}")
+                apply_summary_deltas(course.id, date, deltas)
+            logger.info(f"Applied attendance summary changes: {dict(deltas)}")
         
         response_data = {
             'message': f'Successfully updated {updated_count} attendance records',
@@ -346,18 +345,8 @@ def get_attendance_summary(request, course_id):
         else:
             date = timezone.now().date()
         
-        # Get or create summary
-        summary, created = AttendanceSummary.objects.get_or_create(
-            course=course,
-            date=date,
-            defaults={
-                'total_students': 0,
-                'present_count': 0,
-                'absent_count': 0,
-                'late_count': 0,
-                'attendance_rate': 0.0
-            }
-        )
+        # Missing summaries are started from the attendance already recorded
+        summary = get_or_seed_summary(course.id, date)
         
         serializer = AttendanceSummarySerializer(summary)
         return Response(serializer.data)
@@ -409,38 +398,59 @@ def get_student_attendance_stats(request, course_id):
         if user.center:
             students = students.filter(center=user.center)
         
-        # Calculate attendance for each student
+        # Count each student's attendance for this course in the same query;
+        # Meta.ordering is not applied to grouped queries, so order explicitly
+        in_course = Q(attendance__course=course)
+        students = students.annotate(
+            total_classes=Count('attendance', filter=in_course),
+            present_classes=Count('attendance', filter=in_course & Q(attendance__status='present')),
+            late_classes=Count('attendance', filter=in_course & Q(attendance__status='late')),
+            absent_classes=Count('attendance', filter=in_course & Q(attendance__status='absent')),
+            last_active=Max('attendance__date', filter=in_course),
+        ).annotate(
+            percentage=Round(rate_expression(F('present_classes'), F('late_classes'), F('total_classes')), 2)
+        ).order_by('-created_at', 'id')
+        
+        # Optional status filter, applied on the annotated percentage
+        status_filter = request.GET.get('status')
+        if status_filter == 'active':
+            students = students.filter(percentage__gte=80)
+        elif status_filter == 'at-risk':
+            students = students.filter(percentage__gte=60, percentage__lt=80)
+        elif status_filter == 'inactive':
+            students = students.filter(percentage__lt=60)
+        
+        # Pagination is optional; without a page the full list is returned
+        page = request.GET.get('page')
+        if page is not None:
+            try:
+                page = max(1, int(page))
+                page_size = max(1, int(request.GET.get('page_size', 50)))
+            except ValueError:
+                return Response(
+                    {'error': 'page and page_size must be whole numbers'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            start = (page - 1) * page_size
+            total_count = students.count()
+            students = students[start:start + page_size]
+        
         student_stats = []
         for student in students:
-            # Get all attendance records for this student in this course
-            attendance_records = Attendance.objects.filter(
-                student=student,
-                course=course
-            )
-            
-            total_classes = attendance_records.count()
-            if total_classes > 0:
-                present_classes = attendance_records.filter(status='present').count()
-                late_classes = attendance_records.filter(status='late').count()
-                
-                # Calculate attendance percentage (late counts as 0.8 of present)
+            if student.total_classes > 0:
                 attendance_percentage = round(
-                    ((present_classes + late_classes * 0.8) / total_classes) * 100, 2
+                    attendance_rate(student.present_classes, student.late_classes, student.total_classes), 2
                 )
             else:
                 attendance_percentage = 0
             
             # Determine status based on attendance
             if attendance_percentage >= 80:
-                status = 'active'
+                student_status = 'active'
             elif attendance_percentage >= 60:
-                status = 'at-risk'
+                student_status = 'at-risk'
             else:
-                status = 'inactive'
-            
-            # Get last activity date
-            last_attendance = attendance_records.order_by('-date').first()
-            last_active = last_attendance.date if last_attendance else 'Never'
+                student_status = 'inactive'
             
             student_stats.append({
                 'id': student.id,
@@ -449,15 +459,24 @@ def get_student_attendance_stats(request, course_id):
                 'phone': student.mobile_no,
                 'nic': student.nic_id,
                 'attendance_percentage': attendance_percentage,
-                'total_classes': total_classes,
-                'present_classes': present_classes,
-                'late_classes': late_classes,
-                'absent_classes': attendance_records.filter(status='absent').count(),
-                'status': status,
-                'last_active': last_active,
+                'total_classes': student.total_classes,
+                'present_classes': student.present_classes,
+                'late_classes': student.late_classes,
+                'absent_classes': student.absent_classes,
+                'status': student_status,
+                'last_active': student.last_active or 'Never',
                 'enrollment_status': student.enrollment_status
             })
         
+        if page is not None:
+            return Response({
+                'students': student_stats,
+                'total_count': total_count,
+                'page': page,
+                'page_size': page_size,
+                'total_pages': (total_count + page_size - 1) // page_size,
+            })
+        
         return Response(student_stats)
         
     except Course.DoesNotExist:
@@ -471,20 +490,29 @@ def get_student_attendance_stats(request, course_id):
 
 # ========== ATTENDANCE REPORT FUNCTIONS ==========
 
-def generate_report_data(course, period, start_date, end_date):
-    """Generate attendance report data"""
-    # Calculate date range based on period
+def resolve_report_range(period, start_date, end_date):
+    """Calculate the date range a report period covers"""
     today = timezone.now().date()
     
     if period == 'daily':
-        start_date = today
-        end_date = today
+        return today, today
     elif period == 'weekly':
-        start_date = today - timedelta(days=today.weekday())
-        end_date = today
+        return today - timedelta(days=today.weekday()), today
     elif period == 'monthly':
-        start_date = today.replace(day=1)
-        end_date = today
+        return today.replace(day=1), today
+    
+    # Custom range supplied by the client
+    if not (start_date and end_date):
+        raise ValueError('start_date and end_date are required for a custom period')
+    if isinstance(start_date, str):
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+    if isinstance(end_date, str):
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+    return start_date, end_date
+
+def generate_report_data(course, period, start_date, end_date):
+    """Generate attendance report data"""
+    start_date, end_date = resolve_report_range(period, start_date, end_date)
     
     # Fetch attendance data
     attendance_records = Attendance.objects.filter(
@@ -730,6 +758,107 @@ def generate_pdf_report(report_data, course, period):
         logger.error(f"Error generating PDF report: {str(e)}")
         raise
 
+def attendance_reports_dir():
+    """Directory stored attendance report files are written to"""
+    base_dir = getattr(settings, 'GENERATED_REPORTS_DIR', settings.BASE_DIR / 'generated_reports')
+    directory = Path(base_dir) / 'attendance'
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+# Users carry no updated_at; renaming one who recorded attendance bumps this
+REPORT_RECORDERS_VERSION_KEY = 'attendance:reports:recorders:version'
+
+def attendance_report_key(course, period, start_date, end_date, format_type):
+    """Content key for a report: changes whenever its inputs, the attendance it
+    covers or the names printed in it (course, students, recorders) change"""
+    state = Attendance.objects.filter(
+        course=course,
+        date__range=[start_date, end_date]
+    ).aggregate(
+        total=Count('id'), last_change=Max('updated_at'), last_student_change=Max('student__updated_at')
+    )
+    enrolled = Student.objects.filter(course=course, enrollment_status='Enrolled').count()
+    
+    parts = [
+        course.id, course.code, course.updated_at, period, start_date, end_date, format_type,
+        state['total'], state['last_change'], state['last_student_change'], enrolled,
+        cache_version(REPORT_RECORDERS_VERSION_KEY),
+    ]
+    return hashlib.sha256('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+def store_attendance_report(request, course, period, start_date, end_date, format_type, content_key):
+    """Generate a report file, write it to disk and record it"""
+    report_data = generate_report_data(course, period, start_date, end_date)
+    
+    if format_type == 'excel':
+        file_content, file_name = generate_excel_report(report_data, course, period)
+        extension = 'xlsx'
+    else:  # pdf
+        file_content, file_name = generate_pdf_report(report_data, course, period)
+        extension = 'pdf'
+    
+    # Content-addressed file name; write then rename so readers never see partial files
+    path = attendance_reports_dir() / f"{content_key}.{extension}"
+    temp_path = path.with_name(path.name + '.tmp')
+    temp_path.write_bytes(file_content)
+    os.replace(temp_path, path)
+    
+    report, _ = AttendanceReport.objects.get_or_create(
+        content_key=content_key,
+        defaults={
+            'course': course,
+            'period': period,
+            'start_date': start_date,
+            'end_date': end_date,
+            'format': format_type,
+            'file_path': str(path),
+            'file_name': file_name,
+            'file_size': len(file_content),
+            'generated_by': request.user,
+        }
+    )
+    return report
+
+def attendance_report_response(report):
+    """Stream a stored report file with its caching validators"""
+    content_type = (
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        if report.format == 'excel' else 'application/pdf'
+    )
+    response = FileResponse(
+        open(report.file_path, 'rb'),
+        as_attachment=True,
+        filename=report.file_name,
+        content_type=content_type
+    )
+    response['ETag'] = f'"{report.content_key}"'
+    response['Last-Modified'] = http_date(report.created_at.timestamp())
+    response['X-Report-Id'] = str(report.id)
+    return response
+
+def can_access_attendance_course(user, course):
+    return user.role == 'admin' or course.instructor_id == user.id
+
+def can_record_attendance(user, course):
+    """Same course scoping as AttendanceViewSet: admins, the course's instructor
+    (within their center), or district staff of the course's district"""
+    if user.role == 'admin':
+        return True
+    if user.role == 'instructor':
+        return course.instructor_id == user.id and (not user.center_id or course.center_id == user.center_id)
+    if user.role in ['district_manager', 'training_officer']:
+        return bool(user.district) and course.center is not None and course.center.district == user.district
+    return False
+
+def recordable_course(user, course_id):
+    """(course, error response) for a course the user may mark attendance in"""
+    course = Course.objects.select_related('center').filter(id=course_id).first()
+    if course is None:
+        return None, Response({'error': 'Course not found'}, status=404)
+    if not can_record_attendance(user, course):
+        return None, Response({'error': 'You do not have permission to record attendance for this course'}, status=403)
+    return course, None
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def generate_attendance_report(request):
@@ -751,29 +880,31 @@ def generate_attendance_report(request):
         
         # Check if user has access to this course
         course = get_object_or_404(Course, id=course_id)
-        if request.user.role != 'admin' and course.instructor != request.user:
+        if not can_access_attendance_course(request.user, course):
             return Response({
                 'success': False,
                 'message': 'Access denied - You are not assigned to this course'
             }, status=status.HTTP_403_FORBIDDEN)
         
-        # Generate report data
-        report_data = generate_report_data(course, period, start_date, end_date)
+        try:
+            start_date, end_date = resolve_report_range(period, start_date, end_date)
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Generate file based on format
-        if format_type == 'excel':
-            file_content, file_name = generate_excel_report(report_data, course, period)
-            content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        else:  # pdf
-            file_content, file_name = generate_pdf_report(report_data, course, period)
-            content_type = 'application/pdf'
+        format_type = 'excel' if format_type == 'excel' else 'pdf'
         
-        # Create response with file
-        response = HttpResponse(file_content, content_type=content_type)
-        response['Content-Disposition'] = f'attachment; filename="{file_name}"'
-        response['Content-Length'] = len(file_content)
+        # Reuse the stored file when nothing the report covers has changed
+        content_key = attendance_report_key(course, period, start_date, end_date, format_type)
+        report = AttendanceReport.objects.filter(content_key=content_key).first()
+        if report is None or not os.path.exists(report.file_path):
+            if report is not None:
+                report.delete()
+            report = store_attendance_report(request, course, period, start_date, end_date, format_type, content_key)
         
-        return response
+        return attendance_report_response(report)
         
     except Exception as e:
         logger.error(f"Failed to generate report: {str(e)}")
@@ -787,20 +918,72 @@ def generate_attendance_report(request):
 def download_attendance_report(request, report_id):
     """Download a previously generated report"""
     try:
-        # This would typically retrieve a saved report from database
-        # For now, we'll generate on-demand
-        return Response({
-            'success': False,
-            'message': 'Report download not implemented yet'
-        }, status=status.HTTP_501_NOT_IMPLEMENTED)
+        report = get_object_or_404(AttendanceReport.objects.select_related('course'), id=report_id)
+        if not can_access_attendance_course(request.user, report.course):
+            return Response({
+                'success': False,
+                'message': 'Access denied - You are not assigned to this course'
+            }, status=status.HTTP_403_FORBIDDEN)
         
+        if not os.path.exists(report.file_path):
+            return Response({
+                'success': False,
+                'message': 'Report file no longer exists, please generate it again'
+            }, status=status.HTTP_410_GONE)
+        
+        # Answer If-None-Match / If-Modified-Since without touching the file
+        not_modified = get_conditional_response(
+            request,
+            etag=f'"{report.content_key}"',
+            last_modified=int(report.created_at.timestamp())
+        )
+        if not_modified is not None:
+            return not_modified
+        
+        return attendance_report_response(report)
+        
+    except Http404:
+        raise
     except Exception as e:
         return Response({
             'success': False,
             'message': f'Failed to download report: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
-# Add to attendance/views.py
+# ========== QR SCANNING ==========
+
+# Times a scan batch re-reads rows concurrent scans inserted before giving up
+SCAN_INSERT_ATTEMPTS = 3
+
+STALE_QR_ERROR = 'QR code was issued for an earlier registration number; reprint the ID card'
+
+
+def decode_qr_data(qr_data):
+    """Parse a scanned QR payload into a dict, or return None if it is malformed or forged"""
+    try:
+        data = json.loads(qr_data)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict) or not verify_qr_data(data):
+        return None
+    return data
+
+
+def unknown_scan_error(data):
+    """Error message and status for a QR payload that is not on the course roster"""
+    student_id = data.get('student_id')
+    registration_no = data.get('registration_no')
+    if student_id:
+        students = Student.objects.filter(id=student_id)
+    elif registration_no:
+        students = Student.objects.filter(registration_no=registration_no)
+    else:
+        return 'Student not found in QR data', 404
+    if students.exists():
+        return 'Student is not enrolled in this course', 400
+    return 'Student not found', 404
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def scan_qr_attendance(request):
@@ -813,59 +996,62 @@ def scan_qr_attendance(request):
             return Response({'error': 'Missing QR data or course ID'}, status=400)
         
         # Parse QR data
-        try:
-            data = json.loads(qr_data)
-        except:
+        data = decode_qr_data(qr_data)
+        if data is None:
             return Response({'error': 'Invalid QR code data'}, status=400)
         
-        student_id = data.get('student_id')
-        registration_no = data.get('registration_no')
-        
-        # Find student
-        if student_id:
-            student = Student.objects.get(id=student_id)
-        elif registration_no:
-            student = Student.objects.get(registration_no=registration_no)
-        else:
-            return Response({'error': 'Student not found in QR data'}, status=404)
-        
-        # Get course
-        course = Course.objects.get(id=course_id)
-        
-        # Check if student is enrolled in this course
-        if student.course != course:
-            return Response({'error': 'Student is not enrolled in this course'}, status=400)
+        try:
+            course_id = int(course_id)
+        except (TypeError, ValueError):
+            return Response({'error': 'Invalid course ID'}, status=400)
+        
+        _, error = recordable_course(request.user, course_id)
+        if error:
+            return error
+        
+        # Validate against the cached course roster
+        roster = course_roster(course_id)
+        if roster is None:
+            return Response({'error': 'Course not found'}, status=404)
+        
+        student = roster_student(roster, data)
+        if student is None:
+            message, error_status = unknown_scan_error(data)
+            return Response({'error': message}, status=error_status)
+        if not qr_registration_current(data, student['registration_no']):
+            return Response({'error': STALE_QR_ERROR}, status=400)
         
         # Create attendance record
         today = timezone.now().date()
         current_time = timezone.now().time()
         
-        # Check if already marked today
-        attendance, created = Attendance.objects.get_or_create(
-            student=student,
-            course=course,
-            date=today,
-            defaults={
-                'status': 'present',
-                'check_in_time': current_time,
-                'recorded_by': request.user
-            }
-        )
-        
-        if not created:
-            # Update existing record
-            attendance.status = 'present'
-            attendance.check_in_time = current_time
-            attendance.recorded_by = request.user
-            attendance.save()
+        with transaction.atomic():
+            # Check if already marked today; an existing row is locked so that
+            # concurrent scans each apply their delta from the status the other left
+            attendance, created = Attendance.objects.select_for_update().get_or_create(
+                student_id=student['id'],
+                course_id=course_id,
+                date=today,
+                defaults={
+                    'status': 'present',
+                    'check_in_time': current_time,
+                    'recorded_by': request.user
+                }
+            )
+            previous_status = None if created else attendance.status
+            
+            if not created:
+                # Update existing record
+                attendance.status = 'present'
+                attendance.check_in_time = current_time
+                attendance.recorded_by = request.user
+                attendance.save()
+            
+            apply_summary_deltas(course_id, today, status_deltas([(previous_status, 'present')]))
         
         return Response({
             'success': True,
-            'student': {
-                'id': student.id,
-                'name': student.full_name_english,
-                'registration_no': student.registration_no
-            },
+            'student': student,
             'attendance': {
                 'id': attendance.id,
                 'status': attendance.status,
@@ -874,9 +1060,175 @@ def scan_qr_attendance(request):
             }
         })
         
-    except Student.DoesNotExist:
-        return Response({'error': 'Student not found'}, status=404)
-    except Course.DoesNotExist:
-        return Response({'error': 'Course not found'}, status=404)
     except Exception as e:
-        return Response({'error': str(e)}, status=500)
\ No newline at end of file
+        return Response({'error': str(e)}, status=500)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def scan_qr_attendance_batch(request):
+    """Record a queue of QR scans for one course in a single transaction.
+
+    Each scan is ``{'qr_data', 'scanned_at', 'client_id'}``; offline scanners
+    send the original scan time so the record lands on the right day. Results
+    are returned in input order. A student already marked present keeps the
+    original check-in, so replaying a queue after a failed upload is harmless.
+    """
+    try:
+        course_id = request.data.get('course_id')
+        scans = request.data.get('scans')
+        
+        if not course_id or not isinstance(scans, list):
+            return Response({'error': 'course_id and a list of scans are required'}, status=400)
+        
+        batch_limit = getattr(settings, 'ATTENDANCE_SCAN_BATCH_LIMIT', 500)
+        if len(scans) > batch_limit:
+            return Response({'error': f'A batch can hold at most {batch_limit} scans'}, status=400)
+        
+        try:
+            course_id = int(course_id)
+        except (TypeError, ValueError):
+            return Response({'error': 'Invalid course ID'}, status=400)
+        
+        _, error = recordable_course(request.user, course_id)
+        if error:
+            return error
+        
+        roster = course_roster(course_id)
+        if roster is None:
+            return Response({'error': 'Course not found'}, status=404)
+        
+        now = timezone.now()
+        results = []
+        accepted = {}  # (student_id, date) -> index of the earliest scan
+        
+        # Validate every scan in memory against the roster
+        for index, scan in enumerate(scans):
+            scan = scan if isinstance(scan, dict) else {}
+            result = {'index': index, 'client_id': scan.get('client_id')}
+            results.append(result)
+            
+            data = decode_qr_data(scan.get('qr_data'))
+            if data is None:
+                result.update(status='error', error='Invalid QR code data')
+                continue
+            
+            scanned_at = now
+            if scan.get('scanned_at'):
+                try:
+                    scanned_at = parse_datetime(str(scan['scanned_at']))
+                except ValueError:
+                    scanned_at = None
+                if scanned_at is None:
+                    result.update(status='error', error='Invalid scan time')
+                    continue
+                if timezone.is_naive(scanned_at):
+                    scanned_at = timezone.make_aware(scanned_at)
+                if scanned_at > now + timedelta(minutes=5):
+                    result.update(status='error', error='Scan time is in the future')
+                    continue
+            scanned_at = timezone.localtime(scanned_at)
+            
+            student = roster_student(roster, data)
+            if student is None:
+                message, _ = unknown_scan_error(data)
+                result.update(status='error', error=message)
+                continue
+            if not qr_registration_current(data, student['registration_no']):
+                result.update(status='error', error=STALE_QR_ERROR)
+                continue
+            
+            result.update(student=student, scanned_at=scanned_at)
+            key = (student['id'], scanned_at.date())
+            earlier = accepted.get(key)
+            if earlier is None or scanned_at < results[earlier]['scanned_at']:
+                if earlier is not None:
+                    results[earlier]['status'] = 'duplicate'
+                accepted[key] = index
+            else:
+                result['status'] = 'duplicate'
+        
+        with transaction.atomic():
+            # Rows are locked before deciding what to write, but a row inserted
+            # by a concurrent scan after the lock makes the insert conflict; the
+            # insert then rolls back to a savepoint and the plan is redone
+            # against the rows that now exist
+            for attempt in range(SCAN_INSERT_ATTEMPTS):
+                existing = {}
+                if accepted:
+                    student_ids = {student_id for student_id, _ in accepted}
+                    dates = {date for _, date in accepted}
+                    for attendance in Attendance.objects.select_for_update().filter(
+                        course_id=course_id, student_id__in=student_ids, date__in=dates
+                    ):
+                        existing[(attendance.student_id, attendance.date)] = attendance
+            
+                to_create = []
+                to_update = []
+                changes = {}  # date -> [(old_status, new_status)]
+                for key, index in accepted.items():
+                    result = results[index]
+                    check_in_time = result['scanned_at'].time()
+                    attendance = existing.get(key)
+                    if attendance is None:
+                        attendance = Attendance(
+                            student_id=key[0],
+                            course_id=course_id,
+                            date=key[1],
+                            status='present',
+                            check_in_time=check_in_time,
+                            recorded_by=request.user
+                        )
+                        to_create.append(attendance)
+                        result['status'] = 'recorded'
+                        changes.setdefault(key[1], []).append((None, 'present'))
+                    elif attendance.status == 'present':
+                        result['status'] = 'already_marked'
+                    else:
+                        changes.setdefault(key[1], []).append((attendance.status, 'present'))
+                        attendance.status = 'present'
+                        attendance.check_in_time = check_in_time
+                        attendance.recorded_by = request.user
+                        attendance.updated_at = now
+                        to_update.append(attendance)
+                        result['status'] = 'updated'
+                    result['attendance'] = attendance
+            
+                try:
+                    with transaction.atomic():
+                        Attendance.objects.bulk_create(to_create)
+                    break
+                except IntegrityError:
+                    if attempt == SCAN_INSERT_ATTEMPTS - 1:
+                        raise
+            
+            Attendance.objects.bulk_update(
+                to_update, ['status', 'check_in_time', 'recorded_by', 'updated_at']
+            )
+            for date, date_changes in changes.items():
+                apply_summary_deltas(course_id, date, status_deltas(date_changes))
+        
+        for result in results:
+            attendance = result.pop('attendance', None)
+            if attendance is not None:
+                result['attendance'] = {
+                    'id': attendance.id,
+                    'date': attendance.date,
+                    'status': attendance.status,
+                    'check_in_time': attendance.check_in_time,
+                }
+            result.pop('scanned_at', None)
+        
+        summary = {'total': len(results)}
+        for result in results:
+            summary[result['status']] = summary.get(result['status'], 0) + 1
+        
+        return Response({'success': True, 'summary': summary, 'results': results})
+        
+    except Exception as e:
+        logger.error(f"Error processing QR scan batch: {str(e)}")
+        return Response(
+            {'error': 'Failed to process scans'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
@@ -3,6 +3,7 @@ from rest_framework import serializers
 from .models import Course, CourseApproval, CourseCategory, CourseDuration
 from django.contrib.auth import get_user_model
 from centers.serializers import CenterSerializer  # ADD IMPORT
+from naita_backend.serializers import SparseFieldsetMixin
 
 User = get_user_model()
 
@@ -21,7 +22,7 @@ class CourseDurationSerializer(serializers.ModelSerializer):
         model = CourseDuration
         fields = ['id', 'duration']
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     instructor_details = UserSerializer(source='instructor', read_only=True)
     center_details = CenterSerializer(source='center', read_only=True)  # ADD THIS
     
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from instructors.performance import parse_month, previous_months, rollup_month
+
+
+class Command(BaseCommand):
+    help = 'Precompute monthly InstructorPerformance rows for every instructor'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='Month to roll up as YYYY-MM (defaults to the current month)')
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=1,
+            help='Also roll up the N-1 months before --month, e.g. 12 to backfill a year'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            until = parse_month(options['month']) if options['month'] else None
+        except ValueError:
+            raise CommandError('--month must look like YYYY-MM')
+        if options['months'] < 1:
+            raise CommandError('--months must be at least 1')
+
+        for month in previous_months(options['months'], until):
+            written = rollup_month(month)
+            self.stdout.write(f"{month.strftime('%Y-%m')}: {written} instructors")
+
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {options['months']} month(s) of instructor performance"))
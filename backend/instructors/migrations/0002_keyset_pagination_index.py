@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('centers', '0004_rename_instructors_center_instructor_count_and_more'),
+        ('instructors', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='instructorprofile',
+            index=models.Index(fields=['joined_date', 'id'], name='instructors_joined__3b31d6_idx'),
+        ),
+    ]
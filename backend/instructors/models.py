@@ -35,6 +35,10 @@ class InstructorProfile(models.Model):
     
     class Meta:
         ordering = ['-average_rating', 'user__first_name']
+        indexes = [
+            # Keyset pagination of the instructor list
+            models.Index(fields=['joined_date', 'id']),
+        ]
     
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.specialization}"
@@ -0,0 +1,120 @@
+# instructors/performance.py
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from attendance.models import AttendanceSummary
+from attendance.summaries import attendance_rate
+from courses.models import Course
+from students.models import Student
+from .models import InstructorPerformance
+
+User = get_user_model()
+
+# Courses that never ran are not counted as taught
+UNTAUGHT_COURSE_STATUSES = ['Pending', 'Rejected']
+TAUGHT_ENROLLMENT_STATUSES = ['Enrolled', 'Completed']
+
+ROLLUP_FIELDS = ['courses_taught', 'students_taught', 'completion_rate', 'attendance_rate']
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(month):
+    return month.replace(year=month.year + 1, month=1) if month.month == 12 else month.replace(month=month.month + 1)
+
+
+def parse_month(value):
+    """First day of a 'YYYY-MM' month"""
+    return datetime.strptime(value, '%Y-%m').date()
+
+
+def previous_months(count, until=None):
+    """The last ``count`` months up to and including ``until``'s, oldest first"""
+    month = month_start(until or timezone.now().date())
+    months = [month]
+    for _ in range(count - 1):
+        month = (month - timedelta(days=1)).replace(day=1)
+        months.append(month)
+    return months[::-1]
+
+
+def percentage(part, whole):
+    return round(part / whole * 100, 2) if whole else 0
+
+
+def rollup_month(month, instructor_ids=None):
+    """Recompute and upsert InstructorPerformance for every instructor for one month.
+
+    Each metric comes from one grouped query over all instructors:
+    courses that existed by the end of the month, students enrolled on them
+    by then (and how many completed), and the month's attendance summaries
+    for those courses. ``student_satisfaction`` has no source data and is
+    left as it is. Returns the number of rows written.
+    """
+    month = month_start(month)
+    end = next_month(month)
+    end_at = timezone.make_aware(datetime.combine(end, time.min))
+
+    instructors = User.objects.filter(role='instructor')
+    if instructor_ids is not None:
+        instructors = instructors.filter(id__in=instructor_ids)
+    instructor_ids = list(instructors.values_list('id', flat=True))
+    if not instructor_ids:
+        return 0
+
+    courses = Course.objects.filter(
+        instructor_id__in=instructor_ids, created_at__lt=end_at
+    ).exclude(status__in=UNTAUGHT_COURSE_STATUSES)
+
+    course_counts = dict(
+        courses.order_by().values('instructor_id').annotate(count=Count('id')).values_list('instructor_id', 'count')
+    )
+
+    students = Student.objects.filter(
+        Q(enrollment_date__lt=end) | Q(enrollment_date__isnull=True, created_at__lt=end_at),
+        course__in=courses,
+        enrollment_status__in=TAUGHT_ENROLLMENT_STATUSES,
+    )
+    student_counts = {
+        row['course__instructor_id']: row
+        for row in students.order_by().values('course__instructor_id').annotate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(enrollment_status='Completed')),
+        )
+    }
+
+    summaries = AttendanceSummary.objects.filter(course__in=courses, date__gte=month, date__lt=end)
+    attendance = {
+        row['course__instructor_id']: row
+        for row in summaries.order_by().values('course__instructor_id').annotate(
+            present=Sum('present_count'),
+            late=Sum('late_count'),
+            total=Sum('total_students'),
+        )
+    }
+
+    rows = []
+    for instructor_id in instructor_ids:
+        enrolled = student_counts.get(instructor_id, {'total': 0, 'completed': 0})
+        marks = attendance.get(instructor_id, {'present': 0, 'late': 0, 'total': 0})
+        rows.append(InstructorPerformance(
+            instructor_id=instructor_id,
+            month=month,
+            courses_taught=course_counts.get(instructor_id, 0),
+            students_taught=enrolled['total'],
+            completion_rate=percentage(enrolled['completed'], enrolled['total']),
+            attendance_rate=round(attendance_rate(marks['present'], marks['late'], marks['total']), 2),
+        ))
+
+    InstructorPerformance.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['instructor', 'month'],
+        update_fields=ROLLUP_FIELDS,
+    )
+    return len(rows)
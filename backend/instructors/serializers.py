@@ -67,10 +67,16 @@ class InstructorListSerializer(serializers.ModelSerializer):
             'centers', 'courses_count', 'students_count'
         ]
     
+    # Prefer the counts annotated by with_course_stats() over a query per row
+    
     def get_courses_count(self, obj):
+        if hasattr(obj, 'courses_count'):
+            return obj.courses_count
         return obj.get_total_courses()
     
     def get_students_count(self, obj):
+        if hasattr(obj, 'students_count'):
+            return obj.students_count
         return obj.get_total_students()
 
 class InstructorAvailabilitySerializer(serializers.ModelSerializer):
@@ -1,3 +1,115 @@
+import base64
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from centers.models import Center
+from courses.models import Course
+from .models import InstructorProfile
+
+User = get_user_model()
+
+
+class InstructorListQueryCountTests(TestCase):
+    """get_instructor_list must cost the same number of queries for any page size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='x', role='admin'
+        )
+        cls.center = Center.objects.create(name='Colombo Center', district='Colombo')
+
+    def add_instructors(self, count):
+        start = InstructorProfile.objects.count()
+        for number in range(start, start + count):
+            user = User.objects.create_user(
+                username=f'instructor{number}', email=f'instructor{number}@example.com',
+                password='x', role='instructor', district='Colombo',
+            )
+            profile = InstructorProfile.objects.create(user=user, specialization='Welding')
+            profile.centers.add(self.center)
+            for course_number in range(2):
+                Course.objects.create(
+                    name=f'Course {number}-{course_number}', code=f'C{number}-{course_number}',
+                    district='Colombo', instructor=user, students=10,
+                )
+
+    def list_queries(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/instructors/list/', {'page_size': 50})
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(queries)
+
+    def test_query_count_does_not_grow_with_instructors(self):
+        self.add_instructors(2)
+        data, few = self.list_queries()
+        self.assertEqual(len(data['instructors']), 2)
+
+        self.add_instructors(8)
+        data, many = self.list_queries()
+        self.assertEqual(len(data['instructors']), 10)
+        self.assertEqual(few, many)
+
+    def test_counts_and_relations_come_back(self):
+        self.add_instructors(1)
+        data, _ = self.list_queries()
+        instructor = data['instructors'][0]
+        self.assertEqual(instructor['courses_count'], 2)
+        self.assertEqual(instructor['students_count'], 20)
+        self.assertEqual(len(instructor['courses']), 2)
+        self.assertEqual([center['name'] for center in instructor['centers']], ['Colombo Center'])
+
+
+class InstructorListKeysetTests(TestCase):
+    """Cursor pages of the instructor list cover every instructor exactly once"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='x', role='admin'
+        )
+        # Every profile joins today, so the whole list is one tie on joined_date
+        for number in range(7):
+            user = User.objects.create_user(
+                username=f'instructor{number}', email=f'instructor{number}@example.com',
+                password='x', role='instructor', district='Colombo',
+            )
+            InstructorProfile.objects.create(user=user, specialization='Welding')
+
+    def test_pages_walk_ties_without_gaps_or_repeats(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+
+        seen = []
+        url, params = '/api/instructors/list/', {'page_size': 3}
+        while url:
+            response = client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['instructors']), 3)
+            self.assertEqual(response.data['total_count'], 7)
+            seen.extend(instructor['id'] for instructor in response.data['instructors'])
+            url, params = response.data['next'], None
+
+        expected = list(InstructorProfile.objects.order_by('-joined_date', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
 
-# Create your tests here.
+    def test_invalid_cursor_is_not_found(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        positions = [
+            ['keys'], {'keys': ['garbage', 'x']}, {'keys': [None, None]}, {'keys': ['2025-13-45', 1]},
+            {'keys': [{}, 1]}, {'offset': -3}, {'offset': 'x'},
+        ]
+        cursors = ['not-a-cursor'] + [
+            base64.urlsafe_b64encode(json.dumps(position).encode()).decode() for position in positions
+        ]
+        for cursor in cursors:
+            response = client.get('/api/instructors/list/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, cursor)
@@ -1,12 +1,13 @@
 # instructors/views.py
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django.contrib.auth import get_user_model
-from django.db.models import Q, Count, Avg, Sum
+from django.db.models import Q, Count, Avg, Sum, Prefetch
 from django.db.models.functions import Coalesce
 from django.utils import timezone
 from datetime import timedelta
@@ -20,10 +21,25 @@ from .serializers import (
 )
 from courses.models import Course
 from centers.models import Center
+from naita_backend.pagination import InstructorPagination
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# Meta.ordering is dropped once a queryset is grouped, so annotated lists restate it
+PROFILE_ORDERING = ['-average_rating', 'user__first_name', 'id']
+
+def with_course_stats(queryset):
+    """Annotate profiles with ``courses_count`` and ``students_count``.
+
+    The instructor's courses are the only multi-valued join here, so callers
+    must not add another one (e.g. ``centers``) before aggregating.
+    """
+    return queryset.annotate(
+        courses_count=Count('user__courses_teaching'),
+        students_count=Coalesce(Sum('user__courses_teaching__students'), 0),
+    ).order_by(*PROFILE_ORDERING)
+
 class InstructorProfileViewSet(viewsets.ModelViewSet):
     """ViewSet for managing instructor profiles"""
     queryset = InstructorProfile.objects.all()
@@ -84,23 +100,23 @@ class InstructorProfileViewSet(viewsets.ModelViewSet):
         user = request.user
         queryset = self.get_queryset()
         
-        # Calculate statistics
-        total_instructors = queryset.count()
-        active_instructors = queryset.filter(user__is_active=True).count()
-        inactive_instructors = queryset.filter(user__is_active=False).count()
-        verified_instructors = queryset.filter(is_verified=True).count()
+        # Headline counters in one aggregate
+        totals = queryset.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(user__is_active=True)),
+            inactive=Count('id', filter=Q(user__is_active=False)),
+            verified=Count('id', filter=Q(is_verified=True)),
+            avg_exp=Coalesce(Avg('experience_years'), 0.0),
+        )
+        total_instructors = totals['total']
+        active_instructors = totals['active']
+        inactive_instructors = totals['inactive']
+        verified_instructors = totals['verified']
+        avg_experience = totals['avg_exp']
         
         # Calculate average courses per instructor
-        instructor_courses = {}
-        for instructor in queryset:
-            instructor_courses[instructor.id] = instructor.get_total_courses()
-        
-        avg_courses = sum(instructor_courses.values()) / total_instructors if total_instructors > 0 else 0
-        
-        # Calculate average experience
-        avg_experience = queryset.aggregate(
-            avg_exp=Coalesce(Avg('experience_years'), 0.0)
-        )['avg_exp']
+        total_courses = Course.objects.filter(instructor__in=queryset.values('user')).count()
+        avg_courses = total_courses / total_instructors if total_instructors > 0 else 0
         
         # Get top specializations
         specializations = queryset.values('specialization').annotate(
@@ -109,18 +125,16 @@ class InstructorProfileViewSet(viewsets.ModelViewSet):
         top_specializations = {item['specialization']: item['count'] for item in specializations}
         
         # Get distribution by district
-        instructors_by_district = {}
-        for instructor in queryset:
-            if instructor.user.district:
-                district = instructor.user.district
-                instructors_by_district[district] = instructors_by_district.get(district, 0) + 1
-        
-        # Get distribution by center
-        instructors_by_center = {}
-        for instructor in queryset:
-            centers = instructor.centers.all()
-            for center in centers:
-                instructors_by_center[center.name] = instructors_by_center.get(center.name, 0) + 1
+        districts = queryset.exclude(user__district__isnull=True).exclude(user__district='').values(
+            'user__district'
+        ).annotate(count=Count('id')).order_by('user__district')
+        instructors_by_district = {item['user__district']: item['count'] for item in districts}
+        
+        # Get distribution by center, straight from the centers through table
+        centers = InstructorProfile.centers.through.objects.filter(
+            instructorprofile__in=queryset.values('id')
+        ).values('center__name').annotate(count=Count('id')).order_by('center__name')
+        instructors_by_center = {item['center__name']: item['count'] for item in centers}
         
         stats = {
             'total_instructors': total_instructors,
@@ -443,22 +457,23 @@ def get_instructor_list(request):
                 specialization__icontains=specialization_filter
             )
         
-        # Get pagination parameters
-        page = int(request.GET.get('page', 1))
-        page_size = int(request.GET.get('page_size', 10))
-        start = (page - 1) * page_size
-        end = start + page_size
-        
-        total_count = instructor_profiles.count()
-        paginated_profiles = instructor_profiles[start:end]
+        # Newest instructors first, one keyset page at a time (?page_size=, then ?cursor=)
+        paginator = InstructorPagination()
+        paginated_profiles = paginator.paginate_queryset(
+            with_course_stats(instructor_profiles).prefetch_related(
+                Prefetch('user__courses_teaching', queryset=Course.objects.only(
+                    'id', 'name', 'code', 'status', 'duration', 'students', 'progress', 'instructor'
+                )),
+                Prefetch('centers', queryset=Center.objects.only('id', 'name', 'district', 'location')),
+            ),
+            request
+        )
         
-        # Get courses for each instructor
+        # Courses and centers come from the prefetches, counts from the annotations
         result = []
         for profile in paginated_profiles:
             instructor_data = InstructorListSerializer(profile).data
             
-            # Get courses for this instructor
-            courses = Course.objects.filter(instructor=profile.user)
             instructor_data['courses'] = [
                 {
                     'id': course.id,
@@ -469,30 +484,30 @@ def get_instructor_list(request):
                     'student_count': course.students,
                     'progress': course.progress,
                 }
-                for course in courses
+                for course in profile.user.courses_teaching.all()
             ]
             
-            # Get centers for this instructor
-            centers = profile.centers.all()
             instructor_data['centers'] = [
                 {
                     'id': center.id,
                     'name': center.name,
                     'district': center.district,
                 }
-                for center in centers
+                for center in profile.centers.all()
             ]
             
             result.append(instructor_data)
         
         return Response({
             'instructors': result,
-            'total_count': total_count,
-            'page': page,
-            'page_size': page_size,
-            'total_pages': (total_count + page_size - 1) // page_size,
+            'total_count': paginator.count,
+            'count_is_estimate': paginator.count_is_estimate,
+            'page_size': paginator.page_size,
+            'next': paginator.get_next_link(),
         })
         
+    except NotFound as e:
+        return Response({'error': str(e.detail)}, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
         logger.error(f"Error getting instructor list: {str(e)}")
         return Response(
@@ -0,0 +1,27 @@
+# naita_backend/cache.py
+import uuid
+
+from django.core.cache import cache
+
+
+def _new_version():
+    return uuid.uuid4().hex[:16]
+
+
+def cache_version(key):
+    """Current version token stored under ``key``, created on first use.
+
+    Callers put the token in their cache keys; bumping it orphans every entry
+    built under the old token. Tokens are random rather than counted, so a
+    version key that is evicted or lost never brings an old token back.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_cache_version(key):
+    """Replace the token under ``key``; the write never expires"""
+    cache.set(key, _new_version(), None)
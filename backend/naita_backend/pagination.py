@@ -0,0 +1,195 @@
+# naita_backend/pagination.py
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+DEFAULT_EXACT_COUNT_LIMIT = 10000
+
+
+def exact_count_limit():
+    return getattr(settings, 'PAGINATION_EXACT_COUNT_LIMIT', DEFAULT_EXACT_COUNT_LIMIT)
+
+
+def _planner_rows(queryset):
+    """Row estimate from the Postgres planner, without running the query"""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimate_count(queryset):
+    """Return (count, is_estimate) without a full COUNT(*) on large results.
+
+    Postgres answers from the planner when it expects more rows than
+    PAGINATION_EXACT_COUNT_LIMIT. Elsewhere, and for smaller results, rows are
+    counted up to that limit only, and a capped count is flagged as an estimate.
+    """
+    queryset = queryset.order_by()
+    limit = exact_count_limit()
+    if connection.vendor == 'postgresql':
+        estimate = _planner_rows(queryset)
+        if estimate > limit:
+            return estimate, True
+    count = queryset[:limit + 1].count()
+    if count > limit:
+        return limit, True
+    return count, False
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only cursor pagination keyed on an indexed, unique ordering.
+
+    Each page is fetched with ``WHERE (ordering) < (last row)`` instead of an
+    OFFSET, so deep pages cost the same as the first. The last ordering field
+    must be unique (normally ``id``) to break ties.
+
+    Pagination is opt-in (``opt_in = False`` makes it always apply): without
+    ``?cursor=`` or ``?page_size=`` the endpoint returns its plain list as
+    before. A view can return False from ``use_keyset_pagination()`` when its
+    queryset carries its own ordering (e.g. search relevance); pages then
+    advance by offset instead.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    opt_in = True
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.opt_in and self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(params.get(self.cursor_query_param), queryset.model)
+        self.count, self.count_is_estimate = estimate_count(queryset)
+
+        use_keyset = getattr(view, 'use_keyset_pagination', lambda: True)()
+        if use_keyset:
+            queryset = queryset.order_by(*self.ordering)
+            if position.get('keys'):
+                queryset = queryset.filter(self.after(position['keys']))
+            rows = list(queryset[:self.page_size + 1])
+        else:
+            offset = position.get('offset', 0)
+            rows = list(queryset[offset:offset + self.page_size + 1])
+
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = None
+        if self.has_next:
+            if use_keyset:
+                self.next_position = {'keys': [self.key_value(rows[-1], field) for field in self.ordering]}
+            else:
+                self.next_position = {'offset': position.get('offset', 0) + self.page_size}
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def after(self, keys):
+        """Q for rows strictly after ``keys`` in ``self.ordering``"""
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            step = Q(**{f'{name}__{lookup}': keys[index]})
+            for previous, value in zip(self.ordering[:index], keys):
+                step &= Q(**{previous.lstrip('-'): value})
+            condition |= step
+        return condition
+
+    @staticmethod
+    def key_value(row, field):
+        value = getattr(row, field.lstrip('-'))
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+    def encode_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, cursor, model):
+        """The position a cursor encodes, with keys parsed by ``model``'s fields.
+
+        Cursors come from clients, so anything that is not a position this
+        paginator could have produced is a 404 rather than a failed query.
+        """
+        if not cursor:
+            return {}
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (TypeError, ValueError):
+            raise NotFound('Invalid cursor')
+        if not isinstance(position, dict):
+            raise NotFound('Invalid cursor')
+
+        offset = position.get('offset', 0)
+        if type(offset) is not int or offset < 0:
+            raise NotFound('Invalid cursor')
+
+        keys = position.get('keys')
+        if keys is not None:
+            if not isinstance(keys, list) or len(keys) != len(self.ordering) or None in keys:
+                raise NotFound('Invalid cursor')
+            try:
+                position['keys'] = [
+                    model._meta.get_field(field.lstrip('-')).to_python(key)
+                    for field, key in zip(self.ordering, keys)
+                ]
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound('Invalid cursor')
+        return position
+
+    def get_next_link(self):
+        if not self.next_position:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('count_is_estimate', self.count_is_estimate),
+            ('next', self.get_next_link()),
+            ('first', self.get_first_link()),
+            ('results', data),
+        ]))
+
+
+class StudentPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+
+class AttendancePagination(KeysetPagination):
+    ordering = ('-date', '-id')
+
+
+class UserPagination(KeysetPagination):
+    ordering = ('-date_joined', '-id')
+
+
+class InstructorPagination(KeysetPagination):
+    ordering = ('-joined_date', '-id')
+    page_size = 10
+    opt_in = False
@@ -0,0 +1,46 @@
+# naita_backend/serializers.py
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+
+
+def requested_fields(request):
+    """Field names from ``?fields=a,b`` on a read request, or None"""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    value = request.query_params.get(FIELDS_PARAM, '')
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    return fields or None
+
+
+def validated_fields(request, available):
+    """``requested_fields`` checked against ``available``; unknown names are a 400"""
+    fields = requested_fields(request)
+    if fields is None:
+        return None
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise serializers.ValidationError({
+            FIELDS_PARAM: f"Unknown fields: {', '.join(unknown)}",
+            'available_fields': list(available),
+        })
+    return fields
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin: ``?fields=id,name`` limits a read to those fields.
+
+    Only the serializer the view builds is trimmed; serializers nested as
+    fields get no context when declared and are left whole. Dropped fields
+    are never computed, so method fields and related lookups they need are
+    skipped too. Unknown names are a 400 listing what is available.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = validated_fields(kwargs.get('context', {}).get('request'), self.fields)
+        if fields is None:
+            return
+        for name in set(self.fields) - set(fields):
+            self.fields.pop(name)
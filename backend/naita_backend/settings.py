@@ -68,6 +68,43 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
 }
 
+# Dashboard snapshots older than this (seconds) are ignored and recomputed live
+DASHBOARD_SNAPSHOT_MAX_AGE = 300
+
+# Cached dashboard responses expire after this many seconds even without writes
+DASHBOARD_CACHE_TIMEOUT = 300
+
+# Report files produced by the background worker (manage.py run_report_worker)
+# and stored attendance reports
+GENERATED_REPORTS_DIR = BASE_DIR / 'generated_reports'
+
+# Seconds a course roster stays cached for QR attendance scans
+ATTENDANCE_ROSTER_CACHE_TIMEOUT = 900
+# Maximum scans accepted in one batch upload from a gate scanner
+ATTENDANCE_SCAN_BATCH_LIMIT = 500
+# Rows fetched per database round trip when streaming student exports
+STUDENT_EXPORT_CHUNK_SIZE = 2000
+# Rows per INSERT when bulk importing students
+STUDENT_IMPORT_CHUNK_SIZE = 500
+# Seconds a worker may keep its district/course code and batch lookup tables
+REFERENCE_DATA_MAX_AGE = 300
+# Seconds between checks of the shared version that tells workers those tables changed
+REFERENCE_VERSION_CHECK_INTERVAL = 5
+# 'auto' searches students through the FTS5/tsvector index, 'legacy' uses icontains
+STUDENT_SEARCH_BACKEND = 'auto'
+# Bulk ID cards: cards per A4 sheet (1, 2, 4, 6 or 8), QR worker processes,
+# and the most cards returned directly before background jobs are required
+ID_CARDS_PER_PAGE = 2
+ID_CARD_WORKERS = 4
+ID_CARD_SYNC_LIMIT = 500
+# Rendered student QR codes: on-disk cache, per-process LRU size, and whether
+# scans of unsigned (pre-signing) QR payloads are refused
+QR_CACHE_DIR = BASE_DIR / 'qr_cache'
+QR_MEMORY_CACHE_SIZE = 1024
+QR_REQUIRE_SIGNATURE = False
+# Threads generating student photo thumbnails after upload (0 generates inline)
+STUDENT_PHOTO_WORKERS = 2
+
 ROOT_URLCONF = 'naita_backend.urls'
 
 TEMPLATES = [
@@ -98,6 +135,21 @@ DATABASES = {
 }
 
 
+# Cache
+
+# Dashboards, course rosters and student stats are invalidated by bumping
+# versions in the cache, so every worker process must share one cache: the
+# per-process default (LocMemCache) would only see its own invalidations.
+# The table is created by the overview migrations (or manage.py createcachetable);
+# Redis or Memcached can be swapped in here.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    }
+}
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -1,3 +1,9 @@
+# overview/admin.py
 from django.contrib import admin
+from .models import DashboardSnapshot
 
-# Register your models here.
+@admin.register(DashboardSnapshot)
+class DashboardSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('district', 'total_centers', 'active_students', 'total_instructors', 'completion_rate', 'snapshot_date')
+    list_filter = ('district',)
+    readonly_fields = ('snapshot_date',)
@@ -0,0 +1,151 @@
+# overview/aggregates.py
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+from datetime import timedelta
+
+from centers.models import Center
+from users.models import User
+from students.models import Student
+from courses.models import Course
+from approvals.models import Approval
+
+
+def conditional_counts(queryset, **metrics):
+    """Evaluate several filtered counts over a queryset in a single query.
+
+    Each keyword maps a metric name to a ``Q`` condition, or to ``None`` for
+    an unfiltered count.
+    """
+    return queryset.aggregate(**{
+        name: Count('id', filter=condition) if condition is not None else Count('id')
+        for name, condition in metrics.items()
+    })
+
+
+def enrollment_months(now=None):
+    """Return (label, year, month) for the last 6 months, oldest first"""
+    now = now or timezone.now()
+    months = []
+    for i in range(5, -1, -1):
+        month_start = now.replace(day=1) - timedelta(days=30*i)
+        months.append((month_start.strftime('%b'), month_start.year, month_start.month))
+    return months
+
+
+def completion_rate(completed, total):
+    return round((completed / total * 100) if total > 0 else 0, 1)
+
+
+def trend(current, previous):
+    change = current - previous
+    return {'value': abs(change), 'isPositive': change > 0}
+
+
+class DashboardMetrics:
+    """Dashboard counters computed with one conditional aggregate per model.
+
+    Pass a district to scope every metric to it, or leave it as ``None`` for
+    island-wide figures. Each model is queried lazily, at most once.
+    """
+
+    def __init__(self, district=None, now=None):
+        self.district = district
+        self.now = now or timezone.now()
+        self.last_month = self.now - timedelta(days=30)
+        self.week_ago = self.now - timedelta(days=7)
+        self.months = enrollment_months(self.now)
+
+    def _scoped(self, model, field='district'):
+        queryset = model.objects.all()
+        if self.district is not None:
+            queryset = queryset.filter(**{field: self.district})
+        return queryset
+
+    @cached_property
+    def students(self):
+        month_counts = {
+            f'month_{index}': Q(created_at__year=year, created_at__month=month)
+            for index, (_, year, month) in enumerate(self.months)
+        }
+        return conditional_counts(
+            self._scoped(Student),
+            total=None,
+            enrolled=Q(enrollment_status='Enrolled'),
+            completed=Q(enrollment_status='Completed'),
+            pending=Q(enrollment_status='Pending'),
+            dropped=Q(enrollment_status='Dropped'),
+            trained=Q(training_received=True),
+            not_trained=Q(training_received=False),
+            previous=Q(created_at__lt=self.last_month),
+            new_week=Q(created_at__gte=self.week_ago),
+            **month_counts
+        )
+
+    @cached_property
+    def centers(self):
+        counts = self._scoped(Center).aggregate(
+            total=Count('id'),
+            previous=Count('id', filter=Q(created_at__lt=self.last_month)),
+            districts=Count('district', distinct=True),
+            unassigned=Count('id', filter=Q(district__isnull=True)),
+            new_week_districts=Count('district', distinct=True, filter=Q(created_at__gte=self.week_ago)),
+            new_week_unassigned=Count('id', filter=Q(created_at__gte=self.week_ago, district__isnull=True)),
+        )
+        # values('district').distinct() counts NULL as its own group, Count(distinct) does not
+        counts['districts'] += 1 if counts['unassigned'] else 0
+        counts['new_week_districts'] += 1 if counts['new_week_unassigned'] else 0
+        return counts
+
+    @cached_property
+    def users(self):
+        return conditional_counts(
+            self._scoped(User),
+            active_users=Q(is_active=True),
+            instructors=Q(role='instructor'),
+            active_instructors=Q(role='instructor', is_active=True),
+            previous_instructors=Q(role='instructor', date_joined__lt=self.last_month),
+        )
+
+    @cached_property
+    def courses(self):
+        return self._scoped(Course).aggregate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(progress=100)),
+            previous=Count('id', filter=Q(created_at__lt=self.last_month)),
+            previous_completed=Count('id', filter=Q(created_at__lt=self.last_month, progress=100)),
+            active=Count('id', filter=Q(status='Active')),
+            pending=Count('id', filter=Q(status='Pending')),
+            new_week=Count('id', filter=Q(created_at__gte=self.week_ago)),
+            completed_week=Count('id', filter=Q(progress=100, updated_at__gte=self.week_ago)),
+            completed_month=Count('id', filter=Q(
+                progress=100,
+                updated_at__year=self.now.year,
+                updated_at__month=self.now.month
+            )),
+            active_districts=Count('district', distinct=True, filter=Q(status='Active')),
+        )
+
+    @cached_property
+    def pending_approvals(self):
+        # Approvals store the district in their center field
+        return self._scoped(Approval, field='center').filter(status='pending').count()
+
+    @property
+    def completion_rate(self):
+        return completion_rate(self.courses['completed'], self.courses['total'])
+
+    def enrollment_data(self):
+        return [
+            {'month': label, 'students': self.students[f'month_{index}']}
+            for index, (label, _, _) in enumerate(self.months)
+        ]
+
+    def trends(self):
+        previous_rate = completion_rate(self.courses['previous_completed'], self.courses['previous'])
+        return {
+            'centers': trend(self.centers['total'], self.centers['previous']),
+            'students': trend(self.students['total'], self.students['previous']),
+            'instructors': trend(self.users['instructors'], self.users['previous_instructors']),
+            'completion': trend(self.completion_rate, previous_rate),
+        }
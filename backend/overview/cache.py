@@ -0,0 +1,55 @@
+# overview/cache.py
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from naita_backend.cache import bump_cache_version, cache_version
+
+DEFAULT_TIMEOUT = 300  # seconds
+ISLAND_SCOPE = 'all'
+
+
+def dashboard_cache_timeout():
+    return getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def _version_key(district):
+    return f'dashboard:version:{district or ISLAND_SCOPE}'
+
+
+def _invalidated_key(district):
+    return f'dashboard:invalidated:{district or ISLAND_SCOPE}'
+
+
+def dashboard_invalidated_at(district):
+    """When the scope's dashboards were last invalidated (epoch seconds), or None"""
+    return cache.get(_invalidated_key(district))
+
+
+def dashboard_cache_key(name, role, district):
+    """Cache key for a dashboard payload, tied to the scope's current version"""
+    scope = district or ISLAND_SCOPE
+    version = cache_version(_version_key(district))
+    return f'dashboard:{name}:{role}:{scope}:v{version}'
+
+
+def get_cached_dashboard(name, role, district):
+    return cache.get(dashboard_cache_key(name, role, district))
+
+
+def set_cached_dashboard(name, role, district, data):
+    cache.set(dashboard_cache_key(name, role, district), data, dashboard_cache_timeout())
+
+
+def invalidate_dashboard_cache(district=None):
+    """Expire cached dashboards for a district and for the island-wide view.
+
+    Bumping the scope version orphans every role's entry at once; the old
+    entries simply age out of the cache. The time of the bump is kept so that
+    snapshots taken before it are not served (and re-cached) afterwards.
+    """
+    scopes = {None, district or None}
+    invalidated_at = timezone.now().timestamp()
+    for scope in scopes:
+        cache.set(_invalidated_key(scope), invalidated_at, None)
+        bump_cache_version(_version_key(scope))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from overview.snapshots import refresh_snapshots, prune_snapshots, run_scheduler
+
+
+class Command(BaseCommand):
+    help = 'Precompute island-wide and per-district dashboard snapshots'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and refresh every N seconds (0 refreshes once and exits)'
+        )
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=7,
+            help='Delete snapshots older than this many days (0 keeps everything)'
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        keep_days = options['keep_days']
+
+        if interval > 0:
+            self.stdout.write(f'Refreshing dashboard snapshots every {interval} seconds')
+            run_scheduler(interval, keep_days=keep_days)
+            return
+
+        snapshots = refresh_snapshots()
+        pruned = prune_snapshots(keep_days) if keep_days else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(snapshots)} dashboard snapshots, pruned {pruned} old snapshots'
+        ))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('overview', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='dashboardsnapshot',
+            options={'ordering': ['-snapshot_date']},
+        ),
+        migrations.AddField(
+            model_name='dashboardsnapshot',
+            name='district',
+            field=models.CharField(blank=True, help_text='District the snapshot covers; empty for island-wide figures', max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='dashboardsnapshot',
+            name='overview_data',
+            field=models.JSONField(default=dict, help_text='Precomputed OverviewView payload'),
+        ),
+        migrations.AddField(
+            model_name='dashboardsnapshot',
+            name='stats_data',
+            field=models.JSONField(default=dict, help_text='Precomputed DashboardStatsView payload'),
+        ),
+        migrations.AddIndex(
+            model_name='dashboardsnapshot',
+            index=models.Index(fields=['district', '-snapshot_date'], name='overview_da_distric_870928_idx'),
+        ),
+    ]
@@ -6,11 +6,26 @@ User = get_user_model()
 
 class DashboardSnapshot(models.Model):
     """Store dashboard data snapshots for performance"""
+    district = models.CharField(
+        max_length=100,
+        blank=True,
+        null=True,
+        help_text='District the snapshot covers; empty for island-wide figures'
+    )
     total_centers = models.IntegerField()
     active_students = models.IntegerField()
     total_instructors = models.IntegerField()
     completion_rate = models.FloatField()
+    overview_data = models.JSONField(default=dict, help_text='Precomputed OverviewView payload')
+    stats_data = models.JSONField(default=dict, help_text='Precomputed DashboardStatsView payload')
     snapshot_date = models.DateTimeField(auto_now_add=True)
-    
+
     class Meta:
-        db_table = 'overview_dashboard_snapshot'
\ No newline at end of file
+        db_table = 'overview_dashboard_snapshot'
+        ordering = ['-snapshot_date']
+        indexes = [
+            models.Index(fields=['district', '-snapshot_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.district or 'Island-wide'} - {self.snapshot_date}"
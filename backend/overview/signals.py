@@ -0,0 +1,64 @@
+# overview/signals.py
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from centers.models import Center
+from users.models import User
+from students.models import Student
+from courses.models import Course
+from approvals.models import Approval
+
+from .cache import invalidate_dashboard_cache
+
+# User fields that feed dashboard counters; saves touching only other
+# fields (e.g. last_login on every sign-in) leave the dashboards alone
+USER_DASHBOARD_FIELDS = {'role', 'is_active', 'district', 'date_joined'}
+
+
+def _district_field(model):
+    # Approvals store the district in their center field
+    return 'center' if model is Approval else 'district'
+
+
+def _district_of(instance):
+    return getattr(instance, _district_field(type(instance)))
+
+
+@receiver(pre_save, sender=Student)
+@receiver(pre_save, sender=Course)
+@receiver(pre_save, sender=Center)
+@receiver(pre_save, sender=Approval)
+@receiver(pre_save, sender=User)
+def remember_previous_district(sender, instance, update_fields=None, **kwargs):
+    """Note the stored district so a row moving district expires both scopes"""
+    field = _district_field(sender)
+    instance._dashboard_previous_district = None
+    if instance.pk is None or (update_fields and field not in update_fields):
+        return
+    instance._dashboard_previous_district = (
+        sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Center)
+@receiver(post_save, sender=Approval)
+@receiver(post_save, sender=User)
+def invalidate_dashboard_on_save(sender, instance, update_fields=None, **kwargs):
+    if sender is User and update_fields and not USER_DASHBOARD_FIELDS.intersection(update_fields):
+        return
+    district = _district_of(instance)
+    invalidate_dashboard_cache(district)
+    previous = getattr(instance, '_dashboard_previous_district', None)
+    if previous and previous != district:
+        invalidate_dashboard_cache(previous)
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Center)
+@receiver(post_delete, sender=Approval)
+@receiver(post_delete, sender=User)
+def invalidate_dashboard_on_delete(sender, instance, **kwargs):
+    invalidate_dashboard_cache(_district_of(instance))
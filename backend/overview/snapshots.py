@@ -0,0 +1,139 @@
+# overview/snapshots.py
+from django.conf import settings
+from django.db.models import Max, Q
+from django.utils import timezone
+from datetime import datetime, timedelta, timezone as dt_timezone
+import time
+import logging
+
+from centers.models import Center
+from users.models import User
+from students.models import Student
+from courses.models import Course
+
+from .cache import dashboard_invalidated_at
+from .models import DashboardSnapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE = 300  # seconds
+
+
+def snapshot_max_age():
+    """Staleness window (seconds) within which a snapshot may be served"""
+    return getattr(settings, 'DASHBOARD_SNAPSHOT_MAX_AGE', DEFAULT_MAX_AGE)
+
+
+def wants_fresh_data(request):
+    """True when the client asked to bypass snapshots with ?fresh=1"""
+    return request.query_params.get('fresh', '').lower() in ('1', 'true', 'yes')
+
+
+def snapshot_districts():
+    """All districts that have dashboard data or a district-level user"""
+    districts = set()
+    for queryset in (
+        Center.objects.values_list('district', flat=True),
+        Course.objects.values_list('district', flat=True),
+        Student.objects.values_list('district', flat=True),
+        User.objects.filter(role__in=['district_manager', 'training_officer']).values_list('district', flat=True),
+    ):
+        districts.update(queryset.distinct())
+    return sorted(district for district in districts if district)
+
+
+def take_snapshot(district=None):
+    """Compute and store the dashboard payloads for a district (or island-wide)"""
+    from .views import OverviewView, DashboardStatsView
+
+    # The snapshot is dated when its data was read, not when it was stored,
+    # so writes made while it was being computed invalidate it
+    started_at = timezone.now()
+    if district:
+        overview_data = OverviewView().get_district_overview(district)
+        stats_data = DashboardStatsView().get_district_dashboard_stats(district)
+    else:
+        overview_data = OverviewView().get_admin_data()
+        stats_data = DashboardStatsView().get_system_dashboard_stats()
+
+    snapshot = DashboardSnapshot.objects.create(
+        district=district or None,
+        total_centers=overview_data['total_centers'],
+        active_students=overview_data['active_students'],
+        total_instructors=overview_data['total_instructors'],
+        completion_rate=overview_data['completion_rate'],
+        overview_data=overview_data,
+        stats_data=stats_data,
+    )
+    # snapshot_date is auto_now_add, so it can only be backdated after the insert
+    DashboardSnapshot.objects.filter(pk=snapshot.pk).update(snapshot_date=started_at)
+    snapshot.snapshot_date = started_at
+    return snapshot
+
+
+def refresh_snapshots():
+    """Snapshot the island-wide dashboard and every district dashboard"""
+    snapshots = [take_snapshot()]
+    for district in snapshot_districts():
+        snapshots.append(take_snapshot(district))
+    return snapshots
+
+
+def prune_snapshots(keep_days):
+    """Delete snapshots older than keep_days, always keeping each scope's latest"""
+    cutoff = timezone.now() - timedelta(days=keep_days)
+    latest_ids = DashboardSnapshot.objects.order_by().values('district').annotate(
+        latest_id=Max('id')
+    ).values_list('latest_id', flat=True)
+    stale = DashboardSnapshot.objects.filter(snapshot_date__lt=cutoff).exclude(id__in=list(latest_ids))
+    return stale.delete()[0]
+
+
+def latest_snapshot(district=None, max_age=None, newer_than=None):
+    """Newest snapshot for the scope if it is within the staleness window.
+
+    ``newer_than`` (a datetime) also rejects snapshots taken before it,
+    e.g. before the scope's data last changed.
+    """
+    max_age = snapshot_max_age() if max_age is None else max_age
+    if not max_age:
+        return None
+
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    if newer_than is not None:
+        cutoff = max(cutoff, newer_than)
+    scope = Q(district=district) if district else Q(district__isnull=True)
+    return DashboardSnapshot.objects.filter(
+        scope,
+        snapshot_date__gte=cutoff
+    ).order_by('-snapshot_date').first()
+
+
+def snapshot_payload(request, district, field):
+    """Payload from the latest fresh-enough snapshot, or None to compute live.
+
+    Snapshots older than the scope's last cache invalidation predate a write
+    and are skipped, so an invalidation is not undone by re-caching them.
+    """
+    if wants_fresh_data(request):
+        return None
+    invalidated_at = dashboard_invalidated_at(district)
+    newer_than = None
+    if invalidated_at is not None:
+        newer_than = datetime.fromtimestamp(invalidated_at, tz=dt_timezone.utc)
+    snapshot = latest_snapshot(district, newer_than=newer_than)
+    return getattr(snapshot, field) if snapshot else None
+
+
+def run_scheduler(interval, keep_days=None):
+    """Refresh snapshots every ``interval`` seconds until interrupted"""
+    while True:
+        started = time.monotonic()
+        try:
+            snapshots = refresh_snapshots()
+            if keep_days:
+                prune_snapshots(keep_days)
+            logger.info(f"Refreshed {len(snapshots)} dashboard snapshots")
+        except Exception as e:
+            logger.error(f"Error refreshing dashboard snapshots: {str(e)}")
+        time.sleep(max(interval - (time.monotonic() - started), 0))
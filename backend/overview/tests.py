@@ -1,3 +1,22 @@
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from .cache import _version_key, get_cached_dashboard, invalidate_dashboard_cache, set_cached_dashboard
+
+
+class DashboardCacheVersionTests(TestCase):
+    """Invalidated dashboards stay invalid even when the version key is lost"""
+
+    def test_lost_version_key_does_not_revive_old_entries(self):
+        set_cached_dashboard('overview', 'admin', 'Colombo', {'students': 1})
+        invalidate_dashboard_cache('Colombo')
+        self.assertIsNone(get_cached_dashboard('overview', 'admin', 'Colombo'))
+
+        # As if the version key expired or was evicted
+        cache.delete(_version_key('Colombo'))
+        self.assertIsNone(get_cached_dashboard('overview', 'admin', 'Colombo'))
+
+    def test_entries_survive_until_invalidated(self):
+        set_cached_dashboard('overview', 'admin', 'Colombo', {'students': 1})
+        invalidate_dashboard_cache('Kandy')
+        self.assertEqual(get_cached_dashboard('overview', 'admin', 'Colombo'), {'students': 1})
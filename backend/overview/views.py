@@ -10,14 +10,36 @@ import json
 import logging
 
 from centers.models import Center
-from users.models import User
 from students.models import Student
 from courses.models import Course, CourseApproval
 from approvals.models import Approval
 from attendance.models import Attendance, AttendanceSummary
 
+from .aggregates import DashboardMetrics
+from .cache import get_cached_dashboard, set_cached_dashboard
+from .snapshots import snapshot_payload, wants_fresh_data
+
 logger = logging.getLogger(__name__)
 
+
+def cached_dashboard(request, name, district, snapshot_field, compute):
+    """Serve a dashboard payload from the cache, then the latest snapshot, then live.
+
+    ?fresh=1 skips both the cache and snapshots and refreshes the cached entry.
+    """
+    role = request.user.role
+    data = None
+    if not wants_fresh_data(request):
+        data = get_cached_dashboard(name, role, district)
+        if data is not None:
+            return data
+        data = snapshot_payload(request, district, snapshot_field)
+    if data is None:
+        data = compute()
+    set_cached_dashboard(name, role, district, data)
+    return data
+
+
 class OverviewView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
@@ -27,11 +49,17 @@ class OverviewView(APIView):
             # Check user role and permissions
             user = request.user
             
-            # District managers and training officers can view their district data
+            # District managers and training officers can view their district data.
+            # Served from cache or the latest snapshot when possible, unless ?fresh=1
             if user.role in ['district_manager', 'training_officer']:
-                data = self.get_district_data(user)
+                if not user.district:
+                    return Response(self.get_district_data(user))
+                data = cached_dashboard(
+                    request, 'overview', user.district, 'overview_data',
+                    lambda: self.get_district_data(user)
+                )
             elif user.role in ['admin', 'head_office']:
-                data = self.get_admin_data()
+                data = cached_dashboard(request, 'overview', None, 'overview_data', self.get_admin_data)
             else:
                 return Response(
                     {'error': 'You do not have permission to view this data'}, 
@@ -54,125 +82,55 @@ class OverviewView(APIView):
                 'error': 'No district assigned to your account'
             }
 
-        # Filter all data by district
-        district_filter = Q(district=user.district)
-        
-        # Basic counts for district
-        total_centers = Center.objects.filter(district_filter).count()
-        active_students = Student.objects.filter(
-            district_filter, 
-            enrollment_status='Enrolled'
-        ).count()
-        total_instructors = User.objects.filter(
-            district_filter,
-            role='instructor', 
-            is_active=True
-        ).count()
-        
-        # Course completion rate for district
-        district_courses = Course.objects.filter(district_filter)
-        total_courses = district_courses.count()
-        completed_courses = district_courses.filter(progress=100).count()
-        completion_rate = round((completed_courses / total_courses * 100) if total_courses > 0 else 0, 1)
+        return self.get_district_overview(user.district)
 
-        # Enrollment trends for district (last 6 months)
-        enrollment_data = self.get_district_enrollment_data(user.district)
-        
-        # Center performance for district
-        center_performance_data = self.get_district_center_performance(user.district)
-        
-        # Recent activities in district
-        recent_activities = self.get_district_recent_activities(user.district)
-        
-        # Trends compared to previous period
-        trends = self.get_district_trends(user.district)
+    def get_district_overview(self, district):
+        """Build the overview payload for a district"""
+        # All counters for the district come from a handful of grouped queries
+        metrics = DashboardMetrics(district=district)
 
         return {
-            'total_centers': total_centers,
-            'active_students': active_students,
-            'total_instructors': total_instructors,
-            'completion_rate': completion_rate,
-            'enrollment_data': enrollment_data,
-            'center_performance_data': center_performance_data,
-            'recent_activities': recent_activities,
-            'trends': trends,
-            'user_district': user.district
+            'total_centers': metrics.centers['total'],
+            'active_students': metrics.students['enrolled'],
+            'total_instructors': metrics.users['active_instructors'],
+            'completion_rate': metrics.completion_rate,
+            'enrollment_data': metrics.enrollment_data(),
+            'center_performance_data': self.get_district_center_performance(district),
+            'recent_activities': self.get_district_recent_activities(district, metrics),
+            'trends': metrics.trends(),
+            'user_district': district
         }
 
     def get_admin_data(self):
         """Get system-wide data for admin users"""
-        # Basic counts
-        total_centers = Center.objects.count()
-        active_students = Student.objects.filter(enrollment_status='Enrolled').count()
-        total_instructors = User.objects.filter(role='instructor', is_active=True).count()
-        
-        # Completion rate from courses
-        total_courses = Course.objects.count()
-        completed_courses = Course.objects.filter(progress=100).count()
-        completion_rate = round((completed_courses / total_courses * 100) if total_courses > 0 else 0, 1)
-
-        # Enrollment trends (last 6 months)
-        enrollment_data = self.get_enrollment_data()
-        
-        # Center performance
-        center_performance_data = self.get_center_performance_data()
-        
-        # Recent activities
-        recent_activities = self.get_recent_activities()
-        
-        # Trends
-        trends = self.get_trends_data()
+        metrics = DashboardMetrics()
 
         return {
-            'total_centers': total_centers,
-            'active_students': active_students,
-            'total_instructors': total_instructors,
-            'completion_rate': completion_rate,
-            'enrollment_data': enrollment_data,
-            'center_performance_data': center_performance_data,
-            'recent_activities': recent_activities,
-            'trends': trends,
+            'total_centers': metrics.centers['total'],
+            'active_students': metrics.students['enrolled'],
+            'total_instructors': metrics.users['active_instructors'],
+            'completion_rate': metrics.completion_rate,
+            'enrollment_data': metrics.enrollment_data(),
+            'center_performance_data': self.get_center_performance_data(),
+            'recent_activities': self.get_recent_activities(),
+            'trends': metrics.trends(),
             'district_summary': {
-                'total_districts': Center.objects.values('district').distinct().count(),
-                'active_districts': Course.objects.filter(status='Active').values('district').distinct().count(),
-                'new_districts_week': Center.objects.filter(created_at__gte=timezone.now() - timedelta(days=7)).values('district').distinct().count()
+                'total_districts': metrics.centers['districts'],
+                'active_districts': metrics.courses['active_districts'],
+                'new_districts_week': metrics.centers['new_week_districts']
             },
             'training_summary': {
-                'active_courses': Course.objects.filter(status='Active').count(),
-                'completed_month': Course.objects.filter(
-                    progress=100,
-                    updated_at__year=timezone.now().year,
-                    updated_at__month=timezone.now().month
-                ).count(),
-                'upcoming': Course.objects.filter(status='Pending').count()
+                'active_courses': metrics.courses['active'],
+                'completed_month': metrics.courses['completed_month'],
+                'upcoming': metrics.courses['pending']
             },
             'system_stats': {
-                'active_users': User.objects.filter(is_active=True).count(),
+                'active_users': metrics.users['active_users'],
                 'api_status': 'Operational',
                 'database_status': 'Healthy'
             }
         }
 
-    def get_district_enrollment_data(self, district):
-        """Get enrollment data for specific district"""
-        enrollment_data = []
-        for i in range(5, -1, -1):
-            month_start = timezone.now().replace(day=1) - timedelta(days=30*i)
-            month_name = month_start.strftime('%b')
-            
-            monthly_students = Student.objects.filter(
-                district=district,
-                created_at__year=month_start.year,
-                created_at__month=month_start.month
-            ).count()
-            
-            enrollment_data.append({
-                'month': month_name,
-                'students': monthly_students
-            })
-        
-        return enrollment_data
-
     def get_district_center_performance(self, district):
         """Get center performance distribution for district"""
         performance_data = Center.objects.filter(district=district).values('performance').annotate(
@@ -196,7 +154,7 @@ class OverviewView(APIView):
             for item in performance_data
         ]
 
-    def get_district_recent_activities(self, district):
+    def get_district_recent_activities(self, district, metrics):
         """Get recent activities for district"""
         activities = []
         
@@ -214,7 +172,7 @@ class OverviewView(APIView):
         recent_approvals = CourseApproval.objects.filter(
             course__district=district,
             approval_status='approved'
-        ).order_by('-approved_at')[:2]
+        ).select_related('course').order_by('-approved_at')[:2]
         
         for approval in recent_approvals:
             activities.append({
@@ -225,10 +183,7 @@ class OverviewView(APIView):
             })
         
         # Pending approvals in district
-        pending_count = Approval.objects.filter(
-            center=district,  # Using center field to store district for approvals
-            status='pending'
-        ).count()
+        pending_count = metrics.pending_approvals
         if pending_count > 0:
             activities.append({
                 'id': "pending_approvals",
@@ -239,86 +194,6 @@ class OverviewView(APIView):
         
         return activities
 
-    def get_district_trends(self, district):
-        """Calculate trends for district compared to previous period"""
-        last_month = timezone.now() - timedelta(days=30)
-        
-        # Center trend
-        previous_centers = Center.objects.filter(
-            district=district,
-            created_at__lt=last_month
-        ).count()
-        current_centers = Center.objects.filter(district=district).count()
-        center_trend = current_centers - previous_centers
-        
-        # Student trend
-        previous_students = Student.objects.filter(
-            district=district,
-            created_at__lt=last_month
-        ).count()
-        current_students = Student.objects.filter(district=district).count()
-        student_trend = current_students - previous_students
-        
-        # Instructor trend
-        previous_instructors = User.objects.filter(
-            district=district,
-            date_joined__lt=last_month,
-            role='instructor'
-        ).count()
-        current_instructors = User.objects.filter(
-            district=district,
-            role='instructor'
-        ).count()
-        instructor_trend = current_instructors - previous_instructors
-        
-        # Completion rate trend
-        previous_courses = Course.objects.filter(
-            district=district,
-            created_at__lt=last_month
-        ).count()
-        previous_completed = Course.objects.filter(
-            district=district,
-            created_at__lt=last_month,
-            progress=100
-        ).count()
-        previous_rate = round((previous_completed / previous_courses * 100) if previous_courses > 0 else 0, 1)
-        
-        current_courses = Course.objects.filter(district=district).count()
-        current_completed = Course.objects.filter(
-            district=district,
-            progress=100
-        ).count()
-        current_rate = round((current_completed / current_courses * 100) if current_courses > 0 else 0, 1)
-        
-        completion_trend = current_rate - previous_rate
-
-        return {
-            'centers': {'value': abs(center_trend), 'isPositive': center_trend > 0},
-            'students': {'value': abs(student_trend), 'isPositive': student_trend > 0},
-            'instructors': {'value': abs(instructor_trend), 'isPositive': instructor_trend > 0},
-            'completion': {'value': abs(completion_trend), 'isPositive': completion_trend > 0},
-        }
-
-    # Keep the original methods for admin users
-    def get_enrollment_data(self):
-        """Get real enrollment data for the last 6 months"""
-        enrollment_data = []
-        for i in range(5, -1, -1):
-            month_start = timezone.now().replace(day=1) - timedelta(days=30*i)
-            month_name = month_start.strftime('%b')
-            
-            monthly_students = Student.objects.filter(
-                created_at__year=month_start.year,
-                created_at__month=month_start.month
-            ).count()
-            
-            enrollment_data.append({
-                'month': month_name,
-                'students': monthly_students
-            })
-        
-        return enrollment_data
-
     def get_center_performance_data(self):
         """Get real center performance distribution"""
         performance_data = Center.objects.values('performance').annotate(
@@ -359,7 +234,7 @@ class OverviewView(APIView):
         # Recent course approvals
         recent_approvals = CourseApproval.objects.filter(
             approval_status='approved'
-        ).order_by('-approved_at')[:2]
+        ).select_related('course').order_by('-approved_at')[:2]
         
         for approval in recent_approvals:
             activities.append({
@@ -381,49 +256,6 @@ class OverviewView(APIView):
         
         return activities
 
-    def get_trends_data(self):
-        """Calculate real trends compared to previous period"""
-        last_month = timezone.now() - timedelta(days=30)
-        
-        # Center trend
-        previous_centers = Center.objects.filter(created_at__lt=last_month).count()
-        current_centers = Center.objects.count()
-        center_trend = current_centers - previous_centers
-        
-        # Student trend
-        previous_students = Student.objects.filter(created_at__lt=last_month).count()
-        current_students = Student.objects.count()
-        student_trend = current_students - previous_students
-        
-        # Instructor trend
-        previous_instructors = User.objects.filter(
-            date_joined__lt=last_month,
-            role='instructor'
-        ).count()
-        current_instructors = User.objects.filter(role='instructor').count()
-        instructor_trend = current_instructors - previous_instructors
-        
-        # Completion rate trend
-        previous_courses = Course.objects.filter(created_at__lt=last_month).count()
-        previous_completed = Course.objects.filter(
-            created_at__lt=last_month,
-            progress=100
-        ).count()
-        previous_rate = round((previous_completed / previous_courses * 100) if previous_courses > 0 else 0, 1)
-        
-        current_courses = Course.objects.count()
-        current_completed = Course.objects.filter(progress=100).count()
-        current_rate = round((current_completed / current_courses * 100) if current_courses > 0 else 0, 1)
-        
-        completion_trend = current_rate - previous_rate
-
-        return {
-            'centers': {'value': abs(center_trend), 'isPositive': center_trend > 0},
-            'students': {'value': abs(student_trend), 'isPositive': student_trend > 0},
-            'instructors': {'value': abs(instructor_trend), 'isPositive': instructor_trend > 0},
-            'completion': {'value': abs(completion_trend), 'isPositive': completion_trend > 0},
-        }
-
     def get_time_ago(self, date):
         """Convert datetime to human readable time ago"""
         now = timezone.now()
@@ -452,9 +284,12 @@ class DashboardStatsView(APIView):
                         {'error': 'No district assigned to your account'}, 
                         status=400
                     )
-                data = self.get_district_dashboard_stats(user.district)
+                data = cached_dashboard(
+                    request, 'stats', user.district, 'stats_data',
+                    lambda: self.get_district_dashboard_stats(user.district)
+                )
             else:
-                data = self.get_system_dashboard_stats()
+                data = cached_dashboard(request, 'stats', None, 'stats_data', self.get_system_dashboard_stats)
             
             return Response(data)
             
@@ -467,98 +302,38 @@ class DashboardStatsView(APIView):
 
     def get_district_dashboard_stats(self, district):
         """Get dashboard stats for specific district"""
-        # Total counts
-        total_students = Student.objects.filter(district=district).count()
-        total_centers = Center.objects.filter(district=district).count()
-        total_courses = Course.objects.filter(district=district).count()
-        active_courses = Course.objects.filter(district=district, status='Active').count()
-        
-        # Pending approvals
-        pending_approvals = Approval.objects.filter(
-            center=district,
-            status='pending'
-        ).count()
-        
-        # Enrollment stats
-        enrollment_stats = {
-            'enrolled': Student.objects.filter(district=district, enrollment_status='Enrolled').count(),
-            'completed': Student.objects.filter(district=district, enrollment_status='Completed').count(),
-            'pending': Student.objects.filter(district=district, enrollment_status='Pending').count(),
-            'dropped': Student.objects.filter(district=district, enrollment_status='Dropped').count(),
-        }
-        
-        # Training stats
-        training_stats = {
-            'trained': Student.objects.filter(district=district, training_received=True).count(),
-            'not_trained': Student.objects.filter(district=district, training_received=False).count(),
-        }
-        
-        # Recent activity (last 7 days)
-        week_ago = timezone.now() - timedelta(days=7)
-        recent_activity = {
-            'new_students': Student.objects.filter(
-                district=district, 
-                created_at__gte=week_ago
-            ).count(),
-            'new_courses': Course.objects.filter(
-                district=district,
-                created_at__gte=week_ago
-            ).count(),
-            'completed_courses': Course.objects.filter(
-                district=district,
-                progress=100,
-                updated_at__gte=week_ago
-            ).count(),
-        }
-
-        return {
-            'total_students': total_students,
-            'total_centers': total_centers,
-            'total_courses': total_courses,
-            'active_courses': active_courses,
-            'pending_approvals': pending_approvals,
-            'enrollment_stats': enrollment_stats,
-            'training_stats': training_stats,
-            'recent_activity': recent_activity,
-        }
+        return self.build_dashboard_stats(DashboardMetrics(district=district))
 
     def get_system_dashboard_stats(self):
         """Get system-wide dashboard stats"""
-        # Similar logic but without district filtering
-        total_students = Student.objects.count()
-        total_centers = Center.objects.count()
-        total_courses = Course.objects.count()
-        active_courses = Course.objects.filter(status='Active').count()
-        pending_approvals = Approval.objects.filter(status='pending').count()
-        
-        enrollment_stats = {
-            'enrolled': Student.objects.filter(enrollment_status='Enrolled').count(),
-            'completed': Student.objects.filter(enrollment_status='Completed').count(),
-            'pending': Student.objects.filter(enrollment_status='Pending').count(),
-            'dropped': Student.objects.filter(enrollment_status='Dropped').count(),
-        }
-        
-        training_stats = {
-            'trained': Student.objects.filter(training_received=True).count(),
-            'not_trained': Student.objects.filter(training_received=False).count(),
-        }
-        
-        week_ago = timezone.now() - timedelta(days=7)
-        recent_activity = {
-            'new_students': Student.objects.filter(created_at__gte=week_ago).count(),
-            'new_courses': Course.objects.filter(created_at__gte=week_ago).count(),
-            'completed_courses': Course.objects.filter(progress=100, updated_at__gte=week_ago).count(),
-        }
+        return self.build_dashboard_stats(DashboardMetrics())
+
+    def build_dashboard_stats(self, metrics):
+        """Shape dashboard stats from pre-aggregated metrics"""
+        students = metrics.students
+        courses = metrics.courses
 
         return {
-            'total_students': total_students,
-            'total_centers': total_centers,
-            'total_courses': total_courses,
-            'active_courses': active_courses,
-            'pending_approvals': pending_approvals,
-            'enrollment_stats': enrollment_stats,
-            'training_stats': training_stats,
-            'recent_activity': recent_activity,
+            'total_students': students['total'],
+            'total_centers': metrics.centers['total'],
+            'total_courses': courses['total'],
+            'active_courses': courses['active'],
+            'pending_approvals': metrics.pending_approvals,
+            'enrollment_stats': {
+                'enrolled': students['enrolled'],
+                'completed': students['completed'],
+                'pending': students['pending'],
+                'dropped': students['dropped'],
+            },
+            'training_stats': {
+                'trained': students['trained'],
+                'not_trained': students['not_trained'],
+            },
+            'recent_activity': {
+                'new_students': students['new_week'],
+                'new_courses': courses['new_week'],
+                'completed_courses': courses['completed_week'],
+            },
         }
 
 class InstructorOverviewView(APIView):
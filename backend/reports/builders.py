@@ -0,0 +1,261 @@
+# reports/builders.py
+from django.db.models import Count, Avg, Q
+from django.utils import timezone
+from datetime import timedelta
+
+from centers.models import Center
+from courses.models import Course
+from students.models import Student
+from users.models import User
+from approvals.models import Approval
+from overview.aggregates import conditional_counts, completion_rate
+
+
+def trend_periods(today=None):
+    """Return (start_date, end_date) for the last six 30-day windows, oldest first"""
+    today = today or timezone.now().date()
+    return [
+        (today - timedelta(days=30*(i+1)), today - timedelta(days=30*i))
+        for i in range(5, -1, -1)
+    ]
+
+
+def build_island_summary():
+    centers = Center.objects.aggregate(
+        total=Count('id'),
+        districts=Count('district', distinct=True),
+        unassigned=Count('id', filter=Q(district__isnull=True)),
+    )
+    students = conditional_counts(
+        Student.objects.all(),
+        total=None,
+        completed=Q(enrollment_status='Completed'),
+    )
+    return {
+        # values('district').distinct() counts NULL as its own group, Count(distinct) does not
+        'total_districts': centers['districts'] + (1 if centers['unassigned'] else 0),
+        'total_centers': centers['total'],
+        'total_students': students['total'],
+        'total_courses': Course.objects.count(),
+        'total_instructors': User.objects.filter(role='instructor').count(),
+        'completion_rate': completion_rate(students['completed'], students['total']),
+        'pending_approvals': Approval.objects.filter(status='Pending').count(),
+    }
+
+
+def build_district_performance():
+    """Per-district centers, students, instructors, completion and growth"""
+    one_month_ago = timezone.now() - timedelta(days=30)
+
+    centers = Center.objects.exclude(district__isnull=True).exclude(district='').values('district').annotate(
+        count=Count('id')
+    ).order_by('district')
+    students = {
+        row['district']: row for row in Student.objects.values('district').annotate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(enrollment_status='Completed')),
+            new=Count('id', filter=Q(created_at__gte=one_month_ago)),
+        ).order_by()
+    }
+    instructors = dict(
+        User.objects.filter(role='instructor').values('district').annotate(
+            count=Count('id')
+        ).order_by().values_list('district', 'count')
+    )
+
+    district_performance = []
+    for row in centers:
+        district = row['district']
+        district_students = students.get(district, {'total': 0, 'completed': 0, 'new': 0})
+        students_count = district_students['total']
+        district_performance.append({
+            'name': district,
+            'centers': row['count'],
+            'students': students_count,
+            'instructors': instructors.get(district, 0),
+            'completion': completion_rate(district_students['completed'], students_count),
+            'growth': completion_rate(district_students['new'], students_count)
+        })
+    return district_performance
+
+
+def build_island_trends(today=None):
+    """Enrollments, completions and new instructors for each 30-day window"""
+    periods = trend_periods(today)
+
+    student_windows = {}
+    instructor_windows = {}
+    for index, (start_date, end_date) in enumerate(periods):
+        student_windows[f'enrollment_{index}'] = Q(enrollment_date__range=(start_date, end_date))
+        student_windows[f'completions_{index}'] = Q(
+            enrollment_status='Completed',
+            updated_at__range=(start_date, end_date)
+        )
+        instructor_windows[f'new_instructors_{index}'] = Q(date_joined__range=(start_date, end_date))
+
+    students = conditional_counts(Student.objects.all(), **student_windows)
+    instructors = conditional_counts(User.objects.filter(role='instructor'), **instructor_windows)
+
+    return [
+        {
+            'period': start_date.strftime('%b %Y'),
+            'enrollment': students[f'enrollment_{index}'],
+            'completions': students[f'completions_{index}'],
+            'new_instructors': instructors[f'new_instructors_{index}']
+        }
+        for index, (start_date, _) in enumerate(periods)
+    ]
+
+
+def build_course_distribution():
+    course_distribution = list(Course.objects.values('category').annotate(
+        value=Count('id')
+    ).order_by('-value')[:5])
+    colors = ['#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF']
+    for idx, course in enumerate(course_distribution):
+        course['color'] = colors[idx % len(colors)]
+        course['name'] = course.pop('category') or 'Uncategorized'
+    return course_distribution
+
+
+def build_top_centers(limit=5):
+    """Centers with the most students, with completion rate and instructor count"""
+    centers = list(Center.objects.annotate(
+        total_students=Count('enrolled_students', distinct=True),
+        completed_students=Count('enrolled_students', distinct=True, filter=Q(enrolled_students__enrollment_status='Completed'))
+    ).order_by('-total_students')[:limit])
+
+    instructor_counts = dict(
+        User.objects.filter(role='instructor', center__in=centers).values('center').annotate(
+            count=Count('id')
+        ).order_by().values_list('center', 'count')
+    )
+
+    return [
+        {
+            'name': center.name,
+            'district': center.district,
+            'students': center.total_students,
+            'instructors': instructor_counts.get(center.id, 0),
+            'completion': completion_rate(center.completed_students, center.total_students)
+        }
+        for center in centers
+    ]
+
+
+def build_instructor_summary():
+    instructor_summary = list(User.objects.filter(role='instructor').values('district').annotate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        avg_rating=Avg('courses_teaching__progress')
+    ).order_by('-total'))
+
+    for summary in instructor_summary:
+        summary['avg_rating'] = round(summary['avg_rating'] or 0, 1)
+    return instructor_summary
+
+
+def build_island_report():
+    """Head office report data; the query count does not grow with districts or centers"""
+    return {
+        'summary': build_island_summary(),
+        'district_performance': build_district_performance(),
+        'island_trends': build_island_trends(),
+        'course_distribution': build_course_distribution(),
+        'top_performing_centers': build_top_centers(),
+        'instructor_summary': build_instructor_summary()
+    }
+
+
+def build_district_report(district):
+    """District report data for district managers"""
+    # Summary statistics (filtered by district)
+    total_centers = Center.objects.filter(district=district).count()
+    total_courses = Course.objects.filter(district=district).count()
+    total_users = User.objects.filter(district=district).count()
+    pending_approvals = Approval.objects.filter(
+        center__icontains=district, status='Pending'  # Assuming center field contains district
+    ).count()
+    active_students = Student.objects.filter(
+        district=district, enrollment_status='Enrolled'
+    ).count()
+    completed_students = Student.objects.filter(
+        district=district, enrollment_status='Completed'
+    ).count()
+    completion_rate = round((completed_students / (active_students + completed_students) * 100) if (active_students + completed_students) > 0 else 0, 1)
+    
+    # Center performance (in district)
+    center_performance = []
+    centers = Center.objects.filter(district=district)[:5]  # Top 5 centers
+    for center in centers:
+        students_count = Student.objects.filter(center=center).count()
+        courses_count = Course.objects.filter(center=center).count()
+        center_completed = Student.objects.filter(
+            center=center, enrollment_status='Completed'
+        ).count()
+        center_completion = round((center_completed / students_count * 100) if students_count > 0 else 0, 1)
+        
+        center_performance.append({
+            'name': center.name,
+            'students': students_count,
+            'courses': courses_count,
+            'completion': center_completion
+        })
+    
+    # Enrollment trend (last 6 months in district)
+    enrollment_trend = []
+    today = timezone.now().date()
+    for i in range(5, -1, -1):
+        start_date = today - timedelta(days=30*(i+1))
+        end_date = today - timedelta(days=30*i)
+        
+        period_enrollments = Student.objects.filter(
+            district=district,
+            enrollment_date__range=(start_date, end_date)
+        ).count()
+        
+        period_approvals = Approval.objects.filter(
+            center__icontains=district,
+            date_requested__range=(start_date, end_date)
+        ).count()
+        
+        enrollment_trend.append({
+            'period': start_date.strftime('%b'),
+            'enrollment': period_enrollments,
+            'approvals': period_approvals
+        })
+    
+    # Course distribution (in district)
+    course_distribution = list(Course.objects.filter(district=district).values('category').annotate(
+        value=Count('id')
+    ).order_by('-value')[:4])
+    colors = ['#3b82f6', '#10b981', '#f59e0b', '#ef4444']
+    for idx, course in enumerate(course_distribution):
+        course['color'] = colors[idx % len(colors)]
+        course['name'] = course.pop('category') or 'Uncategorized'
+    
+    # Recent approvals (in district)
+    recent_approvals = list(Approval.objects.filter(
+        center__icontains=district
+    ).order_by('-date_requested')[:5].values(
+        'id', 'type', 'center', 'status', 'date_requested'
+    ))
+    for approval in recent_approvals:
+        approval['name'] = approval.pop('center')
+        approval['date'] = approval['date_requested'].strftime('%Y-%m-%d')
+        del approval['date_requested']
+    
+    return {
+        'summary': {
+            'totalCenters': {'current': total_centers},
+            'totalCourses': {'current': total_courses},
+            'totalUsers': {'current': total_users},
+            'pendingApprovals': {'current': pending_approvals},
+            'activeStudents': {'current': active_students},
+            'completionRate': {'current': completion_rate}
+        },
+        'centerPerformance': center_performance,
+        'enrollmentTrend': enrollment_trend,
+        'courseDistribution': course_distribution,
+        'recentApprovals': recent_approvals
+    }
@@ -0,0 +1,120 @@
+# reports/jobs.py
+from django.conf import settings
+from django.utils import timezone
+from datetime import timedelta
+from pathlib import Path
+import os
+import time
+import logging
+
+from .models import HeadOfficeReport
+from .builders import build_island_report, build_district_report
+
+logger = logging.getLogger(__name__)
+
+
+def reports_dir():
+    """Directory generated report files are written to"""
+    directory = Path(getattr(settings, 'GENERATED_REPORTS_DIR', settings.BASE_DIR / 'generated_reports'))
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def submit_report_job(user, **params):
+    """Queue a report for a background worker and return the job row"""
+    return HeadOfficeReport.objects.create(generated_by=user, status='queued', **params)
+
+
+def claim_next_job():
+    """Atomically move the oldest queued job to processing.
+
+    The conditional UPDATE makes the claim safe across several worker
+    processes on any database backend.
+    """
+    candidates = HeadOfficeReport.objects.filter(status='queued').order_by('created_at').values_list('pk', flat=True)[:10]
+    for pk in candidates:
+        claimed = HeadOfficeReport.objects.filter(pk=pk, status='queued').update(
+            status='processing',
+            started_at=timezone.now()
+        )
+        if claimed:
+            return HeadOfficeReport.objects.get(pk=pk)
+    return None
+
+
+def requeue_stale_jobs(stale_after):
+    """Return jobs stuck in processing (e.g. after a worker crash) to the queue"""
+    cutoff = timezone.now() - stale_after
+    return HeadOfficeReport.objects.filter(status='processing', started_at__lt=cutoff).update(
+        status='queued',
+        started_at=None
+    )
+
+
+def render_job(job):
+    """Build the report data for a job and render it, returning (bytes, file name)"""
+    from .views import (
+        render_excel_report, render_pdf_report,
+        render_district_excel_report, render_district_pdf_report,
+        resolve_report_period, filter_island_trends, report_file_name,
+    )
+
+    extension = 'xlsx' if job.format == 'excel' else 'pdf'
+
+    if job.report_type == 'district':
+        report_data = build_district_report(job.district)
+        if job.format == 'excel':
+            file_content = render_district_excel_report(report_data, job.period)
+        else:
+            file_content = render_district_pdf_report(report_data, job.period)
+        return file_content, report_file_name('district_report', job.period, extension)
+
+    start_date, end_date = resolve_report_period(job.period, job.start_date, job.end_date)
+    report_data = filter_island_trends(build_island_report(), start_date, end_date)
+    options = (
+        report_data, job.report_type, job.period,
+        job.include_districts, job.include_centers, job.include_courses, job.include_instructors
+    )
+    if job.format == 'excel':
+        file_content = render_excel_report(*options)
+    else:
+        file_content = render_pdf_report(*options)
+    return file_content, report_file_name('head_office_report', job.period, extension)
+
+
+def run_job(job):
+    """Generate a claimed job's file and record the outcome on the job"""
+    try:
+        file_content, file_name = render_job(job)
+        path = reports_dir() / f"{job.pk}_{file_name}"
+        temp_path = path.with_name(path.name + '.tmp')
+        temp_path.write_bytes(file_content)
+        os.replace(temp_path, path)
+
+        job.file_path = str(path)
+        job.file_name = file_name
+        job.status = 'completed'
+        job.error_message = None
+    except Exception as e:
+        logger.error(f"Error generating report job {job.pk}: {str(e)}")
+        job.status = 'failed'
+        job.error_message = str(e)
+
+    job.completed_at = timezone.now()
+    job.save(update_fields=['file_path', 'file_name', 'status', 'error_message', 'completed_at'])
+    return job
+
+
+def run_worker(poll_interval=5, once=False, stale_after=timedelta(minutes=30)):
+    """Process queued jobs until interrupted (or until the queue is empty with once=True)"""
+    processed = 0
+    while True:
+        requeue_stale_jobs(stale_after)
+        job = claim_next_job()
+        if job:
+            run_job(job)
+            processed += 1
+            continue
+        if once:
+            return processed
+        time.sleep(poll_interval)
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_alter_enrollment_unique_together_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='headofficereport',
+            name='district',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='headofficereport',
+            name='error_message',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='headofficereport',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='headofficereport',
+            name='report_type',
+            field=models.CharField(choices=[('island', 'Island Performance'), ('districts', 'District Comparison'), ('centers', 'Centers Analysis'), ('comprehensive', 'Island-Wide Comprehensive'), ('instructors', 'Instructors Summary'), ('district', 'District Report')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='headofficereport',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='headofficereport',
+            index=models.Index(fields=['status', 'created_at'], name='reports_hea_status_0ae485_idx'),
+        ),
+    ]
@@ -11,6 +11,7 @@ class HeadOfficeReport(models.Model):
         ('centers', 'Centers Analysis'),
         ('comprehensive', 'Island-Wide Comprehensive'),
         ('instructors', 'Instructors Summary'),
+        ('district', 'District Report'),
     ]
     
     PERIOD_CHOICES = [
@@ -34,19 +35,26 @@ class HeadOfficeReport(models.Model):
     include_centers = models.BooleanField(default=True)
     include_courses = models.BooleanField(default=True)
     include_instructors = models.BooleanField(default=True)
+    district = models.CharField(max_length=100, blank=True, null=True)
     generated_by = models.ForeignKey(User, on_delete=models.CASCADE)
     file_path = models.CharField(max_length=500, blank=True, null=True)
     file_name = models.CharField(max_length=255, blank=True, null=True)
-    status = models.CharField(max_length=20, default='processing', choices=[
+    status = models.CharField(max_length=20, default='queued', choices=[
+        ('queued', 'Queued'),
         ('processing', 'Processing'),
         ('completed', 'Completed'),
         ('failed', 'Failed'),
     ])
+    error_message = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
     
     def __str__(self):
         return f"Head Office Report - {self.report_type} - {self.created_at.strftime('%Y-%m-%d')}"
\ No newline at end of file
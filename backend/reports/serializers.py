@@ -10,20 +10,28 @@ class HeadOfficeReportSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'report_type', 'period', 'format', 'start_date', 'end_date',
             'include_districts', 'include_centers', 'include_courses', 'include_instructors',
-            'generated_by', 'generated_by_name', 'file_path', 'file_name', 'status',
-            'created_at', 'completed_at'
+            'district', 'generated_by', 'generated_by_name', 'file_path', 'file_name', 'status',
+            'error_message', 'created_at', 'started_at', 'completed_at'
+        ]
+        read_only_fields = [
+            'district', 'generated_by', 'file_path', 'file_name', 'status',
+            'error_message', 'created_at', 'started_at', 'completed_at'
         ]
-        read_only_fields = ['generated_by', 'file_path', 'file_name', 'status', 'created_at', 'completed_at']
 
 class ReportExportSerializer(serializers.Serializer):
     format = serializers.ChoiceField(choices=['pdf', 'excel'])
     period = serializers.ChoiceField(choices=['weekly', 'monthly', 'quarterly', 'custom'])
     report_type = serializers.ChoiceField(choices=[
-        'island', 'districts', 'centers', 'comprehensive', 'instructors'
+        'island', 'districts', 'centers', 'comprehensive', 'instructors', 'district'
     ])
     start_date = serializers.DateField(required=False, allow_null=True)
     end_date = serializers.DateField(required=False, allow_null=True)
     include_districts = serializers.BooleanField(default=True)
     include_centers = serializers.BooleanField(default=True)
     include_courses = serializers.BooleanField(default=True)
-    include_instructors = serializers.BooleanField(default=True)
\ No newline at end of file
+    include_instructors = serializers.BooleanField(default=True)
+
+    def validate(self, attrs):
+        if attrs['period'] == 'custom' and not (attrs.get('start_date') and attrs.get('end_date')):
+            raise serializers.ValidationError('Start and end dates required for custom period')
+        return attrs
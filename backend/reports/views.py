@@ -3,8 +3,9 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from django.db.models import Count, Avg, Q, F
-from django.http import HttpResponse
+from django.db.models import F
+from django.http import HttpResponse, FileResponse
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from datetime import datetime, timedelta
 import pandas as pd
@@ -13,6 +14,7 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
 import io
+import os
 import logging
 
 from centers.models import Center
@@ -22,8 +24,57 @@ from users.models import User
 from approvals.models import Approval
 from attendance.models import Attendance, AttendanceSummary
 
+from .builders import build_island_report, build_district_report
+from .jobs import submit_report_job
+from .models import HeadOfficeReport
+from .serializers import HeadOfficeReportSerializer, ReportExportSerializer
+
 logger = logging.getLogger(__name__)
 
+EXCEL_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+PDF_CONTENT_TYPE = 'application/pdf'
+
+def report_file_name(prefix, period, extension):
+    return f"{prefix}_{period}_{timezone.now().strftime('%Y%m%d')}.{extension}"
+
+def report_file_response(file_content, file_name):
+    content_type = EXCEL_CONTENT_TYPE if file_name.endswith('.xlsx') else PDF_CONTENT_TYPE
+    response = HttpResponse(file_content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+    return response
+
+def resolve_report_period(period, start_date=None, end_date=None):
+    """Return the (start_date, end_date) a report period covers.
+
+    Raises ValueError when a custom period has missing or malformed dates.
+    """
+    if period == 'custom':
+        if not (start_date and end_date):
+            raise ValueError('Start and end dates required for custom period')
+        if isinstance(start_date, str) or isinstance(end_date, str):
+            try:
+                start_date = datetime.strptime(str(start_date), '%Y-%m-%d').date()
+                end_date = datetime.strptime(str(end_date), '%Y-%m-%d').date()
+            except ValueError:
+                raise ValueError('Invalid date format. Use YYYY-MM-DD')
+        return start_date, end_date
+
+    today = timezone.now().date()
+    if period == 'weekly':
+        start_date = today - timedelta(days=7)
+    elif period == 'monthly':
+        start_date = today - timedelta(days=30)
+    elif period == 'quarterly':
+        start_date = today - timedelta(days=90)
+    else:
+        start_date = today - timedelta(days=30)  # Default monthly
+    return start_date, today
+
+def filter_island_trends(report_data, start_date, end_date):
+    if 'island_trends' in report_data:
+        report_data['island_trends'] = [t for t in report_data['island_trends'] if start_date <= datetime.strptime(t['period'], '%b %Y').date() <= end_date]
+    return report_data
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def head_office_reports(request):
@@ -35,130 +86,7 @@ def head_office_reports(request):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        total_districts = Center.objects.values('district').distinct().count()
-        total_centers = Center.objects.count()
-        total_students = Student.objects.count()
-        total_courses = Course.objects.count()
-        total_instructors = User.objects.filter(role='instructor').count()
-        
-        completed_students = Student.objects.filter(enrollment_status='Completed').count()
-        completion_rate = round((completed_students / total_students * 100) if total_students > 0 else 0, 1)
-        
-        pending_approvals = Approval.objects.filter(status='Pending').count()
-        
-        district_performance = []
-        districts = Center.objects.values('district').distinct()
-        
-        for district_data in districts:
-            district = district_data['district']
-            if not district:
-                continue
-            
-            centers_count = Center.objects.filter(district=district).count()
-            students_count = Student.objects.filter(district=district).count()
-            instructors_count = User.objects.filter(role='instructor', district=district).count()
-            
-            district_completed = Student.objects.filter(
-                district=district, enrollment_status='Completed'
-            ).count()
-            district_completion = round((district_completed / students_count * 100) if students_count > 0 else 0, 1)
-            
-            one_month_ago = timezone.now() - timedelta(days=30)
-            new_students = Student.objects.filter(
-                district=district, created_at__gte=one_month_ago
-            ).count()
-            growth = round((new_students / students_count * 100) if students_count > 0 else 0, 1)
-            
-            district_performance.append({
-                'name': district,
-                'centers': centers_count,
-                'students': students_count,
-                'instructors': instructors_count,
-                'completion': district_completion,
-                'growth': growth
-            })
-        
-        island_trends = []
-        today = timezone.now().date()
-        for i in range(5, -1, -1):
-            start_date = today - timedelta(days=30*(i+1))
-            end_date = today - timedelta(days=30*i)
-            
-            period_enrollments = Student.objects.filter(
-                enrollment_date__range=(start_date, end_date)
-            ).count()
-            
-            period_completions = Student.objects.filter(
-                enrollment_status='Completed',
-                updated_at__range=(start_date, end_date)
-            ).count()
-            
-            period_new_instructors = User.objects.filter(
-                role='instructor',
-                date_joined__range=(start_date, end_date)
-            ).count()
-            
-            island_trends.append({
-                'period': start_date.strftime('%b %Y'),
-                'enrollment': period_enrollments,
-                'completions': period_completions,
-                'new_instructors': period_new_instructors
-            })
-        
-        course_distribution = list(Course.objects.values('category').annotate(
-            value=Count('id')
-        ).order_by('-value')[:5])
-        colors = ['#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF']
-        for idx, course in enumerate(course_distribution):
-            course['color'] = colors[idx % len(colors)]
-            course['name'] = course.pop('category') or 'Uncategorized'
-        
-        top_performing_centers = []
-        centers_with_stats = Center.objects.annotate(
-            total_students=Count('enrolled_students', distinct=True),
-            completed_students=Count('enrolled_students', distinct=True, filter=Q(enrolled_students__enrollment_status='Completed'))
-        ).order_by('-total_students')[:5]
-        
-        for center in centers_with_stats:
-            completion_rate = round(
-                (center.completed_students / center.total_students * 100) if center.total_students > 0 else 0, 
-                1
-            )
-            instructor_count = User.objects.filter(role='instructor', center=center).count()
-            
-            top_performing_centers.append({
-                'name': center.name,
-                'district': center.district,
-                'students': center.total_students,
-                'instructors': instructor_count,
-                'completion': completion_rate
-            })
-        
-        instructor_summary = list(User.objects.filter(role='instructor').values('district').annotate(
-            total=Count('id'),
-            active=Count('id', filter=Q(is_active=True)),
-            avg_rating=Avg('courses_teaching__progress')
-        ).order_by('-total'))
-        
-        for summary in instructor_summary:
-            summary['avg_rating'] = round(summary['avg_rating'] or 0, 1)
-        
-        report_data = {
-            'summary': {
-                'total_districts': total_districts,
-                'total_centers': total_centers,
-                'total_students': total_students,
-                'total_courses': total_courses,
-                'total_instructors': total_instructors,
-                'completion_rate': completion_rate,
-                'pending_approvals': pending_approvals
-            },
-            'district_performance': district_performance,
-            'island_trends': island_trends,
-            'course_distribution': course_distribution,
-            'top_performing_centers': top_performing_centers,
-            'instructor_summary': instructor_summary
-        }
+        report_data = build_island_report()
         
         return Response(report_data)
     
@@ -190,30 +118,12 @@ def export_head_office_report(request):
         include_courses = request.GET.get('include_courses', 'true') == 'true'
         include_instructors = request.GET.get('include_instructors', 'true') == 'true'
         
-        if period == 'custom':
-            if not (start_date_str and end_date_str):
-                return Response({'error': 'Start and end dates required for custom period'}, status=status.HTTP_400_BAD_REQUEST)
-            try:
-                start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-                end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-            except ValueError:
-                return Response({'error': 'Invalid date format. Use YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
-        else:
-            today = timezone.now().date()
-            if period == 'weekly':
-                start_date = today - timedelta(days=7)
-            elif period == 'monthly':
-                start_date = today - timedelta(days=30)
-            elif period == 'quarterly':
-                start_date = today - timedelta(days=90)
-            else:
-                start_date = today - timedelta(days=30)  # Default monthly
-            end_date = today
-        
-        report_data = head_office_reports(request).data
+        try:
+            start_date, end_date = resolve_report_period(period, start_date_str, end_date_str)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        if 'island_trends' in report_data:
-            report_data['island_trends'] = [t for t in report_data['island_trends'] if start_date <= datetime.strptime(t['period'], '%b %Y').date() <= end_date]
+        report_data = filter_island_trends(build_island_report(), start_date, end_date)
         
         if format_type == 'excel':
             return generate_excel_report(report_data, report_type, period, include_districts, include_centers, include_courses, include_instructors)
@@ -226,6 +136,11 @@ def export_head_office_report(request):
 
 def generate_excel_report(report_data, report_type, period, include_districts, include_centers, include_courses, include_instructors):
     """Generate Excel report using pandas"""
+    file_content = render_excel_report(report_data, report_type, period, include_districts, include_centers, include_courses, include_instructors)
+    return report_file_response(file_content, report_file_name('head_office_report', period, 'xlsx'))
+
+def render_excel_report(report_data, report_type, period, include_districts, include_centers, include_courses, include_instructors):
+    """Generate Excel report using pandas, returning the file bytes"""
     try:
         buffer = io.BytesIO()
         with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
@@ -255,9 +170,7 @@ def generate_excel_report(report_data, report_type, period, include_districts, i
         file_content = buffer.getvalue()
         buffer.close()
         
-        response = HttpResponse(file_content, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="head_office_report_{period}_{timezone.now().strftime("%Y%m%d")}.xlsx"'
-        return response
+        return file_content
     
     except Exception as e:
         logger.error(f"Error generating Excel report: {str(e)}")
@@ -265,6 +178,11 @@ def generate_excel_report(report_data, report_type, period, include_districts, i
 
 def generate_pdf_report(report_data, report_type, period, include_districts, include_centers, include_courses, include_instructors):
     """Generate PDF report using reportlab"""
+    file_content = render_pdf_report(report_data, report_type, period, include_districts, include_centers, include_courses, include_instructors)
+    return report_file_response(file_content, report_file_name('head_office_report', period, 'pdf'))
+
+def render_pdf_report(report_data, report_type, period, include_districts, include_centers, include_courses, include_instructors):
+    """Generate PDF report using reportlab, returning the file bytes"""
     try:
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4)
@@ -427,9 +345,7 @@ def generate_pdf_report(report_data, report_type, period, include_districts, inc
         file_content = buffer.getvalue()
         buffer.close()
         
-        response = HttpResponse(file_content, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="head_office_report_{period}_{timezone.now().strftime("%Y%m%d")}.pdf"'
-        return response
+        return file_content
         
     except Exception as e:
         logger.error(f"Error generating PDF report: {str(e)}")
@@ -451,96 +367,7 @@ def district_reports(request):
         if not district:
             return Response({'error': 'No district assigned to user'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Summary statistics (filtered by district)
-        total_centers = Center.objects.filter(district=district).count()
-        total_courses = Course.objects.filter(district=district).count()
-        total_users = User.objects.filter(district=district).count()
-        pending_approvals = Approval.objects.filter(
-            center__icontains=district, status='Pending'  # Assuming center field contains district
-        ).count()
-        active_students = Student.objects.filter(
-            district=district, enrollment_status='Enrolled'
-        ).count()
-        completed_students = Student.objects.filter(
-            district=district, enrollment_status='Completed'
-        ).count()
-        completion_rate = round((completed_students / (active_students + completed_students) * 100) if (active_students + completed_students) > 0 else 0, 1)
-        
-        # Center performance (in district)
-        center_performance = []
-        centers = Center.objects.filter(district=district)[:5]  # Top 5 centers
-        for center in centers:
-            students_count = Student.objects.filter(center=center).count()
-            courses_count = Course.objects.filter(center=center).count()
-            center_completed = Student.objects.filter(
-                center=center, enrollment_status='Completed'
-            ).count()
-            center_completion = round((center_completed / students_count * 100) if students_count > 0 else 0, 1)
-            
-            center_performance.append({
-                'name': center.name,
-                'students': students_count,
-                'courses': courses_count,
-                'completion': center_completion
-            })
-        
-        # Enrollment trend (last 6 months in district)
-        enrollment_trend = []
-        today = timezone.now().date()
-        for i in range(5, -1, -1):
-            start_date = today - timedelta(days=30*(i+1))
-            end_date = today - timedelta(days=30*i)
-            
-            period_enrollments = Student.objects.filter(
-                district=district,
-                enrollment_date__range=(start_date, end_date)
-            ).count()
-            
-            period_approvals = Approval.objects.filter(
-                center__icontains=district,
-                date_requested__range=(start_date, end_date)
-            ).count()
-            
-            enrollment_trend.append({
-                'period': start_date.strftime('%b'),
-                'enrollment': period_enrollments,
-                'approvals': period_approvals
-            })
-        
-        # Course distribution (in district)
-        course_distribution = list(Course.objects.filter(district=district).values('category').annotate(
-            value=Count('id')
-        ).order_by('-value')[:4])
-        colors = ['#3b82f6', '#10b981', '#f59e0b', '#ef4444']
-        for idx, course in enumerate(course_distribution):
-            course['color'] = colors[idx % len(colors)]
-            course['name'] = course.pop('category') or 'Uncategorized'
-        
-        # Recent approvals (in district)
-        recent_approvals = list(Approval.objects.filter(
-            center__icontains=district
-        ).order_by('-date_requested')[:5].values(
-            'id', 'type', 'center', 'status', 'date_requested'
-        ))
-        for approval in recent_approvals:
-            approval['name'] = approval.pop('center')
-            approval['date'] = approval['date_requested'].strftime('%Y-%m-%d')
-            del approval['date_requested']
-        
-        report_data = {
-            'summary': {
-                'totalCenters': {'current': total_centers},
-                'totalCourses': {'current': total_courses},
-                'totalUsers': {'current': total_users},
-                'pendingApprovals': {'current': pending_approvals},
-                'activeStudents': {'current': active_students},
-                'completionRate': {'current': completion_rate}
-            },
-            'centerPerformance': center_performance,
-            'enrollmentTrend': enrollment_trend,
-            'courseDistribution': course_distribution,
-            'recentApprovals': recent_approvals
-        }
+        report_data = build_district_report(district)
         
         return Response(report_data)
     
@@ -564,7 +391,7 @@ def export_district_report(request):
         period = request.GET.get('period', 'monthly')
         
         # Get report data
-        report_data = district_reports(request).data
+        report_data = build_district_report(district)
         
         if format_type == 'excel':
             return generate_district_excel_report(report_data, period)
@@ -577,6 +404,11 @@ def export_district_report(request):
 
 def generate_district_excel_report(report_data, period):
     """Generate Excel for district report"""
+    file_content = render_district_excel_report(report_data, period)
+    return report_file_response(file_content, report_file_name('district_report', period, 'xlsx'))
+
+def render_district_excel_report(report_data, period):
+    """Generate Excel for district report, returning the file bytes"""
     try:
         buffer = io.BytesIO()
         with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
@@ -589,9 +421,7 @@ def generate_district_excel_report(report_data, period):
         file_content = buffer.getvalue()
         buffer.close()
         
-        response = HttpResponse(file_content, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="district_report_{period}_{timezone.now().strftime("%Y%m%d")}.xlsx"'
-        return response
+        return file_content
     
     except Exception as e:
         logger.error(f"Error generating district Excel: {str(e)}")
@@ -599,6 +429,11 @@ def generate_district_excel_report(report_data, period):
 
 def generate_district_pdf_report(report_data, period):
     """Generate PDF for district report"""
+    file_content = render_district_pdf_report(report_data, period)
+    return report_file_response(file_content, report_file_name('district_report', period, 'pdf'))
+
+def render_district_pdf_report(report_data, period):
+    """Generate PDF for district report, returning the file bytes"""
     try:
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4)
@@ -630,9 +465,7 @@ def generate_district_pdf_report(report_data, period):
         file_content = buffer.getvalue()
         buffer.close()
         
-        response = HttpResponse(file_content, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="district_report_{period}_{timezone.now().strftime("%Y%m%d")}.pdf"'
-        return response
+        return file_content
     
     except Exception as e:
         logger.error(f"Error generating district PDF: {str(e)}")
@@ -1070,4 +903,65 @@ def generate_training_pdf_report(report_data, period):
         
     except Exception as e:
         logger.error(f"Error generating training PDF report: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+# ========== BACKGROUND REPORT JOBS ==========
+
+def can_access_report_job(user, job):
+    return user.role == 'admin' or job.generated_by_id == user.id
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def report_jobs(request):
+    """List the user's report jobs, or queue a new PDF/Excel export"""
+    if request.method == 'GET':
+        jobs = HeadOfficeReport.objects.select_related('generated_by')
+        if request.user.role != 'admin':
+            jobs = jobs.filter(generated_by=request.user)
+        return Response(HeadOfficeReportSerializer(jobs[:50], many=True).data)
+    
+    serializer = ReportExportSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    params = serializer.validated_data
+    
+    if params['report_type'] == 'district':
+        if request.user.role != 'district_manager':
+            return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+        if not request.user.district:
+            return Response({'error': 'No district assigned'}, status=status.HTTP_400_BAD_REQUEST)
+        params['district'] = request.user.district
+    elif request.user.role != 'admin':
+        return Response(
+            {'error': 'Access denied - Admin access required'}, 
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    job = submit_report_job(request.user, **params)
+    return Response(HeadOfficeReportSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def report_job_detail(request, job_id):
+    """Poll the status of a queued report"""
+    job = get_object_or_404(HeadOfficeReport.objects.select_related('generated_by'), pk=job_id)
+    if not can_access_report_job(request.user, job):
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    return Response(HeadOfficeReportSerializer(job).data)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def download_report_job(request, job_id):
+    """Download the file produced by a completed report job"""
+    job = get_object_or_404(HeadOfficeReport, pk=job_id)
+    if not can_access_report_job(request.user, job):
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    if job.status != 'completed':
+        return Response(
+            {'error': f'Report is not ready (status: {job.status})'}, 
+            status=status.HTTP_409_CONFLICT
+        )
+    if not job.file_path or not os.path.exists(job.file_path):
+        return Response({'error': 'Report file no longer exists'}, status=status.HTTP_410_GONE)
+    
+    return FileResponse(open(job.file_path, 'rb'), as_attachment=True, filename=job.file_name)
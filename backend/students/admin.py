@@ -1,7 +1,7 @@
 # students/admin.py - COMPLETE UPDATED VERSION
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Student, EducationalQualification, DistrictCode, CourseCode, Batch, BatchYear
+from .models import Student, EducationalQualification, DistrictCode, CourseCode, Batch, BatchYear, RegistrationSequence
 
 @admin.register(DistrictCode)
 class DistrictCodeAdmin(admin.ModelAdmin):
@@ -35,6 +35,14 @@ class BatchAdmin(admin.ModelAdmin):
         return obj.students.count()
     student_count.short_description = 'Students'
 
+@admin.register(RegistrationSequence)
+class RegistrationSequenceAdmin(admin.ModelAdmin):
+    list_display = ['district_code', 'course_code', 'batch_code', 'year', 'last_number', 'updated_at']
+    search_fields = ['district_code', 'course_code']
+    list_filter = ['year', 'batch_code']
+    ordering = ['district_code', 'course_code', 'batch_code', 'year']
+    readonly_fields = ['updated_at']
+
 @admin.register(BatchYear)
 class BatchYearAdmin(admin.ModelAdmin):
     list_display = ['year_code', 'description', 'is_active']
@@ -0,0 +1,115 @@
+# students/exports.py
+import csv
+import tempfile
+
+import xlsxwriter
+from django.conf import settings
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# (queryset field, column header) in export order; a None field exports blank
+EXPORT_COLUMNS = [
+    ('registration_no', 'Registration No'),
+    ('district_code', 'District Code'),
+    ('course_code', 'Course Code'),
+    ('batch__batch_code', 'Batch'),
+    ('batch__batch_name', 'Batch Name'),
+    ('student_number', 'Student Number'),
+    ('registration_year', 'Registration Year'),
+    ('full_name_english', 'Full Name (English)'),
+    ('full_name_sinhala', 'Full Name (Sinhala)'),
+    ('name_with_initials', 'Name with Initials'),
+    ('gender', 'Gender'),
+    ('date_of_birth', 'Date of Birth'),
+    ('nic_id', 'NIC/ID'),
+    ('address_line', 'Address'),
+    ('district', 'District'),
+    ('divisional_secretariat', 'Divisional Secretariat'),
+    ('grama_niladhari_division', 'Grama Niladhari Division'),
+    ('village', 'Village'),
+    (None, 'Residence Type'),  # not stored on Student; kept blank for the column layout
+    ('mobile_no', 'Mobile No'),
+    ('email', 'Email'),
+    ('training_received', 'Training Received'),
+    ('training_provider', 'Training Provider'),
+    ('course_vocation_name', 'Course/Vocation'),
+    ('training_duration', 'Training Duration'),
+    ('training_nature', 'Training Nature'),
+    ('training_establishment', 'Training Establishment'),
+    ('training_placement_preference', 'Placement Preference'),
+    ('center__name', 'Center'),
+    ('course__name', 'Course'),
+    ('enrollment_date', 'Enrollment Date'),
+    ('enrollment_status', 'Enrollment Status'),
+    ('date_of_application', 'Date of Application'),
+]
+
+# The Excel sheet has always labelled the batch code column differently
+EXCEL_HEADER_OVERRIDES = {'Batch': 'Batch Code'}
+
+# Related columns that export as an empty string when the relation is unset
+RELATED_FIELDS = {'batch__batch_code', 'batch__batch_name', 'center__name', 'course__name'}
+
+
+def export_chunk_size():
+    return getattr(settings, 'STUDENT_EXPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def export_headers(excel=False):
+    headers = [header for _, header in EXPORT_COLUMNS]
+    if excel:
+        headers = [EXCEL_HEADER_OVERRIDES.get(header, header) for header in headers]
+    return headers
+
+
+def export_rows(queryset):
+    """Yield export rows, fetching plain tuples from the database in chunks"""
+    fields = [field for field, _ in EXPORT_COLUMNS if field]
+
+    for values in queryset.values_list(*fields).iterator(chunk_size=export_chunk_size()):
+        values = dict(zip(fields, values))
+        row = []
+        for field, _ in EXPORT_COLUMNS:
+            value = values.get(field)
+            if field == 'training_received':
+                value = 'Yes' if value else 'No'
+            elif value is None and (field is None or field in RELATED_FIELDS):
+                value = ''
+            row.append(value)
+        yield row
+
+
+class Echo:
+    """File-like object whose write() hands the value back, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset):
+    """Yield CSV lines one at a time"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(export_headers())
+    for row in export_rows(queryset):
+        yield writer.writerow(row)
+
+
+def write_xlsx(queryset):
+    """Write the export to a temporary file and return it, rewound.
+
+    xlsxwriter's constant_memory mode flushes each row to disk as it is
+    written, so memory use does not grow with the number of students.
+    """
+    output = tempfile.TemporaryFile()
+    workbook = xlsxwriter.Workbook(output, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd',
+        'remove_timezone': True,
+    })
+    worksheet = workbook.add_worksheet('Students')
+    worksheet.write_row(0, 0, export_headers(excel=True))
+    for row_number, row in enumerate(export_rows(queryset), start=1):
+        worksheet.write_row(row_number, 0, row)
+    workbook.close()
+    output.seek(0)
+    return output
@@ -0,0 +1,99 @@
+# students/id_card_jobs.py
+from django.conf import settings
+from django.utils import timezone
+from datetime import timedelta
+from pathlib import Path
+import os
+import time
+import logging
+
+from .id_cards import write_card_sheets
+from .models import Student, IDCardJob
+
+logger = logging.getLogger(__name__)
+
+
+def id_cards_dir():
+    """Directory bulk ID card PDFs are written to"""
+    base = Path(getattr(settings, 'GENERATED_REPORTS_DIR', settings.BASE_DIR / 'generated_reports'))
+    directory = base / 'id_cards'
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def students_in_order(queryset, student_ids):
+    """Students for the cards, in the order they were requested"""
+    students = {
+        student.id: student
+        for student in queryset.filter(id__in=student_ids).select_related('course', 'center')
+    }
+    return [students[student_id] for student_id in student_ids if student_id in students]
+
+
+def submit_id_card_job(user, student_ids, cards_per_page):
+    """Queue a bulk ID card PDF for the worker and return the job row"""
+    return IDCardJob.objects.create(
+        requested_by=user, student_ids=student_ids, cards_per_page=cards_per_page, status='queued'
+    )
+
+
+def claim_next_job():
+    """Atomically move the oldest queued job to processing (see reports.jobs.claim_next_job)"""
+    candidates = IDCardJob.objects.filter(status='queued').order_by('created_at').values_list('pk', flat=True)[:10]
+    for pk in candidates:
+        claimed = IDCardJob.objects.filter(pk=pk, status='queued').update(
+            status='processing',
+            started_at=timezone.now()
+        )
+        if claimed:
+            return IDCardJob.objects.get(pk=pk)
+    return None
+
+
+def requeue_stale_jobs(stale_after):
+    """Return jobs stuck in processing (e.g. after a worker crash) to the queue"""
+    cutoff = timezone.now() - stale_after
+    return IDCardJob.objects.filter(status='processing', started_at__lt=cutoff).update(
+        status='queued',
+        started_at=None
+    )
+
+
+def run_job(job):
+    """Render a claimed job's cards to a file and record the outcome on the job"""
+    try:
+        file_name = f"student_id_cards_{job.created_at.strftime('%Y%m%d_%H%M')}.pdf"
+        path = id_cards_dir() / f"{job.pk}_{file_name}"
+        temp_path = path.with_name(path.name + '.tmp')
+        students = students_in_order(Student.objects.all(), job.student_ids)
+        with open(temp_path, 'wb') as output:
+            job.card_count = write_card_sheets(students, output, job.cards_per_page)
+        os.replace(temp_path, path)
+
+        job.file_path = str(path)
+        job.file_name = file_name
+        job.status = 'completed'
+        job.error_message = None
+    except Exception as e:
+        logger.error(f"Error generating ID card job {job.pk}: {str(e)}")
+        job.status = 'failed'
+        job.error_message = str(e)
+
+    job.completed_at = timezone.now()
+    job.save(update_fields=['card_count', 'file_path', 'file_name', 'status', 'error_message', 'completed_at'])
+    return job
+
+
+def run_worker(poll_interval=5, once=False, stale_after=timedelta(minutes=30)):
+    """Process queued jobs until interrupted (or until the queue is empty with once=True)"""
+    processed = 0
+    while True:
+        requeue_stale_jobs(stale_after)
+        job = claim_next_job()
+        if job:
+            run_job(job)
+            processed += 1
+            continue
+        if once:
+            return processed
+        time.sleep(poll_interval)
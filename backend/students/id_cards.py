@@ -0,0 +1,158 @@
+# students/id_cards.py
+import io
+import tempfile
+from datetime import datetime
+
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from .qr import qr_payload, qr_png, qr_pngs
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+
+# The card as laid out on the single ID card page, in its own coordinates
+CARD_WIDTH = PAGE_WIDTH - 100
+CARD_HEIGHT = 320
+# Where the single ID card page places the card
+SINGLE_CARD_ORIGIN = (50, PAGE_HEIGHT - 380)
+
+# Cards per A4 sheet -> (columns, rows)
+SHEET_LAYOUTS = {1: (1, 1), 2: (1, 2), 4: (2, 2), 6: (2, 3), 8: (2, 4)}
+SHEET_MARGIN = 20
+SHEET_GUTTER = 10
+
+DEFAULT_CARDS_PER_PAGE = 2
+DEFAULT_SYNC_LIMIT = 500
+
+
+def cards_per_page_default():
+    return getattr(settings, 'ID_CARDS_PER_PAGE', DEFAULT_CARDS_PER_PAGE)
+
+
+def id_card_sync_limit():
+    return getattr(settings, 'ID_CARD_SYNC_LIMIT', DEFAULT_SYNC_LIMIT)
+
+
+def card_data(student, generated_at):
+    """Plain dict of everything printed on a student's card"""
+    return {
+        'student_id': student.id,
+        'registration_no': student.registration_no,
+        'full_name': student.full_name_english,
+        'nic_id': student.nic_id,
+        'course_name': student.course.name if student.course else 'Not assigned',
+        'center_name': student.center.name if student.center else 'Not assigned',
+        'district': student.district,
+        'generated_at': generated_at,
+    }
+
+
+def card_qr_payload(card):
+    return qr_payload(card['student_id'], card['registration_no'], card['full_name'])
+
+
+def draw_card(p, card, qr_image, outline=False):
+    """Draw one ID card with its lower-left corner at the current origin"""
+    width = PAGE_WIDTH
+
+    if outline:
+        # Cutting guide on multi-card sheets
+        p.setStrokeColorRGB(0.8, 0.8, 0.8)
+        p.rect(0, 0, CARD_WIDTH, CARD_HEIGHT, fill=0, stroke=1)
+
+    # Header
+    p.setFillColorRGB(0, 0.5, 0)  # Green
+    p.rect(0, 280, CARD_WIDTH, 40, fill=1, stroke=0)
+    p.setFillColorRGB(1, 1, 1)  # White
+    p.setFont("Helvetica-Bold", 20)
+    p.drawCentredString(width/2 - 50, 300, "Student ID Card")
+    p.setFont("Helvetica", 12)
+    p.drawCentredString(width/2 - 50, 275, "Vocational Training Authority")
+
+    # Student info
+    p.setFillColorRGB(0, 0, 0)  # Black
+    p.setFont("Helvetica-Bold", 14)
+    p.drawString(20, 230, f"Name: {card['full_name']}")
+    p.setFont("Helvetica", 12)
+    p.drawString(20, 210, f"Registration No: {card['registration_no']}")
+    p.drawString(20, 190, f"NIC: {card['nic_id']}")
+    p.drawString(20, 170, f"Course: {card['course_name']}")
+    p.drawString(20, 150, f"Center: {card['center_name']}")
+    p.drawString(20, 130, f"District: {card['district']}")
+
+    # QR Code
+    p.drawImage(ImageReader(io.BytesIO(qr_image)), width - 200, 80, width=100, height=100)
+    p.setFont("Helvetica", 10)
+    p.drawCentredString(width - 150, 70, "Scan for Attendance")
+
+    # Footer
+    p.setFont("Helvetica-Oblique", 10)
+    p.drawString(20, 30, f"Generated on: {card['generated_at'].strftime('%Y-%m-%d %H:%M')}")
+    p.drawString(20, 15, "Valid until course completion")
+
+
+def single_card_pdf(student):
+    """One A4 page with the student's ID card, as PDF bytes"""
+    card = card_data(student, datetime.now())
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    p.translate(*SINGLE_CARD_ORIGIN)
+    draw_card(p, card, qr_png(card_qr_payload(card)))
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def sheet_slots(cards_per_page):
+    """(x, y, scale) for each card position on a sheet, top-left first"""
+    columns, rows = SHEET_LAYOUTS[cards_per_page]
+    cell_width = (PAGE_WIDTH - 2 * SHEET_MARGIN - (columns - 1) * SHEET_GUTTER) / columns
+    cell_height = (PAGE_HEIGHT - 2 * SHEET_MARGIN - (rows - 1) * SHEET_GUTTER) / rows
+    scale = min(cell_width / CARD_WIDTH, cell_height / CARD_HEIGHT, 1)
+
+    slots = []
+    for row in range(rows):
+        for column in range(columns):
+            # Centre the scaled card in its cell
+            x = SHEET_MARGIN + column * (cell_width + SHEET_GUTTER) + (cell_width - CARD_WIDTH * scale) / 2
+            top = PAGE_HEIGHT - SHEET_MARGIN - row * (cell_height + SHEET_GUTTER)
+            y = top - (cell_height + CARD_HEIGHT * scale) / 2
+            slots.append((x, y, scale))
+    return slots
+
+
+def write_card_sheets(students, output, cards_per_page=None, workers=None):
+    """Impose ID cards for ``students`` onto A4 sheets and write the PDF to ``output``.
+
+    Returns the number of cards written.
+    """
+    cards_per_page = cards_per_page or cards_per_page_default()
+    generated_at = datetime.now()
+    cards = [card_data(student, generated_at) for student in students]
+    qr_images = qr_pngs([card_qr_payload(card) for card in cards], workers)
+
+    slots = sheet_slots(cards_per_page)
+    p = canvas.Canvas(output, pagesize=A4)
+    for index, (card, qr_image) in enumerate(zip(cards, qr_images)):
+        x, y, scale = slots[index % cards_per_page]
+        p.saveState()
+        p.translate(x, y)
+        p.scale(scale, scale)
+        draw_card(p, card, qr_image, outline=True)
+        p.restoreState()
+        if index % cards_per_page == cards_per_page - 1:
+            p.showPage()
+    if not cards or len(cards) % cards_per_page:
+        p.showPage()
+    p.save()
+    return len(cards)
+
+
+def card_sheets_file(students, cards_per_page=None, workers=None):
+    """ID card sheets in a temporary file, rewound for streaming"""
+    output = tempfile.TemporaryFile()
+    write_card_sheets(students, output, cards_per_page, workers)
+    output.seek(0)
+    return output
@@ -0,0 +1,273 @@
+# students/imports.py
+from collections import Counter, defaultdict
+
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from attendance.roster import invalidate_rosters
+from centers.models import Center
+from courses.models import Course
+from overview.cache import invalidate_dashboard_cache
+from .models import Student, Batch, RegistrationSequence
+from .reference import reference_data
+from .search import index_students
+
+DEFAULT_CHUNK_SIZE = 500
+
+# (column header, Student field, default for a missing or empty cell)
+IMPORT_COLUMNS = [
+    ('Full Name (English)', 'full_name_english', ''),
+    ('Full Name (Sinhala)', 'full_name_sinhala', ''),
+    ('Name with Initials', 'name_with_initials', ''),
+    ('Gender', 'gender', 'Male'),
+    ('Date of Birth', 'date_of_birth', ''),
+    ('NIC/ID', 'nic_id', ''),
+    ('Address', 'address_line', ''),
+    ('District', 'district', ''),
+    ('Divisional Secretariat', 'divisional_secretariat', ''),
+    ('Grama Niladhari Division', 'grama_niladhari_division', ''),
+    ('Village', 'village', ''),
+    ('Mobile No', 'mobile_no', ''),
+    ('Email', 'email', ''),
+    ('Training Received', 'training_received', 'No'),
+    ('Training Provider', 'training_provider', ''),
+    ('Course/Vocation', 'course_vocation_name', ''),
+    ('Training Duration', 'training_duration', ''),
+    ('Training Nature', 'training_nature', 'Initial'),
+    ('Training Establishment', 'training_establishment', ''),
+    ('Placement Preference', 'training_placement_preference', '1st'),
+    ('Enrollment Date', 'enrollment_date', ''),
+    ('Enrollment Status', 'enrollment_status', 'Pending'),
+    ('Center', 'center', ''),
+    ('Course', 'course', ''),
+    ('Batch Code', 'batch', '01'),
+]
+
+REQUIRED_FIELDS = [
+    'full_name_english', 'name_with_initials', 'date_of_birth', 'nic_id', 'district',
+    'divisional_secretariat', 'grama_niladhari_division', 'village', 'mobile_no',
+]
+
+CHOICE_FIELDS = {
+    'gender': Student.GENDER_CHOICES,
+    'training_nature': Student.TRAINING_NATURE_CHOICES,
+    'training_placement_preference': Student.PLACEMENT_PREFERENCE_CHOICES,
+    'enrollment_status': Student.ENROLLMENT_STATUS_CHOICES,
+}
+
+MOBILE_PATTERN = r'\+?1?\d{9,15}'
+EMAIL_PATTERN = r'[^@\s]+@[^@\s]+\.[^@\s]+'
+
+
+def import_chunk_size():
+    return getattr(settings, 'STUDENT_IMPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def read_import_file(file):
+    """Load an uploaded CSV/Excel file as strings, or return None for other formats"""
+    if file.name.endswith('.csv'):
+        return pd.read_csv(file, dtype=str, keep_default_na=False)
+    if file.name.endswith(('.xls', '.xlsx')):
+        return pd.read_excel(file, dtype=str, keep_default_na=False)
+    return None
+
+
+class StudentImport:
+    """Validate and insert a student spreadsheet in bulk.
+
+    Every check runs column-wise over the whole frame, related objects are
+    resolved from dictionaries built with one query each, and valid rows are
+    inserted with chunked ``bulk_create`` in a single transaction. Rows with
+    errors are skipped and reported by their 1-based position in the file.
+    """
+
+    def __init__(self, df, user):
+        self.user = user
+        self.errors = defaultdict(dict)  # frame index -> {field: message}
+        self.df = self._normalize(df)
+
+    def _normalize(self, df):
+        df = df.rename(columns=lambda column: str(column).strip())
+        frame = pd.DataFrame(index=df.index)
+        for header, field, default in IMPORT_COLUMNS:
+            values = df[header].fillna('').astype(str).str.strip() if header in df else pd.Series('', index=df.index)
+            frame[field] = values.mask(values == '', default)
+
+        if self.user.role == 'data_entry' and self.user.district:
+            frame['district'] = self.user.district
+        return frame
+
+    def _fail(self, mask, field, message):
+        for index in mask[mask].index:
+            self.errors[index].setdefault(field, message)
+
+    # ---- validation ----
+
+    def validate(self):
+        df = self.df
+
+        for field in REQUIRED_FIELDS:
+            self._fail(df[field] == '', field, 'This field is required.')
+
+        for field, choices in CHOICE_FIELDS.items():
+            valid = [value for value, _ in choices]
+            self._fail(~df[field].isin(valid), field, f'Must be one of: {", ".join(valid)}.')
+
+        for field in df.columns:
+            max_length = getattr(Student._meta.get_field(field), 'max_length', None)
+            if max_length and field not in ('center', 'course', 'batch'):
+                self._fail(df[field].str.len() > max_length, field, f'Ensure this field has no more than {max_length} characters.')
+
+        self._fail((df['mobile_no'] != '') & ~df['mobile_no'].str.fullmatch(MOBILE_PATTERN), 'mobile_no', 'Enter a valid mobile number.')
+        self._fail((df['email'] != '') & ~df['email'].str.fullmatch(EMAIL_PATTERN), 'email', 'Enter a valid email address.')
+
+        df['date_of_birth'] = self._parse_dates('date_of_birth')
+        df['enrollment_date'] = self._parse_dates('enrollment_date')
+        df['training_received'] = df['training_received'].str.lower() == 'yes'
+
+        nic_ids = df['nic_id']
+        self._fail((nic_ids != '') & nic_ids.duplicated(keep='first'), 'nic_id', 'Duplicate NIC/ID in this file.')
+        existing = set(Student.objects.filter(nic_id__in=set(nic_ids) - {''}).values_list('nic_id', flat=True))
+        self._fail(nic_ids.isin(existing), 'nic_id', 'A student with this NIC/ID already exists.')
+
+        self._resolve_relations()
+
+    def _parse_dates(self, field):
+        values = self.df[field]
+        parsed = pd.to_datetime(values, errors='coerce', format='ISO8601')
+        self._fail((values != '') & parsed.isna(), field, 'Enter a valid date (YYYY-MM-DD).')
+        return parsed.dt.date.where(parsed.notna(), None)
+
+    def _resolve_relations(self):
+        df = self.df
+        # Centers and courses are matched within the importer's district when
+        # they have one, otherwise within the student's own district
+        scope = pd.Series(self.user.district, index=df.index) if self.user.district else df['district']
+
+        centers = {
+            (center.district, center.name): center
+            for center in Center.objects.filter(name__in=set(df['center']) - {''})
+        }
+        courses = {
+            (course.district, course.name): course
+            for course in Course.objects.filter(name__in=set(df['course']) - {''})
+        }
+        df['center'] = [centers.get(key) for key in zip(scope, df['center'])]
+        df['course'] = [courses.get(key) for key in zip(scope, df['course'])]
+
+        self._fail(
+            pd.Series([bool(c and c.district != d) for c, d in zip(df['center'], df['district'])], index=df.index),
+            'center', 'Selected center must be in the same district as the student.'
+        )
+        self._fail(
+            pd.Series([bool(c and c.district != d) for c, d in zip(df['course'], df['district'])], index=df.index),
+            'course', 'Selected course must be in the same district as the student.'
+        )
+
+        reference = reference_data()
+        batches = {code: reference.batch_by_code(code) for code in set(df['batch'].str.zfill(2))}
+        default_batch = self._default_batch() if not all(batches.values()) else None
+        df['batch'] = [batches[code] or default_batch for code in df['batch'].str.zfill(2)]
+
+    def _default_batch(self):
+        default_batch = reference_data().default_batch()
+        if default_batch:
+            return default_batch
+        default_batch, _ = Batch.objects.get_or_create(
+            batch_code='01',
+            defaults={
+                'batch_name': '1st Batch',
+                'description': 'Default 1st Batch',
+                'is_active': True,
+                'display_order': 1
+            }
+        )
+        return default_batch
+
+    # ---- registration numbers ----
+
+    def _registration_codes(self, valid):
+        """Fill district/course codes and registration years the way Student.save() would"""
+        reference = reference_data()
+        district_codes = {}
+        for district in set(valid['district']):
+            match = reference.district_code_for(district)
+            district_codes[district] = match.district_code if match else district[:3].upper() or 'GEN'
+        valid['district_code'] = valid['district'].map(district_codes)
+
+        course_codes = {}
+        for course in {course for course in valid['course'] if course}:
+            match = reference.course_code_for(course.name)
+            course_codes[course.id] = match.course_code if match else (course.code[:3].upper() if course.code else 'GEN')
+        valid['course_code'] = [course_codes[course.id] if course else 'GEN' for course in valid['course']]
+
+        current_year = str(timezone.now().year)
+        valid['registration_year'] = [str(date.year) if date else current_year for date in valid['enrollment_date']]
+
+    def _allocate_student_numbers(self, valid):
+        """Reserve one block of student numbers per registration number prefix"""
+        prefixes = list(zip(
+            valid['district_code'],
+            valid['course_code'],
+            [batch.batch_code for batch in valid['batch']],
+            valid['registration_year'],
+        ))
+        next_numbers = {
+            prefix: RegistrationSequence.reserve(*prefix, count=count)
+            for prefix, count in Counter(prefixes).items()
+        }
+
+        numbers = []
+        for prefix in prefixes:
+            numbers.append(next_numbers[prefix])
+            next_numbers[prefix] += 1
+        valid['student_number'] = numbers
+
+    # ---- insert ----
+
+    def run(self):
+        """Validate, insert the valid rows and return the number imported"""
+        self.validate()
+        valid = self.df.drop(index=list(self.errors)).copy()
+        if valid.empty:
+            return 0
+
+        with transaction.atomic():
+            self._registration_codes(valid)
+            self._allocate_student_numbers(valid)
+            valid['registration_no'] = [
+                f"{district_code}/{course_code}/{batch.batch_code}/{number:04d}/{year}"
+                for district_code, course_code, batch, number, year in zip(
+                    valid['district_code'], valid['course_code'], valid['batch'],
+                    valid['student_number'], valid['registration_year']
+                )
+            ]
+
+            taken = set(Student.objects.filter(
+                registration_no__in=list(valid['registration_no'])
+            ).values_list('registration_no', flat=True))
+            clashes = valid['registration_no'].isin(taken)
+            self._fail(clashes, 'registration_no', 'Generated registration number already exists.')
+            valid = valid[~clashes]
+
+            students = [
+                Student(batch_year=row['batch'].batch_code, created_by=self.user, **row)
+                for row in valid.to_dict('records')
+            ]
+            Student.objects.bulk_create(students, batch_size=import_chunk_size())
+            index_students(Student.objects.filter(id__in=[student.id for student in students]))
+
+        # bulk_create skips post_save, so expire what those receivers would have
+        for district in set(valid['district']):
+            invalidate_dashboard_cache(district)
+        invalidate_rosters()
+        return len(students)
+
+    def error_report(self):
+        """Per-row errors, numbered like the original row-by-row importer"""
+        return [
+            {'row': index + 1, 'errors': self.errors[index]}
+            for index in sorted(self.errors)
+        ]
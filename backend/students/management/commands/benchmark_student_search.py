@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from students.models import Student
+from students.search import search_backend, search_students
+
+
+class Command(BaseCommand):
+    help = 'Compare the indexed student search against the original icontains chain'
+
+    def add_arguments(self, parser):
+        parser.add_argument('terms', nargs='+', help='Search terms to time')
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Runs per term; the median is reported'
+        )
+
+    def _time(self, term, backend, repeat):
+        timings = []
+        for _ in range(repeat):
+            queryset = search_students(Student.objects.all(), term, backend=backend)
+            started = time.perf_counter()
+            ids = list(queryset.values_list('id', flat=True)[:50])
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return timings[len(timings) // 2], ids
+
+    def handle(self, *args, **options):
+        backend = search_backend()
+        repeat = max(options['repeat'], 1)
+        self.stdout.write(f'{Student.objects.count()} students, index backend: {backend}')
+        self.stdout.write(f"{'term':<24}{'legacy ms':>12}{'index ms':>12}{'legacy hits':>13}{'index hits':>12}")
+
+        for term in options['terms']:
+            legacy_ms, legacy_ids = self._time(term, 'legacy', repeat)
+            index_ms, index_ids = self._time(term, backend, repeat)
+            self.stdout.write(
+                f'{term:<24}{legacy_ms:>12.2f}{index_ms:>12.2f}{len(legacy_ids):>13}{len(index_ids):>12}'
+            )
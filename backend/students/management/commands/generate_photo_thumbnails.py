@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from students.models import Student
+from students.photos import derivatives_current, generate_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Generate avatar and ID card thumbnails for student photos that do not have them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate thumbnails that are already current')
+
+    def handle(self, *args, **options):
+        students = Student.objects.exclude(profile_photo='').exclude(profile_photo__isnull=True).only(
+            'id', 'profile_photo', 'profile_photo_thumbnails'
+        ).order_by('id')
+
+        generated = skipped = failed = 0
+        for student in students.iterator(chunk_size=200):
+            if derivatives_current(student) and not options['force']:
+                skipped += 1
+                continue
+            try:
+                generate_derivatives(student)
+                generated += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f'student {student.id} ({student.profile_photo.name}): {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated thumbnails for {generated} photos, {skipped} already current, {failed} failed'
+        ))
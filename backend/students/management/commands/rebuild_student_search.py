@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from students.search import index_students
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search document of every student'
+
+    def handle(self, *args, **options):
+        indexed = index_students()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} students'))
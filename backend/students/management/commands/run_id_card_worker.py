@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from datetime import timedelta
+
+from students.id_card_jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = 'Generate queued bulk ID card PDFs in the background'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue and exit instead of polling forever'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between polls when the queue is empty'
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=30,
+            help='Requeue jobs that have been processing for more than this many minutes'
+        )
+
+    def handle(self, *args, **options):
+        processed = run_worker(
+            poll_interval=options['poll_interval'],
+            once=options['once'],
+            stale_after=timedelta(minutes=options['stale_after'])
+        )
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} ID card jobs'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from students.models import RegistrationSequence
+
+
+class Command(BaseCommand):
+    help = 'Seed registration number sequences from the student numbers already in use'
+
+    def handle(self, *args, **options):
+        created, raised = RegistrationSequence.backfill()
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} registration sequences, raised {raised} existing ones'
+        ))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0006_remove_student_residence_type_student_marital_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistrationSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('district_code', models.CharField(max_length=10)),
+                ('course_code', models.CharField(max_length=10)),
+                ('batch_code', models.CharField(max_length=2)),
+                ('year', models.CharField(max_length=4)),
+                ('last_number', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Registration Sequence',
+                'verbose_name_plural': 'Registration Sequences',
+                'unique_together': {('district_code', 'course_code', 'batch_code', 'year')},
+            },
+        ),
+    ]
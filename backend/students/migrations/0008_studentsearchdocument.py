@@ -0,0 +1,105 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Kept in sync with students.search.SEARCH_FIELDS when the table is populated
+SEARCH_FIELDS = [
+    'registration_no', 'full_name_english', 'full_name_sinhala', 'name_with_initials',
+    'nic_id', 'district', 'email', 'district_code', 'course_code',
+    'center__name', 'course__name', 'batch__batch_code', 'batch__batch_name',
+]
+
+SQLITE_FORWARD = [
+    """CREATE VIRTUAL TABLE students_search_fts USING fts5(
+        document,
+        content='students_studentsearchdocument',
+        content_rowid='student_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER students_search_fts_insert AFTER INSERT ON students_studentsearchdocument BEGIN
+        INSERT INTO students_search_fts(rowid, document) VALUES (new.student_id, new.document);
+    END""",
+    """CREATE TRIGGER students_search_fts_delete AFTER DELETE ON students_studentsearchdocument BEGIN
+        INSERT INTO students_search_fts(students_search_fts, rowid, document) VALUES ('delete', old.student_id, old.document);
+    END""",
+    """CREATE TRIGGER students_search_fts_update AFTER UPDATE ON students_studentsearchdocument BEGIN
+        INSERT INTO students_search_fts(students_search_fts, rowid, document) VALUES ('delete', old.student_id, old.document);
+        INSERT INTO students_search_fts(rowid, document) VALUES (new.student_id, new.document);
+    END""",
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS students_search_fts_update',
+    'DROP TRIGGER IF EXISTS students_search_fts_delete',
+    'DROP TRIGGER IF EXISTS students_search_fts_insert',
+    'DROP TABLE IF EXISTS students_search_fts',
+]
+
+POSTGRES_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    """ALTER TABLE students_studentsearchdocument ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', document)) STORED""",
+    'CREATE INDEX students_search_vector_idx ON students_studentsearchdocument USING gin (search_vector)',
+    'CREATE INDEX students_search_trgm_idx ON students_studentsearchdocument USING gin (document gin_trgm_ops)',
+]
+
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS students_search_trgm_idx',
+    'DROP INDEX IF EXISTS students_search_vector_idx',
+    'ALTER TABLE students_studentsearchdocument DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_FORWARD)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_REVERSE)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_REVERSE)
+
+
+def populate_documents(apps, schema_editor):
+    Student = apps.get_model('students', 'Student')
+    StudentSearchDocument = apps.get_model('students', 'StudentSearchDocument')
+    documents = [
+        StudentSearchDocument(
+            student_id=student_id,
+            document=' '.join(str(value) for value in values if value)
+        )
+        for student_id, *values in Student.objects.order_by().values_list('id', *SEARCH_FIELDS).iterator()
+    ]
+    StudentSearchDocument.objects.bulk_create(documents, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0007_registrationsequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSearchDocument',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='students.student')),
+                ('document', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(populate_documents, migrations.RunPython.noop),
+    ]
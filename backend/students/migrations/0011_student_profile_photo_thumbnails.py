@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0010_idcardjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='profile_photo_thumbnails',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0011_student_profile_photo_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSearchIndex',
+            fields=[
+                ('student', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='students.student')),
+                ('document', models.TextField()),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'students_search_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# The trigram tokenizer (SQLite 3.34+) matches any substring of three or more
+# characters, where unicode61 only matched whole words or prefixes. The
+# triggers from 0008 refer to the table by name and are left in place.
+SQLITE_TABLE = """CREATE VIRTUAL TABLE students_search_fts USING fts5(
+    document,
+    content='students_studentsearchdocument',
+    content_rowid='student_id',
+    tokenize='{tokenizer}'
+)"""
+
+
+def _rebuild(schema_editor, tokenizer):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS students_search_fts')
+    schema_editor.execute(SQLITE_TABLE.format(tokenizer=tokenizer))
+    schema_editor.execute("INSERT INTO students_search_fts(students_search_fts) VALUES ('rebuild')")
+
+
+def use_trigrams(apps, schema_editor):
+    _rebuild(schema_editor, 'trigram')
+
+
+def use_words(apps, schema_editor):
+    _rebuild(schema_editor, 'unicode61 remove_diacritics 2')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0012_studentsearchindex'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_trigrams, use_words),
+    ]
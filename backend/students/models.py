@@ -1,5 +1,5 @@
 # students/models.py - COMPLETE FIXED VERSION
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import RegexValidator
 from django.utils import timezone
@@ -70,6 +70,108 @@ class BatchYear(models.Model):
     def __str__(self):
         return f"{self.year_code} - {self.description}"
 
+class RegistrationSequence(models.Model):
+    """Last student number handed out for each registration number prefix"""
+    district_code = models.CharField(max_length=10)
+    course_code = models.CharField(max_length=10)
+    batch_code = models.CharField(max_length=2)
+    year = models.CharField(max_length=4)
+    last_number = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Registration Sequence"
+        verbose_name_plural = "Registration Sequences"
+        unique_together = ['district_code', 'course_code', 'batch_code', 'year']
+    
+    def __str__(self):
+        return f"{self.district_code}/{self.course_code}/{self.batch_code}/{self.year}: {self.last_number}"
+    
+    @classmethod
+    def highest_assigned(cls, district_code, course_code, batch_code, year):
+        """Highest student number already used by students with this prefix"""
+        return Student.objects.filter(
+            district_code=district_code,
+            course_code=course_code,
+            batch__batch_code=batch_code,
+            registration_year=year
+        ).aggregate(highest=models.Max('student_number'))['highest'] or 0
+    
+    @classmethod
+    def reserve(cls, district_code, course_code, batch_code, year, count=1):
+        """Reserve ``count`` consecutive student numbers and return the first.
+        
+        The number is taken with a single ``UPDATE ... SET last_number =
+        last_number + count``, which write-locks the row (and on SQLite the
+        database) until the caller's transaction ends, so concurrent
+        registrations with the same prefix wait their turn and never share a
+        number. A missing sequence is seeded from the students already registered.
+        """
+        key = {
+            'district_code': district_code,
+            'course_code': course_code,
+            'batch_code': batch_code,
+            'year': year,
+        }
+        
+        def advance():
+            return cls.objects.filter(**key).update(
+                last_number=models.F('last_number') + count,
+                updated_at=timezone.now()
+            )
+        
+        with transaction.atomic():
+            if not advance():
+                cls.objects.get_or_create(**key, defaults={'last_number': cls.highest_assigned(**key)})
+                advance()
+            # Re-read inside the transaction: nobody else can have moved it since
+            last_number = cls.objects.filter(**key).values_list('last_number', flat=True).get()
+        return last_number - count + 1
+    
+    @classmethod
+    def backfill(cls):
+        """Raise every sequence to the highest number its students already use.
+        
+        Returns the number of sequences created and the number raised.
+        """
+        highest = Student.objects.exclude(batch=None).values(
+            'district_code', 'course_code', 'batch__batch_code', 'registration_year'
+        ).annotate(highest=models.Max('student_number'))
+        
+        created = raised = 0
+        with transaction.atomic():
+            existing = {
+                (seq.district_code, seq.course_code, seq.batch_code, seq.year): seq
+                for seq in cls.objects.select_for_update()
+            }
+            for row in highest:
+                key = (row['district_code'], row['course_code'], row['batch__batch_code'], row['registration_year'])
+                sequence = existing.get(key)
+                if sequence is None:
+                    cls.objects.create(
+                        district_code=key[0], course_code=key[1], batch_code=key[2], year=key[3],
+                        last_number=row['highest']
+                    )
+                    created += 1
+                elif sequence.last_number < row['highest']:
+                    sequence.last_number = row['highest']
+                    sequence.save(update_fields=['last_number', 'updated_at'])
+                    raised += 1
+        return created, raised
+    
+    @classmethod
+    def peek(cls, district_code, course_code, batch_code, year):
+        """Next number that would be reserved, without reserving it"""
+        sequence = cls.objects.filter(
+            district_code=district_code,
+            course_code=course_code,
+            batch_code=batch_code,
+            year=year
+        ).first()
+        if sequence:
+            return sequence.last_number + 1
+        return cls.highest_assigned(district_code, course_code, batch_code, year) + 1
+
 class Student(models.Model):
     GENDER_CHOICES = [
         ('Male', 'Male'),
@@ -150,6 +252,8 @@ class Student(models.Model):
         blank=True,
         help_text='Student profile photo'
     )
+    # Resized copies of profile_photo by variant, written by students.photos
+    profile_photo_thumbnails = models.JSONField(default=dict, blank=True)
     
     # Center and Course Information
     center = models.ForeignKey(
@@ -187,6 +291,7 @@ class Student(models.Model):
             models.Index(fields=['nic_id']),
             models.Index(fields=['district']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['created_at', 'id']),
             models.Index(fields=['center']),
             models.Index(fields=['course']),
             models.Index(fields=['district_code']),
@@ -207,14 +312,14 @@ class Student(models.Model):
             batch_code = self.batch.batch_code if self.batch else "01"
             return f"{self.district_code}/{self.course_code}/{batch_code}/{self.student_number:04d}/{self.registration_year}"
         
+        from .reference import reference_data
+        reference = reference_data()
         current_year = timezone.now().year
         
         # Get district code
         if not self.district_code:
             try:
-                district_code_obj = DistrictCode.objects.filter(
-                    district_name__iexact=self.district
-                ).first()
+                district_code_obj = reference.district_code_for(self.district)
                 if district_code_obj:
                     self.district_code = district_code_obj.district_code
                 else:
@@ -227,9 +332,7 @@ class Student(models.Model):
             self.course_code = "GEN"
             if self.course:
                 try:
-                    course_code_obj = CourseCode.objects.filter(
-                        course_name__icontains=self.course.name
-                    ).first()
+                    course_code_obj = reference.course_code_for(self.course.name)
                     if course_code_obj:
                         self.course_code = course_code_obj.course_code
                     elif self.course.code:
@@ -240,7 +343,7 @@ class Student(models.Model):
         
         # Get batch
         if not self.batch:
-            default_batch = Batch.objects.filter(is_active=True).order_by('display_order').first()
+            default_batch = reference.default_batch()
             if default_batch:
                 self.batch = default_batch
             else:
@@ -255,16 +358,6 @@ class Student(models.Model):
                 )
                 self.batch = default_batch
         
-        # Get student number
-        if not self.student_number or self.student_number == 0:
-            students_in_batch = Student.objects.filter(
-                district=self.district,
-                course=self.course,
-                batch=self.batch
-            ).exclude(id=self.id)
-            
-            self.student_number = students_in_batch.count() + 1
-        
         # Get registration year
         if not self.registration_year:
             if self.enrollment_date:
@@ -272,6 +365,15 @@ class Student(models.Model):
             else:
                 self.registration_year = str(current_year)
         
+        # Get student number
+        if not self.student_number or self.student_number == 0:
+            self.student_number = RegistrationSequence.reserve(
+                self.district_code,
+                self.course_code,
+                self.batch.batch_code,
+                self.registration_year
+            )
+        
         batch_code = self.batch.batch_code if self.batch else "01"
         return f"{self.district_code}/{self.course_code}/{batch_code}/{self.student_number:04d}/{self.registration_year}"
     
@@ -300,6 +402,49 @@ class Student(models.Model):
     def __str__(self):
         return f"{self.registration_no} - {self.full_name_english}"
 
+class StudentSearchDocument(models.Model):
+    """Denormalized text a student is found by in the list search.
+    
+    Kept in step with the student and its center, course and batch names by
+    students.search. The full-text index over it is database specific and is
+    created by migrations 0008 and 0013 (FTS5 trigrams on SQLite,
+    tsvector/trigram on Postgres).
+    """
+    student = models.OneToOneField(
+        Student,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_document'
+    )
+    document = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Search document for student {self.student_id}"
+
+
+class StudentSearchIndex(models.Model):
+    """The SQLite FTS5 table over StudentSearchDocument, for joining in queries.
+    
+    Created and kept in step by triggers in migration 0008; never written
+    through the ORM. ``rank`` is FTS5's bm25 score for the current MATCH,
+    lower is better.
+    """
+    student = models.OneToOneField(
+        Student,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_index'
+    )
+    document = models.TextField()
+    rank = models.FloatField()
+    
+    class Meta:
+        managed = False
+        db_table = 'students_search_fts'
+
 class EducationalQualification(models.Model):
     QUALIFICATION_TYPE_CHOICES = [
         ('OL', 'G.C.E. O/L'),
@@ -316,4 +461,34 @@ class EducationalQualification(models.Model):
         ordering = ['type', 'year', 'subject']
     
     def __str__(self):
-        return f"{self.student.name_with_initials} - {self.subject} ({self.grade})"
\ No newline at end of file
+        return f"{self.student.name_with_initials} - {self.subject} ({self.grade})"
+
+class IDCardJob(models.Model):
+    """Bulk ID card PDF generated in the background (manage.py run_id_card_worker)"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    student_ids = models.JSONField(default=list)
+    cards_per_page = models.PositiveSmallIntegerField(default=2)
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='id_card_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    card_count = models.PositiveIntegerField(default=0)
+    file_path = models.CharField(max_length=500, blank=True, null=True)
+    file_name = models.CharField(max_length=255, blank=True, null=True)
+    error_message = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"ID cards for {len(self.student_ids)} students - {self.status}"
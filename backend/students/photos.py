@@ -0,0 +1,140 @@
+# students/photos.py
+import io
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Variant -> (width, height, JPEG quality). Photos are centre-cropped to fit.
+PHOTO_DERIVATIVES = {
+    'avatar': (128, 128, 80),  # list rows
+    'card': (300, 400, 85),  # ID cards, 3:4 passport-style
+}
+
+DERIVATIVES_DIR = 'student_photos/derivatives'
+DEFAULT_WORKERS = 2
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def photo_workers():
+    return getattr(settings, 'STUDENT_PHOTO_WORKERS', DEFAULT_WORKERS)
+
+
+def _photo_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=photo_workers(), thread_name_prefix='student-photos')
+        return _executor
+
+
+def derivatives_current(student):
+    """Whether the stored thumbnails were made from the current photo"""
+    thumbnails = student.profile_photo_thumbnails or {}
+    return bool(student.profile_photo) and thumbnails.get('source') == student.profile_photo.name
+
+
+def thumbnail_url(student, variant):
+    """Storage URL of one derivative, or None until it has been generated"""
+    if not derivatives_current(student):
+        return None
+    name = student.profile_photo_thumbnails.get(variant)
+    return default_storage.url(name) if name else None
+
+
+def _open_photo(name):
+    with default_storage.open(name, 'rb') as file:
+        image = Image.open(file)
+        # JPEGs can be decoded straight at a fraction of their size
+        largest = max((width, height) for width, height, _ in PHOTO_DERIVATIVES.values())
+        image.draft('RGB', (largest[0] * 2, largest[1] * 2))
+        image = ImageOps.exif_transpose(image)
+        return image.convert('RGB')
+
+
+def _render(image, width, height, quality):
+    thumbnail = ImageOps.fit(image, (width, height), Image.LANCZOS)
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def generate_derivatives(student):
+    """Write every derivative of the student's current photo and record them.
+
+    The record is only updated if the photo has not changed in the meantime,
+    and derivatives of the photo it replaces are removed.
+    """
+    source = student.profile_photo.name
+    image = _open_photo(source)
+    stem = posixpath.splitext(posixpath.basename(source))[0]
+
+    thumbnails = {'source': source}
+    for variant, (width, height, quality) in PHOTO_DERIVATIVES.items():
+        name = f'{DERIVATIVES_DIR}/{variant}/{stem}.jpg'
+        thumbnails[variant] = default_storage.save(name, ContentFile(_render(image, width, height, quality)))
+
+    from .models import Student
+    updated = Student.objects.filter(pk=student.pk, profile_photo=source).update(
+        profile_photo_thumbnails=thumbnails
+    )
+    # Whichever set lost (the old photo's, or ours if the photo moved on) is deleted
+    if updated:
+        _delete_derivatives(student.profile_photo_thumbnails)
+        student.profile_photo_thumbnails = thumbnails
+    else:
+        _delete_derivatives(thumbnails)
+    return updated > 0
+
+
+def _delete_derivatives(thumbnails):
+    for variant in PHOTO_DERIVATIVES:
+        name = (thumbnails or {}).get(variant)
+        if name:
+            try:
+                default_storage.delete(name)
+            except OSError:
+                pass
+
+
+def _generate_for(student_id):
+    from .models import Student
+    try:
+        student = Student.objects.only('id', 'profile_photo', 'profile_photo_thumbnails').get(pk=student_id)
+        if student.profile_photo and not derivatives_current(student):
+            generate_derivatives(student)
+    except Exception as e:
+        logger.error(f"Error generating photo thumbnails for student {student_id}: {str(e)}")
+
+
+def _generate_in_background(student_id):
+    # Pool threads get their own database connection, closed when done
+    close_old_connections()
+    try:
+        _generate_for(student_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_derivatives(student):
+    """Generate the student's thumbnails once the current transaction commits.
+
+    Runs on a small thread pool so uploads return without waiting on Pillow;
+    with STUDENT_PHOTO_WORKERS = 0 it runs inline instead. Photos missed by a
+    restart are picked up by manage.py generate_photo_thumbnails.
+    """
+    student_id = student.pk
+    if photo_workers() <= 0:
+        transaction.on_commit(lambda: _generate_for(student_id))
+        return
+    transaction.on_commit(lambda: _photo_executor().submit(_generate_in_background, student_id))
@@ -0,0 +1,215 @@
+# students/qr.py
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import qrcode
+from django.conf import settings
+from django.core import signing
+from django.utils.crypto import constant_time_compare
+
+# This module must not import models: pool workers import it without Django set up
+
+SIGNING_SALT = 'students.qr'
+
+DEFAULT_MEMORY_CACHE_SIZE = 1024
+DEFAULT_WORKERS = 4
+
+# Versioned QR image URLs never change content
+IMAGE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Smaller batches are not worth starting worker processes for
+PARALLEL_THRESHOLD = 50
+
+# The QR is drawn 100pt wide on cards; 4px modules still print at ~200 dpi
+# and keep PDFs a fraction of the size of 10px ones
+QR_BOX_SIZE = 4
+
+
+def qr_cache_dir():
+    return Path(getattr(settings, 'QR_CACHE_DIR', settings.BASE_DIR / 'qr_cache'))
+
+
+def qr_workers():
+    return getattr(settings, 'ID_CARD_WORKERS', DEFAULT_WORKERS)
+
+
+# ---- payloads ----
+
+def qr_signature(student_id, registration_no):
+    return signing.Signer(salt=SIGNING_SALT).signature(f'{student_id}:{registration_no}')
+
+
+def qr_payload(student_id, registration_no, full_name):
+    """The JSON a student's QR code carries.
+
+    It has no timestamp, so it is the same on every card printed for the
+    student, and the signature ties it to the registration number: a card
+    printed before the student is re-registered stops verifying.
+    """
+    return json.dumps({
+        'student_id': student_id,
+        'registration_no': registration_no,
+        'full_name': full_name,
+        'signature': qr_signature(student_id, registration_no),
+    })
+
+
+def student_qr_payload(student):
+    return qr_payload(student.id, student.registration_no, student.full_name_english)
+
+
+def verify_qr_data(data):
+    """Whether a decoded QR payload may be trusted.
+
+    Cards printed before payloads were signed carry no signature; they are
+    accepted unless QR_REQUIRE_SIGNATURE is set.
+    """
+    signature = data.get('signature')
+    if signature is None:
+        return not getattr(settings, 'QR_REQUIRE_SIGNATURE', False)
+    expected = qr_signature(data.get('student_id'), data.get('registration_no'))
+    return constant_time_compare(str(signature), expected)
+
+
+def qr_registration_current(data, registration_no):
+    """Whether a signed payload was printed for the student's current registration number.
+
+    The signature only proves the payload was issued for its own
+    ``registration_no``; this is what retires cards after re-registration.
+    Unsigned payloads carry nothing to compare and are left to verify_qr_data.
+    """
+    if data.get('signature') is None:
+        return True
+    return data.get('registration_no') == registration_no
+
+
+def payload_hash(payload):
+    return hashlib.sha256(f'{QR_BOX_SIZE}:{payload}'.encode()).hexdigest()
+
+
+# ---- rendering ----
+
+def render_qr_png(payload):
+    """PNG bytes of the QR code for one payload, uncached"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_H,
+        box_size=QR_BOX_SIZE,
+        border=4,
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+    buffer = io.BytesIO()
+    qr.make_image(fill_color="black", back_color="white").save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class PNGCache:
+    """Bounded in-process LRU of rendered PNGs keyed by payload hash"""
+
+    def __init__(self):
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            png = self._items.get(key)
+            if png is not None:
+                self._items.move_to_end(key)
+            return png
+
+    def set(self, key, png):
+        size = getattr(settings, 'QR_MEMORY_CACHE_SIZE', DEFAULT_MEMORY_CACHE_SIZE)
+        with self._lock:
+            self._items[key] = png
+            self._items.move_to_end(key)
+            while len(self._items) > size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+memory_cache = PNGCache()
+
+
+def _disk_path(key):
+    return qr_cache_dir() / key[:2] / f'{key}.png'
+
+
+def _read_disk(key):
+    try:
+        return _disk_path(key).read_bytes()
+    except OSError:
+        return None
+
+
+def _write_disk(key, png):
+    path = _disk_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        temp_path.write_bytes(png)
+        os.replace(temp_path, path)
+    except OSError:
+        # The disk cache is an optimisation; a read-only or full disk just skips it
+        pass
+
+
+def cached_qr_png(payload):
+    """PNG from the memory or disk cache, or None"""
+    key = payload_hash(payload)
+    png = memory_cache.get(key)
+    if png is None:
+        png = _read_disk(key)
+        if png is not None:
+            memory_cache.set(key, png)
+    return png
+
+
+def store_qr_png(payload, png):
+    key = payload_hash(payload)
+    memory_cache.set(key, png)
+    _write_disk(key, png)
+
+
+def qr_png(payload):
+    """PNG for one payload: memory LRU, then the disk cache, then a fresh render"""
+    png = cached_qr_png(payload)
+    if png is None:
+        png = render_qr_png(payload)
+        store_qr_png(payload, png)
+    return png
+
+
+def qr_pngs(payloads, workers=None):
+    """PNGs for many payloads, in input order.
+
+    Cache misses are rendered across a process pool when there are enough of
+    them; building the QR matrix (mask selection at high error correction)
+    is most of the cost of a card. Workers are spawned rather than forked,
+    since the server process may be running other threads.
+    """
+    pngs = {payload: cached_qr_png(payload) for payload in payloads}
+    missing = [payload for payload, png in pngs.items() if png is None]
+
+    workers = min(qr_workers(), os.cpu_count() or 1) if workers is None else workers
+    if workers <= 1 or len(missing) < PARALLEL_THRESHOLD:
+        rendered = [render_qr_png(payload) for payload in missing]
+    else:
+        chunksize = max(1, len(missing) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            rendered = list(pool.map(render_qr_png, missing, chunksize=chunksize))
+
+    for payload, png in zip(missing, rendered):
+        store_qr_png(payload, png)
+        pngs[payload] = png
+    return [pngs[payload] for payload in payloads]
@@ -0,0 +1,139 @@
+# students/reference.py
+import copy
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+
+from naita_backend.cache import bump_cache_version, cache_version
+
+DEFAULT_MAX_AGE = 300  # seconds
+DEFAULT_CHECK_INTERVAL = 5  # seconds
+VERSION_KEY = 'students:reference:version'
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+def reference_max_age():
+    return getattr(settings, 'REFERENCE_DATA_MAX_AGE', DEFAULT_MAX_AGE)
+
+
+def reference_check_interval():
+    return getattr(settings, 'REFERENCE_VERSION_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL)
+
+
+def _payload_etag(data):
+    body = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return f'"{hashlib.md5(body.encode()).hexdigest()}"'
+
+
+class ReferenceData:
+    """Immutable snapshot of the registration reference tables.
+
+    Built with one query per table; lookups that used to be per-call queries
+    (``district_name__iexact``, ``course_name__icontains``, the default active
+    batch) are answered from indexes on the snapshot instead.
+    """
+
+    def __init__(self, version):
+        from .models import DistrictCode, CourseCode, Batch, BatchYear
+        from .serializers import (
+            DistrictCodeSerializer, CourseCodeSerializer, BatchSerializer, BatchYearSerializer
+        )
+
+        self.version = version
+        self.built_at = self.checked_at = time.monotonic()
+        # Rows read inside a transaction may yet be rolled back
+        self.built_in_transaction = connection.in_atomic_block
+
+        district_codes = list(DistrictCode.objects.all())
+        course_codes = list(CourseCode.objects.all())
+        batches = list(Batch.objects.order_by('display_order', 'batch_code'))
+        batch_years = [year for year in BatchYear.objects.all() if year.is_active]
+
+        # Case-insensitive exact index, first row wins like .filter().first()
+        self._districts_by_name = {}
+        for district_code in district_codes:
+            self._districts_by_name.setdefault(district_code.district_name.lower(), district_code)
+
+        # Substring index over course names, in CourseCode ordering
+        self._course_codes = [(code.course_name.lower(), code) for code in course_codes]
+        self._course_matches = {}
+
+        self._batches_by_id = {batch.id: batch for batch in batches}
+        self._batches_by_code = {batch.batch_code: batch for batch in batches}
+        self._default_batch = next((batch for batch in batches if batch.is_active), None)
+
+        self.payloads = {
+            'district_codes': DistrictCodeSerializer(district_codes, many=True).data,
+            'course_codes': CourseCodeSerializer(course_codes, many=True).data,
+            'batches': BatchSerializer([batch for batch in batches if batch.is_active], many=True).data,
+            'batch_years': BatchYearSerializer(batch_years, many=True).data,
+        }
+        self.etags = {name: _payload_etag(data) for name, data in self.payloads.items()}
+
+    def district_code_for(self, district_name):
+        """DistrictCode whose name matches case-insensitively, or None"""
+        return self._districts_by_name.get((district_name or '').lower())
+
+    def course_code_for(self, course_name):
+        """First CourseCode whose name contains ``course_name``, or None"""
+        needle = (course_name or '').lower()
+        if needle not in self._course_matches:
+            self._course_matches[needle] = next(
+                (code for name, code in self._course_codes if needle in name), None
+            )
+        return self._course_matches[needle]
+
+    # Batches are handed out as copies since callers assign them to students
+
+    def batch(self, batch_id):
+        batch = self._batches_by_id.get(batch_id)
+        return copy.copy(batch) if batch else None
+
+    def batch_by_code(self, batch_code):
+        batch = self._batches_by_code.get(batch_code)
+        return copy.copy(batch) if batch else None
+
+    def default_batch(self):
+        """First active batch by display order, or None"""
+        return copy.copy(self._default_batch) if self._default_batch else None
+
+
+def reference_data():
+    """Current snapshot, rebuilt when the shared version moves or it ages out.
+
+    The version lives in the Django cache so a save in one worker reaches the
+    others. Reading it is a cache round trip (a query on the database cache),
+    so it is checked at most once per check interval; saves in this worker
+    drop the snapshot directly. A snapshot built inside a transaction is
+    checked on every call, since a rollback undoes the version bump with the
+    rows. The age limit bounds staleness regardless.
+    """
+    global _snapshot
+    snapshot = _snapshot
+    now = time.monotonic()
+    if snapshot is not None and now - snapshot.built_at <= reference_max_age():
+        if not snapshot.built_in_transaction and now - snapshot.checked_at < reference_check_interval():
+            return snapshot
+        if cache_version(VERSION_KEY) == snapshot.version:
+            snapshot.checked_at = now
+            return snapshot
+
+    with _lock:
+        version = cache_version(VERSION_KEY)
+        snapshot = _snapshot
+        if snapshot is None or snapshot.version != version or now - snapshot.built_at > reference_max_age():
+            snapshot = _snapshot = ReferenceData(version)
+    return snapshot
+
+
+def invalidate_reference_data():
+    global _snapshot
+    bump_cache_version(VERSION_KEY)
+    _snapshot = None
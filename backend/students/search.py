@@ -0,0 +1,152 @@
+# students/search.py
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FloatField, Lookup, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Student, StudentSearchDocument, StudentSearchIndex
+
+# Student columns (and related names) that make up the search document
+SEARCH_FIELDS = [
+    'registration_no', 'full_name_english', 'full_name_sinhala', 'name_with_initials',
+    'nic_id', 'district', 'email', 'district_code', 'course_code',
+    'center__name', 'course__name', 'batch__batch_code', 'batch__batch_name',
+]
+
+INDEX_CHUNK_SIZE = 1000
+
+# Word characters plus the Sinhala block, whose vowel signs \w does not cover
+TOKEN_PATTERN = re.compile(r'[\w\u0d80-\u0dff]+')
+
+# The trigram index only finds words of at least this many characters
+TRIGRAM_LENGTH = 3
+
+# Every word must occur somewhere in the document, as on the FTS5 trigram index
+POSTGRES_MATCH = "SELECT student_id FROM students_studentsearchdocument WHERE {conditions}"
+POSTGRES_CONDITION = "document ILIKE %s"
+POSTGRES_RANK = (
+    "SELECT ts_rank(search_vector, to_tsquery('simple', %s)) + similarity(document, %s) "
+    "FROM students_studentsearchdocument WHERE student_id = \"students_student\".\"id\""
+)
+
+
+class FullTextMatch(Lookup):
+    """``search_index__document__match=query``: an FTS5 MATCH on the joined index"""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+StudentSearchIndex._meta.get_field('document').register_lookup(FullTextMatch)
+
+
+def search_backend():
+    """'fts5', 'postgres' or 'legacy' for the icontains chain"""
+    if getattr(settings, 'STUDENT_SEARCH_BACKEND', 'auto') == 'legacy':
+        return 'legacy'
+    if connection.vendor == 'sqlite':
+        return 'fts5'
+    if connection.vendor == 'postgresql':
+        return 'postgres'
+    return 'legacy'
+
+
+def search_tokens(term):
+    return TOKEN_PATTERN.findall((term or '').lower())
+
+
+def build_document(values):
+    return ' '.join(str(value) for value in values if value)
+
+
+def index_students(queryset=None):
+    """Rebuild search documents for the given students (all when None)"""
+    if queryset is None:
+        queryset = Student.objects.all()
+    rows = queryset.order_by().values_list('id', *SEARCH_FIELDS).iterator(chunk_size=INDEX_CHUNK_SIZE)
+
+    indexed = 0
+    documents = []
+    for student_id, *values in rows:
+        documents.append(StudentSearchDocument(student_id=student_id, document=build_document(values)))
+        if len(documents) >= INDEX_CHUNK_SIZE:
+            indexed += _upsert(documents)
+            documents = []
+    if documents:
+        indexed += _upsert(documents)
+    return indexed
+
+
+def _upsert(documents):
+    StudentSearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=['student'],
+        update_fields=['document', 'updated_at'],
+    )
+    return len(documents)
+
+
+def legacy_search(queryset, term):
+    """The original substring search across students and related names"""
+    return queryset.filter(
+        Q(full_name_english__icontains=term) |
+        Q(full_name_sinhala__icontains=term) |
+        Q(name_with_initials__icontains=term) |
+        Q(nic_id__icontains=term) |
+        Q(registration_no__icontains=term) |
+        Q(district__icontains=term) |
+        Q(center__name__icontains=term) |
+        Q(course__name__icontains=term) |
+        Q(district_code__icontains=term) |
+        Q(course_code__icontains=term) |
+        Q(batch__batch_code__icontains=term) |
+        Q(batch__batch_name__icontains=term)
+    )
+
+
+def like_pattern(token):
+    escaped = token.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def search_students(queryset, term, backend=None):
+    """Filter students to those matching ``term``, best matches first.
+
+    Every word is matched as a substring of the student's search document
+    (``kshan sil`` finds "Lakshan Silva"), the same on SQLite and Postgres.
+    Results carry a ``search_rank`` annotation where higher is better.
+    """
+    backend = backend or search_backend()
+    tokens = search_tokens(term)
+    if backend == 'legacy' or not tokens:
+        return legacy_search(queryset, term)
+
+    if backend == 'fts5':
+        indexed = [token for token in tokens if len(token) >= TRIGRAM_LENGTH]
+        if indexed:
+            # Joined rather than correlated: bm25() re-reads the term statistics for
+            # every FTS5 cursor, so one cursor has to drive the whole query
+            match = ' '.join(f'"{token}"' for token in indexed)
+            queryset = queryset.filter(search_index__document__match=match).annotate(
+                search_rank=-F('search_index__rank')
+            )
+        else:
+            queryset = queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        # Words too short for the trigram index are checked on the matched rows
+        for token in tokens:
+            if len(token) < TRIGRAM_LENGTH:
+                queryset = queryset.filter(search_document__document__icontains=token)
+        return queryset.order_by('-search_rank', '-created_at')
+
+    query = ' & '.join(f'{token}:*' for token in tokens)
+    match = POSTGRES_MATCH.format(conditions=' AND '.join([POSTGRES_CONDITION] * len(tokens)))
+    queryset = queryset.filter(id__in=RawSQL(match, [like_pattern(token) for token in tokens]))
+    rank = RawSQL(POSTGRES_RANK, (query, term.strip()))
+
+    return queryset.annotate(search_rank=rank).order_by('-search_rank', '-created_at')
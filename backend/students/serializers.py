@@ -1,11 +1,16 @@
 # students/serializers.py - COMPLETE FIXED VERSION
 import json
 from rest_framework import serializers
+from django.db import transaction
 from django.utils import timezone
 from datetime import datetime
-from .models import Student, EducationalQualification, DistrictCode, CourseCode, Batch, BatchYear
+from .models import Student, EducationalQualification, DistrictCode, CourseCode, Batch, BatchYear, IDCardJob
+from .id_cards import SHEET_LAYOUTS
+from .photos import PHOTO_DERIVATIVES, thumbnail_url
 from centers.models import Center
 from courses.models import Course
+from naita_backend.serializers import SparseFieldsetMixin
+from overview.cache import invalidate_dashboard_cache
 
 class DistrictCodeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -32,7 +37,54 @@ class EducationalQualificationSerializer(serializers.ModelSerializer):
         model = EducationalQualification
         fields = ['id', 'subject', 'grade', 'year', 'type']
 
-class StudentSerializer(serializers.ModelSerializer):
+# Fields that identify a qualification row; only the grade is updated in place
+QUALIFICATION_KEY = ('type', 'year', 'subject')
+
+
+def qualification_key(qualification):
+    if isinstance(qualification, dict):
+        return tuple(qualification.get(field) for field in QUALIFICATION_KEY)
+    return tuple(getattr(qualification, field) for field in QUALIFICATION_KEY)
+
+
+def sync_qualifications(student, rows):
+    """Make the student's qualifications match ``rows`` with one query per kind of change.
+
+    Rows already present (same type, year and subject) are kept, changed
+    grades are updated in bulk, missing rows are inserted in bulk and the
+    rest are deleted.
+    """
+    existing = {}
+    for qualification in EducationalQualification.objects.filter(student=student):
+        existing.setdefault(qualification_key(qualification), []).append(qualification)
+
+    to_create = []
+    to_update = []
+    for row in rows:
+        matches = existing.get(qualification_key(row))
+        if not matches:
+            to_create.append(EducationalQualification(student=student, **row))
+            continue
+        qualification = matches.pop()
+        if qualification.grade != row.get('grade'):
+            qualification.grade = row.get('grade')
+            to_update.append(qualification)
+    stale = [qualification.pk for matches in existing.values() for qualification in matches]
+
+    if stale:
+        EducationalQualification.objects.filter(pk__in=stale).delete()
+    if to_update:
+        EducationalQualification.objects.bulk_update(to_update, ['grade'])
+    if to_create:
+        EducationalQualification.objects.bulk_create(to_create)
+    if stale or to_update or to_create:
+        # Bulk writes send no per-row signals, so expire the O/L and A/L counts here
+        invalidate_dashboard_cache(student.district)
+    # Drop a prefetched copy so the response reflects what was written
+    getattr(student, '_prefetched_objects_cache', {}).pop('qualifications', None)
+
+
+class StudentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     ol_results = EducationalQualificationSerializer(many=True, required=False, write_only=True)
     al_results = EducationalQualificationSerializer(many=True, required=False, write_only=True)
     center_name = serializers.CharField(source='center.name', read_only=True)
@@ -41,6 +93,7 @@ class StudentSerializer(serializers.ModelSerializer):
     batch_display = serializers.CharField(source='batch.batch_name', read_only=True)
     profile_photo = serializers.ImageField(required=False, allow_null=True, write_only=True)
     profile_photo_url = serializers.SerializerMethodField(read_only=True)
+    profile_photo_thumbnails = serializers.SerializerMethodField(read_only=True)
     registration_components = serializers.SerializerMethodField()
     
     class Meta:
@@ -82,6 +135,7 @@ class StudentSerializer(serializers.ModelSerializer):
             'date_of_application',
             'profile_photo',  
             'profile_photo_url',  
+            'profile_photo_thumbnails',
             'center', 
             'center_name', 
             'course', 
@@ -113,6 +167,15 @@ class StudentSerializer(serializers.ModelSerializer):
             return obj.profile_photo.url
         return None
     
+    def get_profile_photo_thumbnails(self, obj):
+        """URLs of the resized photos by variant; None until they have been generated"""
+        request = self.context.get('request')
+        urls = {}
+        for variant in PHOTO_DERIVATIVES:
+            url = thumbnail_url(obj, variant)
+            urls[variant] = request.build_absolute_uri(url) if url and request is not None else url
+        return urls
+    
     def get_registration_components(self, obj):
         """Return registration number components as a dictionary"""
         if obj.registration_no:
@@ -130,13 +193,17 @@ class StudentSerializer(serializers.ModelSerializer):
     
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        # Separate O/L and A/L results for response
-        representation['ol_results'] = EducationalQualificationSerializer(
-            instance.qualifications.filter(type='OL'), many=True
-        ).data
-        representation['al_results'] = EducationalQualificationSerializer(
-            instance.qualifications.filter(type='AL'), many=True
-        ).data
+        # Separate O/L and A/L results for response (unless left out by ?fields=);
+        # split in Python so a prefetch_related('qualifications') on the queryset is used
+        if 'ol_results' not in self.fields and 'al_results' not in self.fields:
+            return representation
+        qualifications = instance.qualifications.all()
+        for field, qualification_type in (('ol_results', 'OL'), ('al_results', 'AL')):
+            if field in self.fields:
+                representation[field] = EducationalQualificationSerializer(
+                    [qualification for qualification in qualifications if qualification.type == qualification_type],
+                    many=True
+                ).data
         return representation
     
     def to_internal_value(self, data):
@@ -223,16 +290,17 @@ class StudentSerializer(serializers.ModelSerializer):
         if request and request.user.is_authenticated:
             validated_data['created_by'] = request.user
         
-        # Create student (registration number will be auto-generated in save() method)
-        student = Student.objects.create(**validated_data)
-        
-        # Create O/L qualifications
-        for ol_data in ol_results_data:
-            EducationalQualification.objects.create(student=student, **ol_data)
-        
-        # Create A/L qualifications
-        for al_data in al_results_data:
-            EducationalQualification.objects.create(student=student, **al_data)
+        with transaction.atomic():
+            # Create student (registration number will be auto-generated in save() method)
+            student = Student.objects.create(**validated_data)
+            
+            # Create O/L and A/L qualifications
+            EducationalQualification.objects.bulk_create([
+                EducationalQualification(student=student, **qualification_data)
+                for qualification_data in ol_results_data + al_results_data
+            ])
+            if ol_results_data or al_results_data:
+                invalidate_dashboard_cache(student.district)
         
         return student
     
@@ -267,27 +335,119 @@ class StudentSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         
-        # Save (registration number will be regenerated if needed)
-        instance.save()
-        
-        # Update qualifications - delete existing and create new
-        if ol_results_data or al_results_data:
-            instance.qualifications.all().delete()
+        with transaction.atomic():
+            # Save (registration number will be regenerated if needed)
+            instance.save()
             
-            for ol_data in ol_results_data:
-                EducationalQualification.objects.create(student=instance, **ol_data)
-            
-            for al_data in al_results_data:
-                EducationalQualification.objects.create(student=instance, **al_data)
+            # Update qualifications - the submitted results replace the existing ones
+            if ol_results_data or al_results_data:
+                sync_qualifications(instance, ol_results_data + al_results_data)
         
         return instance
 
+# Columns StudentListSerializer reads; the list queryset defers everything else
+STUDENT_LIST_COLUMNS = [
+    'id', 'registration_no', 'district_code', 'course_code', 'student_number', 'registration_year',
+    'full_name_english', 'name_with_initials', 'gender', 'date_of_birth', 'nic_id',
+    'district', 'mobile_no', 'email', 'training_received', 'training_provider', 'course_vocation_name',
+    'training_duration', 'date_of_application',
+    'enrollment_status', 'enrollment_date', 'profile_photo', 'profile_photo_thumbnails', 'created_at',
+    'center', 'center__name', 'course', 'course__name', 'course__code', 'batch', 'batch__batch_name',
+]
+
+class StudentListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Read-only row for student tables; the detail endpoint has everything else.
+    
+    Qualifications are only counted, from the list queryset's
+    ``ol_results_count``/``al_results_count`` annotations.
+    """
+    center_name = serializers.CharField(source='center.name', read_only=True)
+    course_name = serializers.CharField(source='course.name', read_only=True)
+    course_code_display = serializers.CharField(source='course.code', read_only=True)
+    batch_display = serializers.CharField(source='batch.batch_name', read_only=True)
+    profile_photo_url = serializers.SerializerMethodField()
+    avatar_url = serializers.SerializerMethodField()
+    ol_results_count = serializers.IntegerField(read_only=True, default=0)
+    al_results_count = serializers.IntegerField(read_only=True, default=0)
+    
+    class Meta:
+        model = Student
+        fields = [
+            'id',
+            'registration_no',
+            'district_code',
+            'course_code',
+            'student_number',
+            'registration_year',
+            'full_name_english',
+            'name_with_initials',
+            'gender',
+            'date_of_birth',
+            'nic_id',
+            'district',
+            'mobile_no',
+            'email',
+            'ol_results_count',
+            'al_results_count',
+            'training_received',
+            'training_provider',
+            'course_vocation_name',
+            'training_duration',
+            'date_of_application',
+            'enrollment_status',
+            'enrollment_date',
+            'profile_photo_url',
+            'avatar_url',
+            'center',
+            'center_name',
+            'course',
+            'course_name',
+            'course_code_display',
+            'batch',
+            'batch_display',
+            'created_at',
+        ]
+        read_only_fields = fields
+    
+    def _absolute_url(self, url):
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if url and request is not None else url
+    
+    def get_profile_photo_url(self, obj):
+        return self._absolute_url(obj.profile_photo.url) if obj.profile_photo else None
+    
+    def get_avatar_url(self, obj):
+        return self._absolute_url(thumbnail_url(obj, 'avatar'))
+
 class StudentImportSerializer(serializers.Serializer):
     file = serializers.FileField()
     
     class Meta:
         fields = ['file']
 
+class BulkIDCardSerializer(serializers.Serializer):
+    """Request body for bulk ID card generation"""
+    student_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+    cards_per_page = serializers.ChoiceField(choices=sorted(SHEET_LAYOUTS), required=False)
+    # Queue an IDCardJob instead of returning the PDF
+    background = serializers.BooleanField(default=False)
+
+class IDCardJobSerializer(serializers.ModelSerializer):
+    requested_by_name = serializers.CharField(source='requested_by.get_full_name', read_only=True)
+    student_count = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = IDCardJob
+        fields = [
+            'id', 'student_count', 'cards_per_page', 'requested_by', 'requested_by_name',
+            'status', 'card_count', 'file_name', 'error_message',
+            'created_at', 'started_at', 'completed_at'
+        ]
+        read_only_fields = fields
+    
+    def get_student_count(self, obj):
+        return len(obj.student_ids)
+
 class RegistrationNumberPreviewSerializer(serializers.Serializer):
     """Serializer for registration number preview"""
     district = serializers.CharField(max_length=100)
@@ -0,0 +1,82 @@
+# students/signals.py
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from centers.models import Center
+from courses.models import Course
+
+from .models import Student, EducationalQualification, DistrictCode, CourseCode, Batch, BatchYear
+from .photos import derivatives_current, schedule_derivatives
+from .reference import invalidate_reference_data
+from .search import INDEX_CHUNK_SIZE, index_students
+from .stats import invalidate_student_stats
+
+
+@receiver(post_save, sender=DistrictCode)
+@receiver(post_save, sender=CourseCode)
+@receiver(post_save, sender=Batch)
+@receiver(post_save, sender=BatchYear)
+@receiver(post_delete, sender=DistrictCode)
+@receiver(post_delete, sender=CourseCode)
+@receiver(post_delete, sender=Batch)
+@receiver(post_delete, sender=BatchYear)
+def invalidate_reference_on_change(sender, instance, **kwargs):
+    invalidate_reference_data()
+
+
+@receiver(post_save, sender=Student)
+def index_student_on_save(sender, instance, **kwargs):
+    index_students(Student.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Student)
+def thumbnail_photo_on_save(sender, instance, **kwargs):
+    if instance.profile_photo and not derivatives_current(instance):
+        schedule_derivatives(instance)
+
+
+@receiver(post_save, sender=Center)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Batch)
+def reindex_students_on_rename(sender, instance, update_fields=None, **kwargs):
+    # Only the names (and batch code) of related objects are part of the document
+    if kwargs.get('created') or (update_fields and not {'name', 'batch_code', 'batch_name'} & set(update_fields)):
+        return
+    related = 'batch' if sender is Batch else sender._meta.model_name
+    index_students(Student.objects.filter(**{related: instance}))
+
+
+@receiver(pre_delete, sender=Center)
+@receiver(pre_delete, sender=Course)
+@receiver(pre_delete, sender=Batch)
+def remember_students_before_delete(sender, instance, **kwargs):
+    # The delete SET_NULLs these students in the database without saving them
+    related = 'batch' if sender is Batch else sender._meta.model_name
+    instance._search_student_ids = list(
+        Student.objects.filter(**{related: instance}).values_list('id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Center)
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Batch)
+def reindex_students_on_delete(sender, instance, **kwargs):
+    student_ids = getattr(instance, '_search_student_ids', [])
+    for start in range(0, len(student_ids), INDEX_CHUNK_SIZE):
+        index_students(Student.objects.filter(id__in=student_ids[start:start + INDEX_CHUNK_SIZE]))
+
+
+@receiver(post_save, sender=EducationalQualification)
+@receiver(post_delete, sender=EducationalQualification)
+def invalidate_stats_on_qualification_change(sender, instance, **kwargs):
+    invalidate_student_stats(Student.objects.filter(pk=instance.student_id))
+
+
+@receiver(post_save, sender=Center)
+@receiver(post_save, sender=Batch)
+def invalidate_stats_on_rename(sender, instance, update_fields=None, **kwargs):
+    # The stats group students by center and batch name
+    if kwargs.get('created') or (update_fields and not {'name', 'batch_name'} & set(update_fields)):
+        return
+    related = 'batch' if sender is Batch else 'center'
+    invalidate_student_stats(Student.objects.filter(**{related: instance}))
@@ -0,0 +1,99 @@
+# students/stats.py
+from datetime import timedelta
+
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from overview.cache import get_cached_dashboard, invalidate_dashboard_cache, set_cached_dashboard
+
+COUNT_FIELDS = [
+    'total_students', 'trained_students', 'enrolled_students', 'completed_students',
+    'pending_students', 'with_ol_results', 'with_al_results', 'recent_students',
+]
+SECTION_FIELDS = ['center_distribution', 'registration_stats']
+STAT_FIELDS = COUNT_FIELDS + SECTION_FIELDS
+
+
+def invalidate_student_stats(students):
+    """Expire cached stats for every district the given students belong to.
+
+    For writes that change what the stats show without saving a Student:
+    qualifications written in bulk, or a renamed center or batch.
+    """
+    districts = students.order_by().values_list('district', flat=True).distinct()
+    for district in set(districts):
+        invalidate_dashboard_cache(district)
+
+
+def student_counts(queryset):
+    """All headline counters in one aggregate; distinct because of the qualifications join"""
+    week_ago = timezone.now() - timedelta(days=7)
+    return queryset.order_by().aggregate(
+        total_students=Count('id', distinct=True),
+        trained_students=Count('id', distinct=True, filter=Q(training_received=True)),
+        enrolled_students=Count('id', distinct=True, filter=Q(enrollment_status='Enrolled')),
+        completed_students=Count('id', distinct=True, filter=Q(enrollment_status='Completed')),
+        pending_students=Count('id', distinct=True, filter=Q(enrollment_status='Pending')),
+        with_ol_results=Count('id', distinct=True, filter=Q(qualifications__type='OL')),
+        with_al_results=Count('id', distinct=True, filter=Q(qualifications__type='AL')),
+        recent_students=Count('id', distinct=True, filter=Q(created_at__gte=week_ago)),
+    )
+
+
+def grouped_counts(queryset, field, default):
+    """{value: count} for one column, most recently active group first.
+
+    Groups come back in the order a newest-first walk over the students would
+    first meet them, which keeps the keys in the order clients always saw.
+    """
+    rows = queryset.order_by().values(field).annotate(
+        count=Count('id'), latest=Max('created_at')
+    ).order_by('-latest')
+    counts = {}
+    for row in rows:
+        key = row[field] or default
+        counts[key] = counts.get(key, 0) + row['count']
+    return counts
+
+
+def center_distribution(queryset):
+    return grouped_counts(queryset, 'center__name', 'No Center')
+
+
+def registration_stats(queryset):
+    return {
+        'by_district': grouped_counts(queryset, 'district_code', 'Unknown'),
+        'by_course': grouped_counts(queryset, 'course_code', 'GEN'),
+        'by_batch': grouped_counts(queryset, 'batch__batch_name', 'Unknown'),
+    }
+
+
+SECTIONS = {
+    'center_distribution': center_distribution,
+    'registration_stats': registration_stats,
+}
+
+
+def student_stats(queryset, fields, role=None, district=None, cache=True):
+    """Requested stats sections, each cached per role and district scope"""
+    stats = {}
+
+    def section(name, compute):
+        if not cache:
+            return compute(queryset)
+        cache_name = f'student_stats:{name}'
+        data = get_cached_dashboard(cache_name, role, district)
+        if data is None:
+            data = compute(queryset)
+            set_cached_dashboard(cache_name, role, district, data)
+        return data
+
+    if any(field in COUNT_FIELDS for field in fields):
+        counts = section('counts', student_counts)
+        stats.update({field: counts[field] for field in COUNT_FIELDS if field in fields})
+
+    for name in SECTION_FIELDS:
+        if name in fields:
+            stats[name] = section(name, SECTIONS[name])
+
+    return stats
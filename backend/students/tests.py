@@ -1,3 +1,278 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from attendance.roster import course_roster
+from courses.models import Course
+from naita_backend.cache import bump_cache_version
+from overview.cache import dashboard_cache_key
+from .models import Batch, CourseCode, DistrictCode, RegistrationSequence, Student, StudentSearchDocument
+from .reference import VERSION_KEY, invalidate_reference_data, reference_data
+from .search import search_students
+from .serializers import sync_qualifications
+
+User = get_user_model()
+
+
+def make_student(number, **fields):
+    return Student.objects.create(**{
+        'full_name_english': f'Student {number}', 'name_with_initials': f'S. {number}', 'gender': 'Male',
+        'date_of_birth': date(2000, 1, 1), 'nic_id': f'20000000{number:04d}', 'address_line': '1 Main Street',
+        'district': 'Colombo', 'divisional_secretariat': 'Colombo', 'grama_niladhari_division': 'Fort',
+        'village': 'Fort', 'marital_status': 'Single', 'mobile_no': '0770000000',
+        'date_of_application': date(2026, 1, 1), **fields
+    })
+
+
+class RegistrationSequenceReserveTests(TestCase):
+    """Student numbers are handed out in consecutive, never-shared blocks"""
+
+    def test_blocks_follow_each_other(self):
+        self.assertEqual(RegistrationSequence.reserve('COL', 'WLD', '01', '2026', count=5), 1)
+        self.assertEqual(RegistrationSequence.reserve('COL', 'WLD', '01', '2026'), 6)
+        self.assertEqual(RegistrationSequence.reserve('COL', 'WLD', '01', '2026', count=3), 7)
+        sequence = RegistrationSequence.objects.get(district_code='COL', course_code='WLD', batch_code='01', year='2026')
+        self.assertEqual(sequence.last_number, 9)
+
+    def test_prefixes_are_independent(self):
+        self.assertEqual(RegistrationSequence.reserve('COL', 'WLD', '01', '2026', count=4), 1)
+        self.assertEqual(RegistrationSequence.reserve('COL', 'WLD', '02', '2026', count=2), 1)
+        self.assertEqual(RegistrationSequence.reserve('COL', 'WLD', '01', '2025', count=2), 1)
+        self.assertEqual(RegistrationSequence.reserve('COL', 'WLD', '01', '2026', count=2), 5)
+
+    def test_missing_sequence_starts_after_registered_students(self):
+        batch = Batch.objects.create(batch_code='07', batch_name='7th Batch')
+        for number in (3, 8):
+            make_student(
+                number, district_code='COL', course_code='WLD', batch=batch,
+                student_number=number, registration_year='2026',
+            )
+
+        self.assertEqual(RegistrationSequence.reserve('COL', 'WLD', '07', '2026', count=2), 9)
+        self.assertEqual(RegistrationSequence.reserve('COL', 'WLD', '07', '2026'), 11)
+
+
+class StudentStatsInvalidationTests(TestCase):
+    """Writes that bypass Student.save still expire the cached stats"""
+
+    def setUp(self):
+        self.batch = Batch.objects.create(batch_code='01', batch_name='1st Batch')
+        self.student = make_student(1, batch=self.batch)
+
+    def assertExpires(self, write):
+        before = dashboard_cache_key('student_stats:counts', 'admin', 'Colombo')
+        write()
+        self.assertNotEqual(dashboard_cache_key('student_stats:counts', 'admin', 'Colombo'), before)
+
+    def test_bulk_qualification_sync(self):
+        self.assertExpires(lambda: sync_qualifications(self.student, [
+            {'type': 'OL', 'subject': 'Maths', 'grade': 'A', 'year': 2015},
+        ]))
+
+    def test_batch_rename(self):
+        self.batch.batch_name = 'First Batch'
+        self.assertExpires(self.batch.save)
+
+
+class StudentStatsFieldsTests(TestCase):
+    """?fields= on the stats action behaves like it does on the list"""
+
+    def setUp(self):
+        admin = User.objects.create_user(username='admin', email='admin@example.com', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+        make_student(1)
+
+    def test_requested_sections_only(self):
+        response = self.client.get('/api/students/stats/', {'fields': 'total_students, pending_students'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'total_students': 1, 'pending_students': 1})
+
+    def test_unknown_fields_are_rejected_like_the_list(self):
+        stats = self.client.get('/api/students/stats/', {'fields': 'total_students,bogus'})
+        listing = self.client.get('/api/students/', {'fields': 'id,bogus'})
+        self.assertEqual((stats.status_code, listing.status_code), (400, 400))
+        self.assertEqual(set(stats.data), set(listing.data))
+        self.assertIn('bogus', str(stats.data['fields']))
+        self.assertIn('center_distribution', stats.data['available_fields'])
+
+
+class StudentSearchIndexTests(TestCase):
+    """Search documents follow the names of a student's center and batch"""
+
+    def test_deleted_batch_leaves_the_documents(self):
+        batch = Batch.objects.create(batch_code='09', batch_name='Evening Batch')
+        student = make_student(1, batch=batch)
+        self.assertEqual(list(search_students(Student.objects.all(), 'evening')), [student])
+
+        batch.delete()
+        self.assertEqual(list(search_students(Student.objects.all(), 'evening')), [])
+        self.assertEqual(list(search_students(Student.objects.all(), 'student 1')), [student])
+
+    def test_index_finds_what_the_substring_search_finds(self):
+        for number, name in enumerate(['Lakshan Silva', 'Amara Perera', 'Nimal Bandara']):
+            make_student(number, full_name_english=name)
+
+        for term in ['a', 'kshan', 'LAK', 'rera', 'silva', '000001', 'Nimal Ban', 'zzz']:
+            indexed = set(search_students(Student.objects.all(), term, backend='fts5'))
+            substring = set(search_students(Student.objects.all(), term, backend='legacy'))
+            self.assertEqual(indexed, substring, term)
+            if term != 'zzz':
+                self.assertTrue(indexed, term)
+
+
+class StudentListKeysetTests(TestCase):
+    """Cursor pages of the student list neither skip nor repeat tied rows"""
+
+    def test_walk_across_equal_created_at(self):
+        admin = User.objects.create_user(username='admin', email='admin@example.com', password='x', role='admin')
+        students = [make_student(number) for number in range(5)]
+        Student.objects.update(created_at=timezone.now())
+
+        client = APIClient()
+        client.force_authenticate(admin)
+        seen = []
+        url = '/api/students/?page_size=2'
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(seen, sorted((student.id for student in students), reverse=True))
+
+
+class ReferenceDataTests(TestCase):
+    """The shared reference snapshot, its ETags and how it is invalidated"""
+
+    def setUp(self):
+        invalidate_reference_data()
+        admin = User.objects.create_user(username='admin', email='admin@example.com', password='x', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def district_codes(self, **headers):
+        return self.client.get('/api/students/available_district_codes/', headers=headers)
+
+    def test_etag_answers_not_modified_until_a_code_changes(self):
+        DistrictCode.objects.create(district_name='Colombo', district_code='COL')
+        response = self.district_codes()
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual(self.district_codes(if_none_match=etag).status_code, 304)
+
+        DistrictCode.objects.create(district_name='Kandy', district_code='KAN')
+        response = self.district_codes(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data), 2)
+
+    def test_saves_replace_the_snapshot(self):
+        self.assertIsNone(reference_data().district_code_for('Galle'))
+        DistrictCode.objects.create(district_name='Galle', district_code='GAL')
+        self.assertEqual(reference_data().district_code_for('galle').district_code, 'GAL')
+
+
+
+class ReferenceVersionCheckTests(TransactionTestCase):
+    """Outside transactions the shared version is read once per interval"""
+
+    def test_shared_version_is_checked_once_per_interval(self):
+        invalidate_reference_data()
+        snapshot = reference_data()
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(3):
+                self.assertIs(reference_data(), snapshot)
+        self.assertEqual(len(queries), 0)
+
+        # Another worker saved a code: picked up at the next check
+        bump_cache_version(VERSION_KEY)
+        with override_settings(REFERENCE_VERSION_CHECK_INTERVAL=0):
+            self.assertIsNot(reference_data(), snapshot)
+
+    def test_snapshot_built_in_a_transaction_is_rechecked(self):
+        with transaction.atomic():
+            invalidate_reference_data()
+            Batch.objects.create(batch_code='01', batch_name='1st Batch', is_active=True)
+            self.assertIsNotNone(reference_data().default_batch())
+            transaction.set_rollback(True)
+        self.assertIsNone(reference_data().default_batch())
+
+
+IMPORT_HEADER = (
+    'Full Name (English),Name with Initials,Date of Birth,NIC/ID,District,Divisional Secretariat,'
+    'Grama Niladhari Division,Village,Mobile No,Enrollment Date,Course,Batch Code'
+)
+
+
+class StudentImportTests(TestCase):
+    """A spreadsheet import inserts the valid rows and reports the rest"""
+
+    def setUp(self):
+        invalidate_reference_data()
+        self.admin = User.objects.create_user(username='admin', email='admin@example.com', password='x', role='admin')
+        DistrictCode.objects.create(district_name='Colombo', district_code='COL')
+        CourseCode.objects.create(course_name='Welding', course_code='WLD')
+        self.course = Course.objects.create(name='Welding', code='WLD', district='Colombo', students=0)
+        self.batch = Batch.objects.create(batch_code='01', batch_name='1st Batch', is_active=True)
+        make_student(
+            0, district_code='COL', course_code='WLD', batch=self.batch,
+            student_number=2, registration_year='2026', course=self.course,
+        )
+
+    def import_rows(self, *rows):
+        content = '\n'.join([IMPORT_HEADER, *rows]).encode()
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        return client.post('/api/students/import_students/', {
+            'file': SimpleUploadedFile('students.csv', content, content_type='text/csv'),
+        }, format='multipart')
+
+    def test_valid_rows_are_inserted_and_the_rest_reported(self):
+        self.assertEqual(list(course_roster(self.course.id)['students']), [Student.objects.get().id])
+        stats_key = dashboard_cache_key('student_stats:counts', 'admin', 'Colombo')
+        place = 'Colombo,Colombo,Fort,Fort,0771234567'
+        response = self.import_rows(
+            f'Kamal Silva,K. Silva,2001-02-03,200100000001,{place},2026-02-01,Welding,1',
+            f'Amara Perera,A. Perera,2002-03-04,200200000002,{place},,,01',
+            f'No Nic,N. Nic,2001-02-03,,{place},,,01',
+            f'Copy Kamal,C. Kamal,2001-02-03,200100000001,{place},,,01',
+            f'Existing,E. Student,2001-02-03,200000000000,{place},,,01',
+            f'Bad Date,B. Date,03/31/2001x,200300000003,{place},,,01',
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['imported'], 2)
+        self.assertEqual(
+            [(item['row'], list(item['errors'])) for item in response.data['error_report']],
+            [(3, ['nic_id']), (4, ['nic_id']), (5, ['nic_id']), (6, ['date_of_birth'])],
+        )
+
+        kamal = Student.objects.get(nic_id='200100000001')
+        amara = Student.objects.get(nic_id='200200000002')
+        # Numbers continue after the student already registered under the prefix
+        self.assertEqual(kamal.registration_no, 'COL/WLD/01/0003/2026')
+        self.assertEqual(amara.registration_no, f'COL/GEN/01/0001/{timezone.now().year}')
+        self.assertEqual((kamal.course, kamal.batch, kamal.created_by), (self.course, self.batch, self.admin))
+
+        self.assertIn('Welding', StudentSearchDocument.objects.get(student=kamal).document)
+        self.assertEqual(list(search_students(Student.objects.all(), 'amara')), [amara])
+        self.assertIn(kamal.id, course_roster(self.course.id)['students'])
+        self.assertNotEqual(dashboard_cache_key('student_stats:counts', 'admin', 'Colombo'), stats_key)
+
+    def test_numbers_are_not_reused_by_a_second_import(self):
+        place = 'Colombo,Colombo,Fort,Fort,0771234567'
+        self.import_rows(f'First,F. First,2001-02-03,200100000011,{place},2026-02-01,Welding,01')
+        self.import_rows(
+            f'Second,S. Second,2001-02-03,200100000012,{place},2026-02-01,Welding,01',
+            f'Third,T. Third,2001-02-03,200100000013,{place},2026-03-01,Welding,01',
+        )
+        self.assertEqual(
+            sorted(Student.objects.filter(course_code='WLD').values_list('student_number', flat=True)),
+            [2, 3, 4, 5],
+        )
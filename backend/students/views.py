@@ -5,42 +5,61 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter
-from django.db.models import Q
-import pandas as pd
-from django.http import HttpResponse
-import csv
+from django.db.models import Count, Q
+from django.http import HttpResponse, StreamingHttpResponse, FileResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
 from django.utils import timezone
 from datetime import datetime
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-import qrcode
-import io
 from PIL import Image
-import json
+import os
+import logging
 from datetime import datetime
 
-from .models import Student, EducationalQualification, DistrictCode, CourseCode, Batch, BatchYear
+from .models import (
+    Student, EducationalQualification, DistrictCode, CourseCode, Batch, BatchYear, RegistrationSequence, IDCardJob
+)
 from .serializers import (
-    StudentSerializer, StudentImportSerializer, 
+    StudentSerializer, StudentListSerializer, STUDENT_LIST_COLUMNS, StudentImportSerializer, 
     DistrictCodeSerializer, CourseCodeSerializer, BatchSerializer, BatchYearSerializer,
-    RegistrationNumberPreviewSerializer
+    RegistrationNumberPreviewSerializer, BulkIDCardSerializer, IDCardJobSerializer
 )
-from centers.models import Center
 from courses.models import Course
 from .permissions import StudentPermission
+from naita_backend.pagination import StudentPagination
+from naita_backend.serializers import validated_fields
+from .exports import stream_csv, write_xlsx
+from .imports import StudentImport, read_import_file
+from .id_cards import single_card_pdf, card_sheets_file, cards_per_page_default, id_card_sync_limit
+from .id_card_jobs import students_in_order, submit_id_card_job
+from .qr import IMAGE_MAX_AGE, payload_hash, qr_png, student_qr_payload
+from .reference import reference_data
+from .search import search_students
+from .stats import STAT_FIELDS, student_stats
+
+logger = logging.getLogger(__name__)
 
 class StudentViewSet(viewsets.ModelViewSet):
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
     permission_classes = [IsAuthenticated, StudentPermission]
-    filter_backends = [DjangoFilterBackend, SearchFilter]
-    search_fields = [
-        'registration_no', 'full_name_english', 'full_name_sinhala',
-        'name_with_initials', 'nic_id', 'district', 'email',
-        'district_code', 'course_code', 'batch__batch_code'
-    ]
+    # ?search= is handled by the search index in get_queryset, not SearchFilter
+    filter_backends = [DjangoFilterBackend]
     filterset_fields = ['district', 'center', 'course', 'enrollment_status', 'training_received', 'district_code', 'course_code', 'batch']
+    pagination_class = StudentPagination
+    
+    def use_keyset_pagination(self):
+        # Search results are ordered by relevance, which has no keyset
+        return not self.request.query_params.get('search')
+    
+    def use_list_serializer(self):
+        # ?view=full lists students with the full detail representation
+        return self.action == 'list' and self.request.query_params.get('view') != 'full'
+    
+    def get_serializer_class(self):
+        if self.use_list_serializer():
+            return StudentListSerializer
+        return super().get_serializer_class()
     
     def get_queryset(self):
         queryset = Student.objects.all()
@@ -51,22 +70,15 @@ class StudentViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(district=user.district)
         
         if search_term:
-            queryset = queryset.filter(
-                Q(full_name_english__icontains=search_term) |
-                Q(full_name_sinhala__icontains=search_term) |
-                Q(name_with_initials__icontains=search_term) |
-                Q(nic_id__icontains=search_term) |
-                Q(registration_no__icontains=search_term) |
-                Q(district__icontains=search_term) |
-                Q(center__name__icontains=search_term) |
-                Q(course__name__icontains=search_term) |
-                Q(district_code__icontains=search_term) |
-                Q(course_code__icontains=search_term) |
-                Q(batch__batch_code__icontains=search_term) |
-                Q(batch__batch_name__icontains=search_term)
+            queryset = search_students(queryset, search_term)
+        
+        if self.use_list_serializer():
+            return queryset.select_related('center', 'course', 'batch').only(*STUDENT_LIST_COLUMNS).annotate(
+                ol_results_count=Count('qualifications', filter=Q(qualifications__type='OL')),
+                al_results_count=Count('qualifications', filter=Q(qualifications__type='AL')),
             )
         
-        return queryset.select_related('center', 'course', 'created_by', 'batch')
+        return queryset.select_related('center', 'course', 'created_by', 'batch').prefetch_related('qualifications')
     
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -89,12 +101,11 @@ class StudentViewSet(viewsets.ModelViewSet):
         batch_id = data.get('batch_id')
         
         current_year = timezone.now().year
+        reference = reference_data()
         
         # Get district code
         try:
-            district_code_obj = DistrictCode.objects.filter(
-                district_name__iexact=district
-            ).first()
+            district_code_obj = reference.district_code_for(district)
             if district_code_obj:
                 district_code = district_code_obj.district_code
             else:
@@ -107,9 +118,7 @@ class StudentViewSet(viewsets.ModelViewSet):
         if course_id:
             try:
                 course = Course.objects.get(id=course_id)
-                course_code_obj = CourseCode.objects.filter(
-                    course_name__icontains=course.name
-                ).first()
+                course_code_obj = reference.course_code_for(course.name)
                 if course_code_obj:
                     course_code = course_code_obj.course_code
                 elif course.code:
@@ -121,28 +130,17 @@ class StudentViewSet(viewsets.ModelViewSet):
         batch_code = "01"
         batch_name = "1st Batch"
         if batch_id:
-            try:
-                batch = Batch.objects.get(id=batch_id)
+            batch = reference.batch(batch_id)
+            if batch:
                 batch_code = batch.batch_code
                 batch_name = batch.batch_name
-            except Batch.DoesNotExist:
-                pass
         else:
             # Get default batch
-            default_batch = Batch.objects.filter(is_active=True).order_by('display_order').first()
+            default_batch = reference.default_batch()
             if default_batch:
                 batch_code = default_batch.batch_code
                 batch_name = default_batch.batch_name
         
-        # Get next student number
-        students_in_batch = Student.objects.filter(
-            district=district,
-            course_id=course_id,
-            batch_id=batch_id
-        )
-        
-        student_number = students_in_batch.count() + 1
-        
         # Get registration year
         registration_year = current_year
         if enrollment_date:
@@ -152,6 +150,11 @@ class StudentViewSet(viewsets.ModelViewSet):
             except:
                 pass
         
+        # Get next student number (previewed, not reserved)
+        student_number = RegistrationSequence.peek(
+            district_code, course_code, batch_code, str(registration_year)
+        )
+        
         # Generate preview
         full_registration = f"{district_code}/{course_code}/{batch_code}/{student_number:04d}/{registration_year}"
         
@@ -173,29 +176,33 @@ class StudentViewSet(viewsets.ModelViewSet):
             }
         })
     
+    def reference_response(self, request, name):
+        """Serve a cached reference table, answering If-None-Match with a 304"""
+        reference = reference_data()
+        etag = reference.etags[name]
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        response = Response(reference.payloads[name])
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+    
     @action(detail=False, methods=['get'])
     def available_district_codes(self, request):
-        district_codes = DistrictCode.objects.all()
-        serializer = DistrictCodeSerializer(district_codes, many=True)
-        return Response(serializer.data)
+        return self.reference_response(request, 'district_codes')
     
     @action(detail=False, methods=['get'])
     def available_course_codes(self, request):
-        course_codes = CourseCode.objects.all()
-        serializer = CourseCodeSerializer(course_codes, many=True)
-        return Response(serializer.data)
+        return self.reference_response(request, 'course_codes')
     
     @action(detail=False, methods=['get'])
     def available_batches(self, request):
-        batches = Batch.objects.filter(is_active=True).order_by('display_order')
-        serializer = BatchSerializer(batches, many=True)
-        return Response(serializer.data)
+        return self.reference_response(request, 'batches')
     
     @action(detail=False, methods=['get'])
     def available_batch_years(self, request):
-        batch_years = BatchYear.objects.filter(is_active=True)
-        serializer = BatchYearSerializer(batch_years, many=True)
-        return Response(serializer.data)
+        return self.reference_response(request, 'batch_years')
     
     @action(detail=False, methods=['get'])
     def registration_formats(self, request):
@@ -224,41 +231,20 @@ class StudentViewSet(viewsets.ModelViewSet):
         user = request.user
         queryset = self.get_queryset()
         
-        stats = {
-            'total_students': queryset.count(),
-            'trained_students': queryset.filter(training_received=True).count(),
-            'enrolled_students': queryset.filter(enrollment_status='Enrolled').count(),
-            'completed_students': queryset.filter(enrollment_status='Completed').count(),
-            'pending_students': queryset.filter(enrollment_status='Pending').count(),
-            'with_ol_results': queryset.filter(qualifications__type='OL').distinct().count(),
-            'with_al_results': queryset.filter(qualifications__type='AL').distinct().count(),
-            'recent_students': queryset.filter(created_at__gte=timezone.now() - timezone.timedelta(days=7)).count(),
-        }
-        
-        center_stats = {}
-        for student in queryset.select_related('center'):
-            center_name = student.center.name if student.center else 'No Center'
-            center_stats[center_name] = center_stats.get(center_name, 0) + 1
-        
-        stats['center_distribution'] = center_stats
-        
-        registration_stats = {
-            'by_district': {},
-            'by_course': {},
-            'by_batch': {}
-        }
+        # ?fields=total_students,center_distribution limits the response to those sections
+        fields = validated_fields(request, STAT_FIELDS)
         
-        for student in queryset:
-            district = student.district_code or 'Unknown'
-            registration_stats['by_district'][district] = registration_stats['by_district'].get(district, 0) + 1
-            
-            course = student.course_code or 'GEN'
-            registration_stats['by_course'][course] = registration_stats['by_course'].get(course, 0) + 1
-            
-            batch = student.batch.batch_name if student.batch else 'Unknown'
-            registration_stats['by_batch'][batch] = registration_stats['by_batch'].get(batch, 0) + 1
-        
-        stats['registration_stats'] = registration_stats
+        # Same district scoping as get_queryset; searches are too varied to cache
+        district = None
+        if user.role in ['district_manager', 'training_officer', 'data_entry'] and user.district:
+            district = user.district
+        stats = student_stats(
+            queryset,
+            fields or STAT_FIELDS,
+            role=user.role,
+            district=district,
+            cache=not request.query_params.get('search')
+        )
         
         return Response(stats)
     
@@ -268,108 +254,17 @@ class StudentViewSet(viewsets.ModelViewSet):
         students = self.get_queryset()
         
         if format_type == 'csv':
-            response = HttpResponse(content_type='text/csv')
+            response = StreamingHttpResponse(stream_csv(students), content_type='text/csv')
             response['Content-Disposition'] = 'attachment; filename="students.csv"'
-            
-            writer = csv.writer(response)
-            writer.writerow([
-                'Registration No', 'District Code', 'Course Code', 'Batch', 'Batch Name',
-                'Student Number', 'Registration Year', 'Full Name (English)', 
-                'Full Name (Sinhala)', 'Name with Initials', 'Gender', 'Date of Birth', 
-                'NIC/ID', 'Address', 'District', 'Divisional Secretariat', 
-                'Grama Niladhari Division', 'Village', 'Residence Type', 'Mobile No', 
-                'Email', 'Training Received', 'Training Provider', 'Course/Vocation', 
-                'Training Duration', 'Training Nature', 'Training Establishment', 
-                'Placement Preference', 'Center', 'Course', 'Enrollment Date', 
-                'Enrollment Status', 'Date of Application'
-            ])
-            
-            for student in students:
-                writer.writerow([
-                    student.registration_no,
-                    student.district_code,
-                    student.course_code,
-                    student.batch.batch_code if student.batch else '',
-                    student.batch.batch_name if student.batch else '',
-                    student.student_number,
-                    student.registration_year,
-                    student.full_name_english,
-                    student.full_name_sinhala,
-                    student.name_with_initials,
-                    student.gender,
-                    student.date_of_birth,
-                    student.nic_id,
-                    student.address_line,
-                    student.district,
-                    student.divisional_secretariat,
-                    student.grama_niladhari_division,
-                    student.village,
-                    student.residence_type,
-                    student.mobile_no,
-                    student.email,
-                    'Yes' if student.training_received else 'No',
-                    student.training_provider,
-                    student.course_vocation_name,
-                    student.training_duration,
-                    student.training_nature,
-                    student.training_establishment,
-                    student.training_placement_preference,
-                    student.center.name if student.center else '',
-                    student.course.name if student.course else '',
-                    student.enrollment_date,
-                    student.enrollment_status,
-                    student.date_of_application,
-                ])
-            
             return response
         
         elif format_type == 'excel':
-            data = []
-            for student in students:
-                data.append({
-                    'Registration No': student.registration_no,
-                    'District Code': student.district_code,
-                    'Course Code': student.course_code,
-                    'Batch Code': student.batch.batch_code if student.batch else '',
-                    'Batch Name': student.batch.batch_name if student.batch else '',
-                    'Student Number': student.student_number,
-                    'Registration Year': student.registration_year,
-                    'Full Name (English)': student.full_name_english,
-                    'Full Name (Sinhala)': student.full_name_sinhala,
-                    'Name with Initials': student.name_with_initials,
-                    'Gender': student.gender,
-                    'Date of Birth': student.date_of_birth,
-                    'NIC/ID': student.nic_id,
-                    'Address': student.address_line,
-                    'District': student.district,
-                    'Divisional Secretariat': student.divisional_secretariat,
-                    'Grama Niladhari Division': student.grama_niladhari_division,
-                    'Village': student.village,
-                    'Residence Type': student.residence_type,
-                    'Mobile No': student.mobile_no,
-                    'Email': student.email,
-                    'Training Received': 'Yes' if student.training_received else 'No',
-                    'Training Provider': student.training_provider,
-                    'Course/Vocation': student.course_vocation_name,
-                    'Training Duration': student.training_duration,
-                    'Training Nature': student.training_nature,
-                    'Training Establishment': student.training_establishment,
-                    'Placement Preference': student.training_placement_preference,
-                    'Center': student.center.name if student.center else '',
-                    'Course': student.course.name if student.course else '',
-                    'Enrollment Date': student.enrollment_date,
-                    'Enrollment Status': student.enrollment_status,
-                    'Date of Application': student.date_of_application,
-                })
-            
-            df = pd.DataFrame(data)
-            response = HttpResponse(content_type='application/vnd.ms-excel')
-            response['Content-Disposition'] = 'attachment; filename="students.xlsx"'
-            
-            with pd.ExcelWriter(response, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name='Students')
-            
-            return response
+            return FileResponse(
+                write_xlsx(students),
+                as_attachment=True,
+                filename='students.xlsx',
+                content_type='application/vnd.ms-excel'
+            )
         
         else:
             return Response(
@@ -390,88 +285,24 @@ class StudentViewSet(viewsets.ModelViewSet):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
         file = request.FILES['file']
-        imported_count = 0
-        errors = []
         
         try:
-            if file.name.endswith('.csv'):
-                df = pd.read_csv(file)
-            elif file.name.endswith(('.xls', '.xlsx')):
-                df = pd.read_excel(file)
-            else:
+            df = read_import_file(file)
+            if df is None:
                 return Response(
                     {'error': 'Unsupported file format'}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            for index, row in df.iterrows():
-                try:
-                    center_name = row.get('Center', '')
-                    course_name = row.get('Course', '')
-                    batch_code = row.get('Batch Code', '01')
-                    
-                    center = None
-                    course = None
-                    batch = None
-                    
-                    if center_name:
-                        center = Center.objects.filter(name=center_name, district=request.user.district).first()
-                    
-                    if course_name:
-                        course = Course.objects.filter(name=course_name, district=request.user.district).first()
-                    
-                    if batch_code:
-                        batch = Batch.objects.filter(batch_code=batch_code).first()
-                        if not batch:
-                            batch = Batch.objects.filter(is_active=True).order_by('display_order').first()
-                    
-                    student_data = {
-                        'full_name_english': row.get('Full Name (English)', ''),
-                        'full_name_sinhala': row.get('Full Name (Sinhala)', ''),
-                        'name_with_initials': row.get('Name with Initials', ''),
-                        'gender': row.get('Gender', 'Male'),
-                        'date_of_birth': row.get('Date of Birth', ''),
-                        'nic_id': row.get('NIC/ID', ''),
-                        'address_line': row.get('Address', ''),
-                        'district': row.get('District', ''),
-                        'divisional_secretariat': row.get('Divisional Secretariat', ''),
-                        'grama_niladhari_division': row.get('Grama Niladhari Division', ''),
-                        'village': row.get('Village', ''),
-                        'residence_type': row.get('Residence Type', ''),
-                        'mobile_no': row.get('Mobile No', ''),
-                        'email': row.get('Email', ''),
-                        'training_received': row.get('Training Received', 'No').lower() == 'yes',
-                        'training_provider': row.get('Training Provider', ''),
-                        'course_vocation_name': row.get('Course/Vocation', ''),
-                        'training_duration': row.get('Training Duration', ''),
-                        'training_nature': row.get('Training Nature', 'Initial'),
-                        'training_establishment': row.get('Training Establishment', ''),
-                        'training_placement_preference': row.get('Placement Preference', '1st'),
-                        'center': center.id if center else None,
-                        'course': course.id if course else None,
-                        'batch': batch.id if batch else None,
-                        'enrollment_date': row.get('Enrollment Date', ''),
-                        'enrollment_status': row.get('Enrollment Status', 'Pending'),
-                        'date_of_application': row.get('Date of Application', ''),
-                    }
-                    
-                    if request.user.role == 'data_entry' and request.user.district:
-                        student_data['district'] = request.user.district
-                    
-                    student_serializer = StudentSerializer(data=student_data, context={'request': request})
-                    if student_serializer.is_valid():
-                        student_serializer.save(created_by=request.user)
-                        imported_count += 1
-                    else:
-                        errors.append(f"Row {index + 1}: {student_serializer.errors}")
-                        
-                except Exception as e:
-                    errors.append(f"Row {index + 1}: {str(e)}")
+            student_import = StudentImport(df, request.user)
+            imported_count = student_import.run()
+            error_report = student_import.error_report()
             
             return Response({
                 'message': f'Successfully imported {imported_count} students',
                 'imported': imported_count,
-                'errors': errors
+                'errors': [f"Row {item['row']}: {item['errors']}" for item in error_report],
+                'error_report': error_report
             })
             
         except Exception as e:
@@ -479,133 +310,130 @@ class StudentViewSet(viewsets.ModelViewSet):
                 {'error': f'Error processing file: {str(e)}'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
-            
-    # Add to students/views.py
-from django.http import HttpResponse
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-import qrcode
-import io
-from PIL import Image
-import json
-from datetime import datetime
-
-@action(detail=True, methods=['get'])
-def qrcode_data(self, request, pk=None):
-    """Get QR code data for a student"""
-    student = self.get_object()
-    
-    qr_data = {
-        'student_id': student.id,
-        'registration_no': student.registration_no,
-        'full_name': student.full_name_english,
-        'nic_id': student.nic_id,
-        'course_name': student.course.name if student.course else 'Not assigned',
-        'center_name': student.center.name if student.center else 'Not assigned',
-        'enrollment_status': student.enrollment_status,
-        'timestamp': datetime.now().isoformat()
-    }
-    
-    return Response(qr_data)
-
-@action(detail=True, methods=['get'])
-def id_card(self, request, pk=None):
-    """Generate student ID card PDF"""
-    student = self.get_object()
-    
-    # Create PDF
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    
-    # Generate QR code
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_H,
-        box_size=10,
-        border=4,
-    )
-    qr_data = json.dumps({
-        'student_id': student.id,
-        'registration_no': student.registration_no,
-        'full_name': student.full_name_english,
-        'timestamp': datetime.now().isoformat()
-    })
-    qr.add_data(qr_data)
-    qr.make(fit=True)
-    qr_img = qr.make_image(fill_color="black", back_color="white")
-    
-    # Save QR to bytes
-    qr_buffer = io.BytesIO()
-    qr_img.save(qr_buffer, format='PNG')
-    qr_buffer.seek(0)
-    
-    # Draw ID card
-    # Header
-    p.setFillColorRGB(0, 0.5, 0)  # Green
-    p.rect(50, height - 100, width - 100, 40, fill=1, stroke=0)
-    p.setFillColorRGB(1, 1, 1)  # White
-    p.setFont("Helvetica-Bold", 20)
-    p.drawCentredString(width/2, height - 80, "Student ID Card")
-    p.setFont("Helvetica", 12)
-    p.drawCentredString(width/2, height - 105, "Vocational Training Authority")
-    
-    # Student info
-    p.setFillColorRGB(0, 0, 0)  # Black
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(70, height - 150, f"Name: {student.full_name_english}")
-    p.setFont("Helvetica", 12)
-    p.drawString(70, height - 170, f"Registration No: {student.registration_no}")
-    p.drawString(70, height - 190, f"NIC: {student.nic_id}")
-    p.drawString(70, height - 210, f"Course: {student.course.name if student.course else 'Not assigned'}")
-    p.drawString(70, height - 230, f"Center: {student.center.name if student.center else 'Not assigned'}")
-    p.drawString(70, height - 250, f"District: {student.district}")
-    
-    # QR Code
-    p.drawImage(ImageReader(qr_buffer), width - 150, height - 300, width=100, height=100)
-    p.setFont("Helvetica", 10)
-    p.drawCentredString(width - 100, height - 310, "Scan for Attendance")
     
-    # Footer
-    p.setFont("Helvetica-Oblique", 10)
-    p.drawString(70, height - 350, f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-    p.drawString(70, height - 365, "Valid until course completion")
-    
-    p.showPage()
-    p.save()
+    @action(detail=True, methods=['get'], url_path='qrcode')
+    def qrcode_data(self, request, pk=None):
+        """Get QR code data for a student"""
+        student = self.get_object()
+        payload = student_qr_payload(student)
+        
+        qr_data = {
+            'student_id': student.id,
+            'registration_no': student.registration_no,
+            'full_name': student.full_name_english,
+            'nic_id': student.nic_id,
+            'course_name': student.course.name if student.course else 'Not assigned',
+            'center_name': student.center.name if student.center else 'Not assigned',
+            'enrollment_status': student.enrollment_status,
+            'timestamp': datetime.now().isoformat(),
+            'qr_payload': payload,
+            'qr_image_url': request.build_absolute_uri(
+                f"{self.reverse_action('qr-image', args=[student.pk])}?v={payload_hash(payload)[:16]}"
+            ),
+        }
+        
+        return Response(qr_data)
     
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="student_id_card_{student.registration_no}.pdf"'
-    return response
-
-@action(detail=False, methods=['post'])
-def bulk_id_cards(self, request):
-    """Generate ID cards for multiple students"""
-    student_ids = request.data.get('student_ids', [])
-    students = Student.objects.filter(id__in=student_ids)
+    @action(detail=True, methods=['get'], url_path='qr')
+    def qr_image(self, request, pk=None):
+        """The student's attendance QR code as a PNG.
+        
+        With the ?v= from qrcode/ the image is cached for a year, since a new
+        registration number changes the version; without it clients
+        revalidate against the ETag.
+        """
+        student = self.get_object()
+        payload = student_qr_payload(student)
+        version = payload_hash(payload)[:16]
+        etag = f'"{version}"'
+        
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(qr_png(payload), content_type='image/png')
+        response['ETag'] = etag
+        if request.query_params.get('v') == version:
+            response['Cache-Control'] = f'private, max-age={IMAGE_MAX_AGE}, immutable'
+        else:
+            response['Cache-Control'] = 'private, no-cache'
+        return response
     
-    # Create combined PDF
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer, pagesize=A4)
+    @action(detail=True, methods=['get'], url_path='id-card')
+    def id_card(self, request, pk=None):
+        """Generate student ID card PDF"""
+        student = self.get_object()
+        response = HttpResponse(single_card_pdf(student), content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="student_id_card_{student.registration_no}.pdf"'
+        return response
     
-    for i, student in enumerate(students):
-        if i > 0 and i % 2 == 0:
-            p.showPage()  # New page for every 2 ID cards
+    @action(detail=False, methods=['post'], url_path='bulk-id-cards')
+    def bulk_id_cards(self, request):
+        """ID cards for many students, imposed cards_per_page to an A4 sheet.
+        
+        Returns the PDF directly, or with "background": true queues an
+        IDCardJob for manage.py run_id_card_worker and returns it (202).
+        """
+        serializer = BulkIDCardSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        cards_per_page = data.get('cards_per_page') or cards_per_page_default()
+        # Only students this user can see, once each, in the order requested
+        students = students_in_order(self.get_queryset(), list(dict.fromkeys(data['student_ids'])))
+        if not students:
+            return Response({'error': 'No students found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if data['background']:
+            job = submit_id_card_job(request.user, [student.id for student in students], cards_per_page)
+            return Response(IDCardJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
         
-        # Generate each ID card
-        # ... similar drawing code as above ...
+        if len(students) > id_card_sync_limit():
+            return Response(
+                {'error': f'More than {id_card_sync_limit()} cards, send "background": true to queue them'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        if i == len(students) - 1:
-            p.showPage()
+        try:
+            return FileResponse(
+                card_sheets_file(students, cards_per_page),
+                as_attachment=True,
+                filename=f'student_id_cards_{datetime.now().strftime("%Y%m%d_%H%M")}.pdf',
+                content_type='application/pdf'
+            )
+        except Exception as e:
+            logger.error(f"Error generating bulk ID cards: {str(e)}")
+            return Response(
+                {'error': 'Failed to generate ID cards'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
     
-    p.save()
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="student_id_cards_{datetime.now().strftime("%Y%m%d_%H%M")}.pdf"'
-    return response
-
+    def id_card_job_for(self, request, job_id):
+        job = get_object_or_404(IDCardJob.objects.select_related('requested_by'), pk=job_id)
+        if request.user.role != 'admin' and job.requested_by_id != request.user.id:
+            return None
+        return job
+    
+    @action(detail=False, methods=['get'], url_path=r'id-card-jobs/(?P<job_id>\d+)')
+    def id_card_job(self, request, job_id=None):
+        job = self.id_card_job_for(request, job_id)
+        if job is None:
+            return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+        return Response(IDCardJobSerializer(job).data)
+    
+    @action(detail=False, methods=['get'], url_path=r'id-card-jobs/(?P<job_id>\d+)/download')
+    def download_id_card_job(self, request, job_id=None):
+        job = self.id_card_job_for(request, job_id)
+        if job is None:
+            return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+        if job.status != 'completed':
+            return Response(
+                {'error': f'ID cards are not ready (status: {job.status})'},
+                status=status.HTTP_409_CONFLICT
+            )
+        if not job.file_path or not os.path.exists(job.file_path):
+            return Response({'error': 'ID card file is missing'}, status=status.HTTP_410_GONE)
+        return FileResponse(open(job.file_path, 'rb'), as_attachment=True, filename=job.file_name)
+            
 class DistrictCodeViewSet(viewsets.ModelViewSet):
     queryset = DistrictCode.objects.all()
     serializer_class = DistrictCodeSerializer
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('centers', '0004_rename_instructors_center_instructor_count_and_more'),
+        ('users', '0013_user_phone_number'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['date_joined', 'id'], name='users_user_date_jo_5aa9d9_idx'),
+        ),
+    ]
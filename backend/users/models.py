@@ -29,5 +29,11 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Keyset pagination of the user list
+            models.Index(fields=['date_joined', 'id']),
+        ]
+
     def __str__(self):
         return self.email
\ No newline at end of file
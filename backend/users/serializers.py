@@ -2,6 +2,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from centers.models import Center
+from naita_backend.serializers import SparseFieldsetMixin
 
 User = get_user_model()
 
@@ -10,7 +11,7 @@ class CenterSerializer(serializers.ModelSerializer):
         model = Center
         fields = ["id", "name", "district"]
 
-class UserListSerializer(serializers.ModelSerializer):
+class UserListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     center = CenterSerializer(read_only=True)
 
     class Meta:
@@ -20,7 +21,7 @@ class UserListSerializer(serializers.ModelSerializer):
             "role", "center", "district", "epf_no", "phone_number", "is_active", "is_staff", "last_login"
         ]
 
-class UserCreateSerializer(serializers.ModelSerializer):
+class UserCreateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     center_id = serializers.PrimaryKeyRelatedField(
         queryset=Center.objects.all(),
         source="center",
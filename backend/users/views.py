@@ -17,6 +17,7 @@ from django.db import models
 from .serializers import UserListSerializer, UserCreateSerializer
 from centers.serializers import CenterSerializer
 from centers.models import Center
+from naita_backend.pagination import UserPagination
 from rest_framework import serializers
 
 import logging
@@ -256,6 +257,7 @@ class UserListCreateView(generics.ListCreateAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminOrDistrictManagerOrTrainingOfficer]
     queryset = User.objects.select_related("center").all()
+    pagination_class = UserPagination
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -482,6 +482,10 @@ export interface StudentType {
   email: string;
   ol_results: EducationalQualificationType[];
   al_results: EducationalQualificationType[];
+  // List rows only
+  ol_results_count?: number;
+  al_results_count?: number;
+  avatar_url?: string | null;
   training_received: boolean;
   training_provider: string;
   course_vocation_name: string;
@@ -564,6 +568,8 @@ export const fetchStudents = async (search?: string, filters?: {
   enrollment_status?: string;
   training_received?: boolean;
 }): Promise<StudentType[]> => {
+  // List rows count qualifications and leave out the detail-only fields;
+  // use fetchStudentById for the full record (e.g. before editing)
   const params = { search, ...filters };
   const res = await api.get("/api/students/", { params });
   return res.data;
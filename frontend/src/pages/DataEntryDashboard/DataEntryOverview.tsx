@@ -72,8 +72,8 @@ const StudentDashboardOverview: React.FC = () => {
     enrolled: stats?.enrolled_students || students.filter(s => s.enrollment_status === 'Enrolled').length,
     completed: stats?.completed_students || students.filter(s => s.enrollment_status === 'Completed').length,
     pending: stats?.pending_students || students.filter(s => s.enrollment_status === 'Pending').length,
-    withOL: stats?.with_ol_results || students.filter(s => s.ol_results.length > 0).length,
-    withAL: stats?.with_al_results || students.filter(s => s.al_results.length > 0).length,
+    withOL: stats?.with_ol_results || students.filter(s => (s.ol_results_count ?? 0) > 0).length,
+    withAL: stats?.with_al_results || students.filter(s => (s.al_results_count ?? 0) > 0).length,
     recent: stats?.recent_students || students.filter(s => {
       const date = new Date(s.created_at || '');
       const weekAgo = new Date();
@@ -354,14 +354,14 @@ const StudentDashboardOverview: React.FC = () => {
         <div className="text-center p-4 rounded-lg border border-gray-200 bg-purple-50 hover:bg-purple-100 transition">
           <Bookmark className="w-8 h-8 text-purple-600 mx-auto mb-2" />
           <div className="text-2xl font-bold text-gray-900">
-            {students.length > 0 ? (students.reduce((sum, s) => sum + s.ol_results.length, 0) / students.length).toFixed(1) : '0.0'}
+            {students.length > 0 ? (students.reduce((sum, s) => sum + (s.ol_results_count ?? 0), 0) / students.length).toFixed(1) : '0.0'}
           </div>
           <div className="text-sm text-gray-600">Avg O/L Subjects</div>
         </div>
         <div className="text-center p-4 rounded-lg border border-gray-200 bg-orange-50 hover:bg-orange-100 transition">
           <Target className="w-8 h-8 text-orange-600 mx-auto mb-2" />
           <div className="text-2xl font-bold text-gray-900">
-            {students.length > 0 ? (students.reduce((sum, s) => sum + s.al_results.length, 0) / students.length).toFixed(1) : '0.0'}
+            {students.length > 0 ? (students.reduce((sum, s) => sum + (s.al_results_count ?? 0), 0) / students.length).toFixed(1) : '0.0'}
           </div>
           <div className="text-sm text-gray-600">Avg A/L Subjects</div>
         </div>
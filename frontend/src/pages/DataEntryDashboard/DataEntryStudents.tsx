@@ -12,6 +12,7 @@ import {
   type RegistrationNumberPreview,
   type BatchType,
   fetchStudents,
+  fetchStudentById,
   deleteStudent,
   fetchCentersForStudent,
   fetchCoursesForStudent,
@@ -52,25 +53,6 @@ const MobileStudentCard: React.FC<MobileStudentCardProps> = ({
 }) => {
   const [isExpanded, setIsExpanded] = useState(false);
 
-  // Helper to safely parse qualifications
-  const parseQualifications = (data: any): EducationalQualificationType[] => {
-    if (!data) return [];
-    if (Array.isArray(data)) return data;
-    try {
-      if (typeof data === 'string') {
-        const parsed = JSON.parse(data);
-        return Array.isArray(parsed) ? parsed : [];
-      }
-    } catch (e) {
-      console.error('Error parsing qualifications:', e);
-      return [];
-    }
-    return [];
-  };
-
-  const olResults = parseQualifications(student.ol_results);
-  const alResults = parseQualifications(student.al_results);
-
   return (
     <div className="bg-white border border-gray-200 rounded-lg p-3 mb-3 shadow-sm hover:shadow-md transition-shadow">
       <div className="flex justify-between items-start">
@@ -175,34 +157,14 @@ const MobileStudentCard: React.FC<MobileStudentCardProps> = ({
 
           <div className="bg-gradient-to-r from-gray-50 to-blue-50 rounded-lg p-2 border border-gray-100">
             <div className="text-xs font-semibold text-gray-700 mb-1">Education:</div>
-            <div className="space-y-2">
+            <div className="grid grid-cols-2 gap-2 text-center">
               <div>
-                <div className="text-[10px] font-semibold text-gray-600 mb-0.5">O/L Results ({olResults.length}):</div>
-                {olResults.length > 0 ? (
-                  <div className="flex flex-wrap gap-1">
-                    {olResults.map((res, i) => (
-                      <span key={i} className="inline-block px-1.5 py-0.5 bg-white border border-gray-200 rounded text-[10px] text-gray-800">
-                        {res.subject}: {res.grade}
-                      </span>
-                    ))}
-                  </div>
-                ) : (
-                  <div className="text-[10px] text-gray-400 italic">No results</div>
-                )}
+                <div className="text-xs font-bold text-gray-900">{student.ol_results_count ?? 0}</div>
+                <div className="text-[10px] text-gray-600">O/L Subjects</div>
               </div>
               <div>
-                <div className="text-[10px] font-semibold text-gray-600 mb-0.5">A/L Results ({alResults.length}):</div>
-                {alResults.length > 0 ? (
-                  <div className="flex flex-wrap gap-1">
-                    {alResults.map((res, i) => (
-                      <span key={i} className="inline-block px-1.5 py-0.5 bg-white border border-gray-200 rounded text-[10px] text-gray-800">
-                        {res.subject}: {res.grade}
-                      </span>
-                    ))}
-                  </div>
-                ) : (
-                  <div className="text-[10px] text-gray-400 italic">No results</div>
-                )}
+                <div className="text-xs font-bold text-gray-900">{student.al_results_count ?? 0}</div>
+                <div className="text-[10px] text-gray-600">A/L Subjects</div>
               </div>
             </div>
           </div>
@@ -683,7 +645,17 @@ const DataEntryStudents: React.FC = () => {
     }
   };
 
-  const handleEdit = (student: StudentType) => {
+  // List rows are slim; the form and the details view need the full record
+  const withFullRecord = (open: (student: StudentType) => void) => async (row: StudentType) => {
+    try {
+      open(await fetchStudentById(row.id!));
+    } catch (error) {
+      console.error('Error fetching student details:', error);
+      alert('Error loading student details. Please try again.');
+    }
+  };
+
+  const handleEdit = withFullRecord((student: StudentType) => {
     setFormData({
       ...student,
       ol_results: student.ol_results || [],
@@ -734,12 +706,12 @@ const DataEntryStudents: React.FC = () => {
         loadCourses(Number(centerId));
       }
     }
-  };
+  });
 
-  const handleViewDetails = (student: StudentType) => {
+  const handleViewDetails = withFullRecord((student: StudentType) => {
     setSelectedStudent(student);
     setShowDetails(true);
-  };
+  });
 
   const handleShowIDCard = (student: StudentType) => {
     setSelectedIDCardStudent(student);
@@ -2473,31 +2445,23 @@ const DataEntryStudents: React.FC = () => {
                       <div className="space-y-2">
                         <div>
                           <div className="text-xs font-semibold text-gray-500 mb-1">G.C.E. O/L</div>
-                          {(() => {
-                            const results = Array.isArray(student.ol_results) ? student.ol_results : (typeof student.ol_results === 'string' ? JSON.parse(student.ol_results) : []) as EducationalQualificationType[];
-
-                            return results && results.length > 0 ? (
-                              <span className="inline-flex items-center px-2.5 py-1 rounded-md text-xs font-medium bg-gray-100 text-gray-800 border border-gray-200">
-                                {results.length} Subjects
-                              </span>
-                            ) : (
-                              <span className="text-xs text-gray-400 italic">No results</span>
-                            );
-                          })()}
+                          {(student.ol_results_count ?? 0) > 0 ? (
+                            <span className="inline-flex items-center px-2.5 py-1 rounded-md text-xs font-medium bg-gray-100 text-gray-800 border border-gray-200">
+                              {student.ol_results_count} Subjects
+                            </span>
+                          ) : (
+                            <span className="text-xs text-gray-400 italic">No results</span>
+                          )}
                         </div>
                         <div>
                           <div className="text-xs font-semibold text-gray-500 mb-1">G.C.E. A/L</div>
-                          {(() => {
-                            const results = Array.isArray(student.al_results) ? student.al_results : (typeof student.al_results === 'string' ? JSON.parse(student.al_results) : []) as EducationalQualificationType[];
-
-                            return results && results.length > 0 ? (
-                              <span className="inline-flex items-center px-2.5 py-1 rounded-md text-xs font-medium bg-blue-50 text-blue-800 border border-blue-200">
-                                {results.length} Subjects
-                              </span>
-                            ) : (
-                              <span className="text-xs text-gray-400 italic">No results</span>
-                            );
-                          })()}
+                          {(student.al_results_count ?? 0) > 0 ? (
+                            <span className="inline-flex items-center px-2.5 py-1 rounded-md text-xs font-medium bg-blue-50 text-blue-800 border border-blue-200">
+                              {student.al_results_count} Subjects
+                            </span>
+                          ) : (
+                            <span className="text-xs text-gray-400 italic">No results</span>
+                          )}
                         </div>
                       </div>
                     </td>
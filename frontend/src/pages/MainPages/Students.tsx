@@ -16,6 +16,7 @@ import {
 import {
   type StudentType,
   fetchStudents,
+  fetchStudentById,
   fetchStudentStats,
   fetchCenters,
   fetchCourses,
@@ -178,11 +179,11 @@ const MobileStudentCard: React.FC<MobileStudentCardProps> = ({
             <div className="text-xs font-semibold text-gray-700 mb-2">Education:</div>
             <div className="grid grid-cols-2 gap-2 text-center">
               <div>
-                <div className="text-xs font-bold text-gray-900">{student.ol_results?.length || 0}</div>
+                <div className="text-xs font-bold text-gray-900">{student.ol_results_count ?? 0}</div>
                 <div className="text-[10px] text-gray-600">O/L Subjects</div>
               </div>
               <div>
-                <div className="text-xs font-bold text-gray-900">{student.al_results?.length || 0}</div>
+                <div className="text-xs font-bold text-gray-900">{student.al_results_count ?? 0}</div>
                 <div className="text-[10px] text-gray-600">A/L Subjects</div>
               </div>
             </div>
@@ -419,9 +420,15 @@ const Students: React.FC = () => {
   };
 
   // Handle view details
-  const handleViewDetails = (student: StudentType) => {
-    setSelectedStudent(student);
-    setShowDetailsModal(true);
+  const handleViewDetails = async (student: StudentType) => {
+    // List rows are slim; the modal shows the full record
+    try {
+      setSelectedStudent(await fetchStudentById(student.id!));
+      setShowDetailsModal(true);
+    } catch (error) {
+      console.error('Error fetching student details:', error);
+      alert('Error loading student details. Please try again.');
+    }
   };
 
   // Student Details Modal Component